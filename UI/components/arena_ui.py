@@ -1,6 +1,6 @@
 import pygame
 from constants import *
-from core.sorting import sort_for_visualization
+from core.profiler import profiled
 
 placeable_overlay_surface = None
 placeable_overlay_team = None
@@ -19,6 +19,7 @@ colors = {
     9: (200, 100, 100, 150), # TOWER_P2 + 1 / overlay
 }
 
+@profiled("draw_arena")
 def draw_arena(cols, rows, tile_size, asset_manager, screen, arena, selected_card=None, DRAW_PLACABLE_CELLS=False, team=1):
     """
     Draws the arena grid and optional placeable cell overlay
@@ -90,20 +91,20 @@ def draw_arena(cols, rows, tile_size, asset_manager, screen, arena, selected_car
 
         screen.blit(placeable_overlay_surface, (0, 0))
 
+@profiled("draw_units")
 def draw_units(arena, screen, tile_size, asset_manager):
     """
     Draws all troops in render order (top to bottom for proper layering)
 
-    - Time: Worst case = Average case = O(n log n) for merge sort + O(n) for drawing
-    - Space: O(n) for sorted list copy
+    - Time: Worst case = Average case = O(n + h) walking the row buckets of arena.render_order + O(n) for drawing
+    - Space: O(1) no sorted copy of the troops
 
-    NOTE: Sorting is preferred over maintaining a sorted linked list because:
-    - Troops move every frame, invalidating sorted order
-    - Linked list insertion would be O(n) per move vs O(n log n) once per frame
-    - Merge sort is stable, preserving relative order of same-Y troops
+    NOTE: we used to merge sort unique_troops every frame, now the arena keeps the troops bucketed by row while they spawn, move and die:
+    - Rows are bounded integers so a bucket per row is enough, no comparisons needed
+    - A move updates one bucket in O(1), most moves don't even change row
+    - Troops on the same row keep the order they entered it, like the stable merge sort kept the order of unique_troops
     """
-    # using the set() to get unique troops (avoid drawing same troop multiple times)
-    for troop in sort_for_visualization(arena.unique_troops, ascending_order=True):
+    for troop in arena.render_order:
         if troop.location is None:
             continue
 
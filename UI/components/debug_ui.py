@@ -57,3 +57,36 @@ def draw_attack_ranges(arena, tile_size, screen):
             aggro_center_y = aggro_range_pixels + 5
             pygame.draw.circle(aggro_surface, aggro_color, (aggro_center_x, aggro_center_y), aggro_range_pixels, 1)
             screen.blit(aggro_surface, (cell_center_x - aggro_center_x, cell_center_y - aggro_center_y))
+
+def draw_profiler_panel(profiler, screen, font, x, y, update_scheduler=None):
+    """
+    Draws the average time per frame of every profiled section and the average counters per frame,
+    plus the deferred work of the update scheduler when one is passed
+
+    - Time: Worst case = Average case = O(f * (s + c)) where f are the averaged frames, s the sections and c the counters
+    - Space: O(s + c) for the rendered lines
+    """
+    if not profiler.enabled:
+        return
+
+    frame_ms, section_ms, counters = profiler.averages()
+    lines = [f"frame {frame_ms:.2f} ms"]
+    for section, ms in section_ms.items():
+        lines.append(f"{section} {ms:.2f} ms")
+    for counter, amount in counters.items():
+        lines.append(f"{counter} {amount:.1f}")
+    if update_scheduler is not None and update_scheduler.enabled:
+        scheduler_stats = update_scheduler.stats()
+        lines.append(f"budget {scheduler_stats['budget_ms']:.1f} ms")
+        lines.append(f"deferred total {scheduler_stats['deferred_total']}")
+        lines.append(f"waiting troops {scheduler_stats['waiting_troops']}")
+
+    line_height = font.get_linesize()
+    panel_width = 220
+    panel_surface = pygame.Surface((panel_width, line_height * len(lines) + 10), pygame.SRCALPHA)
+    panel_surface.fill((0, 0, 0, 160)) # dark and semi-transparent so the arena is still visible
+    screen.blit(panel_surface, (x, y))
+
+    for index, line in enumerate(lines):
+        text_surface = font.render(line, True, (255, 255, 255))
+        screen.blit(text_surface, (x + 5, y + 5 + index * line_height))
@@ -27,22 +27,8 @@ class FinishBattleScreen:
         - Time: O(1) checks tower counts and creates buttons
         - Space: O(1) creates 2 buttons
         """
-        if 0 not in self.arena.towers_P1:
-            self.winner_team = 2
-            self.number_of_crowns = 3
-        elif 0 not in self.arena.towers_P2:
-            self.winner_team = 1
-            self.number_of_crowns = 3
-
-        elif len(self.arena.towers_P1) > len(self.arena.towers_P2):
-            self.winner_team = 1
-            self.number_of_crowns = 3 - len(self.arena.towers_P2)
-        elif len(self.arena.towers_P1) < len(self.arena.towers_P2):
-            self.winner_team = 2
-            self.number_of_crowns = 3 - len(self.arena.towers_P1)
-        else:
-            self.winner_team = 0
-            self.number_of_crowns = 3 - len(self.arena.towers_P1)
+        # same rules used by the headless simulation
+        self.winner_team, self.number_of_crowns = self.arena.get_match_result()
        
         # placing the buttons at the bottom of the screen next to each other with spacing
         button_width = 160
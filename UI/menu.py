@@ -16,15 +16,18 @@ NOTE: The 'selected' list uses a Python list instead of a dictionary because:
 - A dictionary would require additional key management for almost no performance benefit
 """
 
-def run_deck_builder(screen, asset_manager):
+def run_deck_builder(screen, asset_manager, rng=None):
     """
     Runs the deck builder UI - allows player to select 8 cards
+    rng: random generator for the auto fill and the returned deck (es the arena one), the random module if None
 
     - Time: Worst case O(c log c), Average case O(c) per frame where c is card count, plus O(c log c) for sorting when triggered
     - Space: O(c) for cards list + O(8) for selected deck
     """
     global average_elixir_cost
     average_elixir_cost = 0
+    if rng is None:
+        rng = random
     selected = []
 
     def calculate_average_elixir_cost():
@@ -84,7 +87,7 @@ def run_deck_builder(screen, asset_manager):
         - Space: O(s) for deck copy
         """
         if len(selected) == 8:
-            return Deck(selected.copy())
+            return Deck(selected.copy(), rng=rng)
         else:
             return None
 
@@ -95,17 +98,17 @@ def run_deck_builder(screen, asset_manager):
         - Time: Worst case O(8-s), Average case O(8-s) random selections where s is current selected size
         - Space: O(remaining) for temporary list of available cards
 
-        Uses random.choice for simplicity
+        Uses rng.choice for simplicity
         """
         if len(selected) < 8:
             temp_unique_cards = cards.copy()
             for card in selected:
                 temp_unique_cards.remove(card)
             for _ in range(8-len(selected)):
-                card = random.choice(temp_unique_cards)
+                card = rng.choice(temp_unique_cards)
                 add_card_to_deck(card)
                 temp_unique_cards.remove(card)
-            return Deck(selected.copy())
+            return Deck(selected.copy(), rng=rng)
         else:
             return None    
 
@@ -153,7 +156,7 @@ def run_deck_builder(screen, asset_manager):
                 btn_sort.is_clicked((mx, my))
                 btn_auto_fill.is_clicked((mx, my))
                 if len(selected) == 8 and btn_battle.is_clicked((mx, my)):
-                    return Deck(selected.copy())
+                    return Deck(selected.copy(), rng=rng)
                 
                 # click on deck (top) to remove
                 deck_x = (W - 4 * (CW + SP) + SP) // 2
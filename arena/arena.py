@@ -1,6 +1,23 @@
+import random
 from constants import *
 from typing import Tuple
+from core.ordered_set import OrderedSet
+from core.heap import BinaryHeap
+from core.profiler import profiled
+from arena.utils.pathfinding import find_path
 from arena.utils.random_utils import is_cell_in_bounds, is_walkable
+from arena.utils.flow_field import build_distance_field, walk_distance_field
+from arena.utils.clearance import build_clearance_map, update_clearance_map
+from arena.utils.path_cache import PathCache
+from arena.utils.grids import TerrainGrid, TroopTable, OccupancyGrid
+from arena.utils.spatial_index import SpatialIndex
+from arena.utils.render_order import RenderOrder
+from arena.utils.activity import ActivityScheduler
+from arena.utils.update_scheduler import UpdateScheduler
+from arena.utils.reservations import ReservationTable
+from arena.utils.hierarchical import NavigationGraph
+from arena.utils.line_path import find_line_path
+from arena.utils.target_bounds import get_target_bounds
 from arena.utils.creation import generate_tower, generate_river, generate_mock_bridges, mirror_arena
 
 
@@ -16,13 +33,13 @@ cell = (int, int) means (row, col) in a way (y,x)
 class Arena:
     """Fun fact: We are going to do all the logic in cells, the pixel management is done in the visualizer"""
 
-    def __init__(self, height): # in pixels == cells? num_cells = width / cell_size
+    def __init__(self, height, seed=None): # in pixels == cells? num_cells = width / cell_size
         """
         Initializes arena grid, towers, and bookkeeping structures
 
         - Time: Worst case = Average case = O(h * w) 
                 where h is height and w is width
-        - Space: O(h * w) for the grid storage
+        - Space: O(h * w) for the grid storage, one byte per cell for the terrain and four bytes per cell for each occupancy grid
         """
         # safety checks
         if MULTIPLIER_GRID_HEIGHT <= 0:
@@ -48,19 +65,40 @@ class Arena:
         - 2: water --> we also place water where the towers are supposed to be.
         - 3: bridge
         """
-        # default is grass
-        self.grid = [[GRASS for _ in range(self.width)] for _ in range(self.height)]
+        # default is grass, cells are stored in a flat bytearray but grid[row][col] still works
+        self.grid = TerrainGrid(self.height, self.width, fill=GRASS)
         self.towers_P1 = {} # dict key: tower_n value: tower_obj
         self.towers_P2 = {}
         self.game_finished = False
 
 
         """POST GENERATION"""
-        self.occupancy_grid = {} # dictionary of cells and ids of the troop inside of them (max one per cell) --> key: (row, col) value: id
-        self.occupancy_grid_flying = {} # dictionary of cells and ids of the troop inside of them (max one per cell) --> key: (row, col) value: id
-        self.unique_troops = set()
+        # flat arrays of troop ids (max one per cell), they can still be used like dictionaries --> key: (row, col) value: troop
+        self.troop_table = TroopTable() # id --> troop, shared by both grids
+        self.occupancy_grid = OccupancyGrid(self.height, self.width, self.troop_table)
+        self.occupancy_grid_flying = OccupancyGrid(self.height, self.width, self.troop_table)
+        self.unique_troops = OrderedSet() # insertion ordered so troops are updated in the same order every run
+        self.spatial_index = SpatialIndex(self.height, self.width) # buckets of troops by team and layer, used to find the closest enemy
+        self.render_order = RenderOrder(self.height) # troops bucketed by row, drawn top to bottom without sorting
+        self.activity = ActivityScheduler(self.height, self.width) # stationary units sleep until an enemy enters their trigger region
+        self.update_scheduler = UpdateScheduler() # per frame budget of the path searches, off by default (game_loop turns it on)
+        self.reservations = ReservationTable(self.height, self.width) # cells claimed by the walking troops for the next ticks
         self.frame_count = 0
 
+        # distance fields towards the towers, key: (tower cell type, width, height, is_flying) value: flat array of distances
+        # they only depend on the grid so they are rebuilt (lazily) only when a tower is removed
+        self.distance_fields = {}
+
+        # abstract graphs of the hierarchical pathfinding, key: (troop size, is_flying), also rebuilt only when a tower is removed
+        self.navigation_graphs = {}
+
+        # paths already searched, invalidated when the grid changes or a troop steps on them
+        self.path_cache = PathCache()
+
+        # biggest square of walkable cells with its top left corner in each cell, one for ground and one for flying troops
+        self.clearance_ground = build_clearance_map(self.grid, is_flying=False)
+        self.clearance_flying = build_clearance_map(self.grid, is_flying=True)
+
         self.asset_manager = None
         self.arena_background_dirty = True
 
@@ -69,6 +107,15 @@ class Arena:
 
         self.elixir_multiplier = 1.0
 
+        # scheduled troop events (attack windup, swing and hit), min-heap of (frame, sequence, troop, kind, token)
+        # the sequence keeps events of the same frame in scheduling order and the tuples never compare troops
+        self.events = BinaryHeap()
+        self.event_sequence = 0
+
+        # every random choice of the match goes through this generator, the same seed and inputs always give the same match
+        self.seed = seed
+        self.rng = random.Random(seed)
+
     def generate_towers(self):
         """
         Generates all player one towers in their base positions
@@ -123,6 +170,9 @@ class Arena:
         self.generate_towers()
         generate_mock_bridges(self.width, self.height, self, self.height_of_river)
         mirror_arena(self.height, self.width, self, self.asset_manager)
+
+        self.clearance_ground = build_clearance_map(self.grid, is_flying=False)
+        self.clearance_flying = build_clearance_map(self.grid, is_flying=True)
     
     """utils""" 
     def tick(self):
@@ -148,11 +198,90 @@ class Arena:
 
         return True
 
+    def update_troops(self):
+        """
+        Processes one game tick - marks the events scheduled for this frame and updates all troop movements (every TICK_RATE frames),
+        attackers waiting on their attack only run the event that came due
+
+        - Time: Worst case = Average case = O(n * (k + V + E)) where:
+            - n is the number of active troops
+            - For each troop: O(k) spatial index lookup for the closest enemy + O(V + E) pathfinding when the path is not cached
+            - V = h * w grid cells, E = up to 8V edges for 8-directional movement
+        - Space: O(V) per troop for path storage, O(n * V) total in worst case
+
+        NOTE: it lives in the arena and not in the game loop so that the headless simulation runs exactly the same update
+        NOTE: a waiting attacker runs its event at its place in the loop, the same place where the per tick check ran it
+        """
+        self.process_events()
+        if self.frame_count % TICK_RATE == 0:
+            self.update_scheduler.start_frame()
+            activity = self.activity
+            waiting_attackers = activity.waiting_attackers
+            for troop in list(self.unique_troops): # copy because troops die (and get removed) while we iterate
+                if troop in activity.sleeping:
+                    continue # stationary with nothing to attack, an enemy entering its trigger region wakes it up
+                if troop in waiting_attackers:
+                    if troop.due_event is None:
+                        continue # halfway through an attack, nothing happens until the next event
+                    troop.handle_event()
+                    if not troop.in_process_attack:
+                        activity.wake_attacker(troop) # the hit landed, the next tick starts a new attack
+                    continue
+                had_target = troop.is_targetting_something is not None
+                troop.move_to_tower()
+                # only after a tick that searched for a target and found nothing, a troop that just dropped its target searches on the next tick
+                if troop.raw_movement_speed == 0 and not had_target and troop.is_targetting_something is None:
+                    activity.sleep(troop)
+                elif troop.is_waiting_on_attack():
+                    activity.wait_on_attack(troop, troop.is_targetting_something)
+
+    def schedule_event(self, frame, troop, kind, token):
+        """
+        Schedules an event for a troop, troop.mark_event(kind, token) runs at the start of that frame
+
+        - Time: Worst case = Average case = O(log e) heap push where e are the scheduled events
+        - Space: O(1)
+        """
+        self.events.push((frame, self.event_sequence, troop, kind, token))
+        self.event_sequence += 1
+
+    def process_events(self):
+        """
+        Hands the events scheduled up to the current frame to their troops, before the troops update
+
+        - Time: Worst case = Average case = O(k log e) where k are the events of this frame, O(1) when nothing happens
+        - Space: O(1)
+
+        NOTE: the troop only marks the event, it takes effect during the update of the attacker (attack() or handle_event()) like the old per tick check,
+        running the hits here after all the updates changed who kills who and dropped the area damage of hits on targets already dead
+        """
+        events = self.events
+        while events and events.peek()[0] <= self.frame_count:
+            _, _, troop, kind, token = events.pop()
+            troop.mark_event(kind, token)
+
+    def get_match_result(self):
+        """
+        Returns (winner_team, number_of_crowns) of the current state of the match, winner_team is 0 for a draw
+
+        - Time: Worst case = Average case = O(1) checks tower counts
+        - Space: O(1)
+        """
+        if 0 not in self.towers_P1:
+            return 2, 3
+        if 0 not in self.towers_P2:
+            return 1, 3
+        if len(self.towers_P1) > len(self.towers_P2):
+            return 1, 3 - len(self.towers_P2)
+        if len(self.towers_P1) < len(self.towers_P2):
+            return 2, 3 - len(self.towers_P1)
+        return 0, 3 - len(self.towers_P1)
+
     def is_movable_cell(self, row, col, moving_troop=None, is_flying=False):
         """
         Checks if a troop can move into a given cell
 
-        - Time: Worst case = Average case = O(1) - because bounds check, grid lookup, and hash table lookup are all constant time.
+        - Time: Worst case = Average case = O(1) - because bounds check, grid lookup, and occupancy array lookup are all constant time.
         - Space: O(1)
         """
         if not is_cell_in_bounds((row, col), self.grid):
@@ -162,17 +291,47 @@ class Arena:
                 return False
 
         if moving_troop:
-            occupancy_grid = moving_troop.get_occupancy_grid()
-            if (row, col) in occupancy_grid and moving_troop != occupancy_grid[(row, col)]: # check if the cell is occupied by itself, this would mean it can move there
+            occupant = moving_troop.get_occupancy_grid().get((row, col))
+            if occupant is not None and moving_troop != occupant: # check if the cell is occupied by itself, this would mean it can move there
                 return False  
 
         return True
     
+    def is_surrounded(self, target, moving_troop):
+        """
+        True if moving_troop can't stand next to target because every cell around it is occupied or not walkable,
+        a search towards target considering the troops would then fail after visiting everything it can reach
+
+        - Time: Worst case = Average case = O((tw + th) * mw * mh) the ring around the target, each cell checked with the footprint of the moving troop
+        - Space: O(1)
+
+        NOTE: only for targets on the same layer of the moving troop, the target cells are then occupied by the target itself
+        """
+        target_row, target_col = target.location
+        min_row, min_col = target_row - 1, target_col - 1
+        max_row, max_col = target_row + target.height, target_col + target.width
+        start_row, start_col = moving_troop.location
+        if min_row <= start_row <= max_row and min_col <= start_col <= max_col:
+            return False # already next to it
+
+        is_flying = moving_troop.troop_can_fly
+        for row in range(min_row, max_row + 1):
+            for col in range(min_col, max_col + 1):
+                if min_row < row < max_row and min_col < col < max_col:
+                    continue # inside the target
+                if all(
+                    self.is_movable_cell(r, c, moving_troop=moving_troop, is_flying=is_flying)
+                    for r in range(row, row + moving_troop.height)
+                    for c in range(col, col + moving_troop.width)
+                ):
+                    return False
+        return True
+
     def is_placable_cell(self, row, col, team, moving_troop=None, is_flying=False):
         """
         Checks if a troop can be placed on a given cell for a specific team
 
-        - Time: Worst case = Average case = O(1) - because constant time checks on bounds, grid value, hash table, and tower dictionary.
+        - Time: Worst case = Average case = O(1) - because constant time checks on bounds, grid value, occupancy array, and tower dictionary.
         - Space: O(1)
         """
         if not is_cell_in_bounds((row, col), self.grid):
@@ -181,8 +340,8 @@ class Arena:
             return False
 
         if moving_troop:
-            occupancy_grid = moving_troop.get_occupancy_grid()
-            if (row, col) in occupancy_grid and moving_troop != occupancy_grid[(row, col)]: # check if the cell is occupied by itself, this would mean it can move there
+            occupant = moving_troop.get_occupancy_grid().get((row, col))
+            if occupant is not None and moving_troop != occupant: # check if the cell is occupied by itself, this would mean it can move there
                 return False  
 
         opponent_towers = self.towers_P2 if team == 1 else self.towers_P1
@@ -268,13 +427,88 @@ class Arena:
         
         return True
 
+    def get_clearance_map(self, is_flying=False):
+        """
+        Returns the clearance map for flying or ground troops
+
+        - Time: Worst case = Average case = O(1)
+        - Space: O(1) returns a reference
+        """
+        return self.clearance_flying if is_flying else self.clearance_ground
+
+    def get_distance_field(self, cell_type, width, height, is_flying=False):
+        """
+        Returns the distance field towards the cells of cell_type for a troop footprint, building it on first use
+
+        - Time: Worst case O(V * tw * th + V + E) when the field has to be built, Average case O(1) hash table lookup
+        - Space: O(V) per field, at most 6 tower types * footprints * 2 (ground and flying)
+        """
+        key = (cell_type, width, height, is_flying)
+        field = self.distance_fields.get(key)
+        if field is None:
+            field = build_distance_field(self.grid, cell_type, width, height, is_flying=is_flying, clearance=self.get_clearance_map(is_flying))
+            self.distance_fields[key] = field
+        return field
+
+    def get_navigation_graph(self, width, height, is_flying=False):
+        """
+        Returns the hierarchical pathfinding graph for a troop footprint, building it on first use
+
+        - Time: Worst case O(h * w / c) to scan the cluster borders when the graph has to be built, Average case O(1) hash table lookup
+        - Space: O(e) per graph where e are the entrances
+        """
+        key = (max(width, height), is_flying)
+        graph = self.navigation_graphs.get(key)
+        if graph is None:
+            graph = NavigationGraph(self.grid, self.get_clearance_map(is_flying), key[0])
+            self.navigation_graphs[key] = graph
+        return graph
+
+    @profiled("pathfinding")
+    def find_tower_path(self, troop, cell_type):
+        """
+        Path from the troop to the closest cell of a tower type ignoring other troops, same result of find_path_bfs(..., cell_type=cell_type) with empty grids
+
+        - Time: Worst case O(V + E) if the field has to be built or the troop is not on a valid position, Average case O(L) where L is the path length
+        - Space: O(L) for the path
+
+        NOTE: with many troops walking to the same few towers one shared reverse bfs is much cheaper than one search per troop
+        NOTE: flying troops first try the straight line to the tower, most of the time nothing is in the way and the field is never built
+        """
+        if troop.troop_can_fly:
+            bounds = get_target_bounds(troop, cell_type=cell_type)
+            path = find_line_path(troop.location, self.grid, {}, troop, bounds) if bounds is not None else None
+            if path is not None:
+                return path
+        if (cell_type, troop.width, troop.height, troop.troop_can_fly) not in self.distance_fields and not self.update_scheduler.allow_search(troop):
+            return None # building the field is a full bfs, over the frame budget we wait for the next frame
+        field = self.get_distance_field(cell_type, troop.width, troop.height, is_flying=troop.troop_can_fly)
+        path = walk_distance_field(field, self.grid, troop.location, cell_type)
+        if path is None:
+            # the troop is not on a position the field knows about (es towers), we fall back to a normal search
+            path = find_path(troop.location, self.grid, {}, {}, troop, cell_type=cell_type)
+        return path
+
+    def track_unit(self, troop):
+        """
+        Adds a unit that is already on the grid (es towers) to the arena bookkeeping, stationary units also get a trigger region
+
+        - Time: Worst case = Average case = O(b) where b is the number of spatial index buckets covered by the unit, O(b + r^2) for stationary units where r is the side of the trigger region
+        - Space: O(b)
+        """
+        self.unique_troops.add(troop)
+        self.spatial_index.insert(troop)
+        self.render_order.insert(troop)
+        if troop.raw_movement_speed == 0:
+            self.activity.register(troop)
+
     def spawn_unit(self, troop, cell: Tuple[int, int]):
         """
         Spawns a troop into the arena and marks all occupied cells
 
         - Time: Worst case = Average case = O(tw * th) 
                 where tw/th are troop width/height
-        - Space: O(tw * th) for occupied cells dictionary entries.
+        - Space: O(tw * th) for the occupied cells dictionary, the occupancy arrays are preallocated
         """
         if not is_cell_in_bounds(cell, self.grid):
             return False
@@ -300,7 +534,9 @@ class Arena:
             occupancy_grid = troop.get_occupancy_grid()
             occupancy_grid[occupied_cell] = troop # we set the troop in all the cells it occupies
             
-        self.unique_troops.add(troop)
+        self.track_unit(troop)
+        self.path_cache.invalidate_cells(occupied_cells, is_flying=troop.troop_can_fly)
+        self.activity.notify(troop, occupied_cells)
 
         return True
     
@@ -330,7 +566,7 @@ class Arena:
         occupancy_grid = troop.get_occupancy_grid()
 
         for cell in old_occupied_cells:
-            if cell in occupancy_grid and occupancy_grid[cell] == troop: # kind of unecessary double check but better be safe
+            if occupancy_grid.get(cell) == troop: # kind of unecessary double check but better be safe
                 occupancy_grid.pop(cell)
 
 
@@ -338,7 +574,13 @@ class Arena:
 
         for cell in new_occupied_cells:
             occupancy_grid[cell] = troop # we set the troop in all the cells it occupies
-        
+
+        self.path_cache.invalidate_cells(old_occupied_cells, is_flying=troop.troop_can_fly)
+        self.path_cache.invalidate_cells(new_occupied_cells, is_flying=troop.troop_can_fly)
+        self.spatial_index.move(troop)
+        self.render_order.move(troop)
+        self.activity.notify(troop, new_occupied_cells)
+        self.activity.wake_attackers_of(troop) # they check the range again
     
         return True
 
@@ -352,19 +594,28 @@ class Arena:
         """
         if troop in self.unique_troops:
             self.unique_troops.remove(troop)
+        self.spatial_index.remove(troop)
+        self.render_order.remove(troop)
+        self.activity.unregister(troop)
+        self.update_scheduler.forget(troop)
+        self.reservations.release(troop)
+        if troop.group is not None:
+            troop.group.remove(troop)
         occupied_cells = troop.occupied_cells()
         for cell in occupied_cells:
             occupancy_grid = troop.get_occupancy_grid()
-            if cell in occupancy_grid and occupancy_grid[cell] == troop: # kind of unecessary double check but better be safe
+            if occupancy_grid.get(cell) == troop: # kind of unecessary double check but better be safe
                 occupancy_grid.pop(cell)
+        self.troop_table.release(troop) # after the cells, they are looked up by id
+        self.path_cache.invalidate_cells(occupied_cells, is_flying=troop.troop_can_fly)
         return True
     
     def remove_tower(self, tower_troop):
         """
         Remove a tower from the occupancy grid (clean up all cells it occupies).
 
-        - Time: Worst case = Average case = O(tw * th)
-                where tw/th are tower width/height (looping over occupied cells)
+        - Time: Worst case O(V) for the clearance update, Average case O(tw * th + r * w)
+                where tw/th are tower width/height (looping over occupied cells) and r the rows of clearance that change
         - Space: O(tw * th) for the occupied_cells collection
         """
 
@@ -374,8 +625,12 @@ class Arena:
         if 0 in towers and tower_troop.tower_number != 0: # if it is 0 we are destroying the king tower so no need to activate it
             if not towers[0].is_active and towers[0].is_alive:
                 towers[0].is_active = True
+                self.activity.wake(towers[0])
 
         self.unique_troops.discard(tower_troop)
+        self.spatial_index.remove(tower_troop)
+        self.render_order.remove(tower_troop)
+        self.activity.unregister(tower_troop)
         occupied_cells = tower_troop.occupied_cells()
         if tower_troop.team == 1:
             self.towers_P1.pop(tower_troop.tower_number)
@@ -384,7 +639,7 @@ class Arena:
         
         for cell in occupied_cells:
             # clean up occupancy_grid
-            if cell in self.occupancy_grid and self.occupancy_grid[cell] == tower_troop:
+            if self.occupancy_grid.get(cell) == tower_troop:
                 self.occupancy_grid.pop(cell)
             
             # clean up grid for towers
@@ -393,8 +648,19 @@ class Arena:
                 # reset tower cells back to GRASS
                 if self.grid[row][col] in [TOWER_P1, TOWER_P2, TOWER_P1+1, TOWER_P2+1, TOWER_P1-1, TOWER_P2-1]:
                     self.grid[row][col] = GRASS
+        self.troop_table.release(tower_troop)
+
+        # only the cells above and left of the tower can get a bigger clearance
+        tower_row, tower_col = tower_troop.location
+        tower_bounds = (tower_row, tower_col, tower_row + tower_troop.height - 1, tower_col + tower_troop.width - 1)
+        update_clearance_map(self.clearance_ground, self.grid, tower_bounds, is_flying=False)
+        update_clearance_map(self.clearance_flying, self.grid, tower_bounds, is_flying=True)
         
         self.arena_background_dirty = True
+        self.distance_fields.clear() # the grid changed, the fields are rebuilt the next time they are needed
+        self.navigation_graphs.clear()
+        self.path_cache.bump_grid_version()
+        self.path_cache.invalidate_cells(occupied_cells, is_flying=False)
         if 0 not in self.towers_P1:
             self.game_finished = True
             return False
@@ -0,0 +1,164 @@
+from math import ceil
+
+"""
+Sleep/wake scheduling for stationary units (towers and anything with movement speed 0).
+A stationary unit without a target can only get one when an enemy comes close, so instead of updating it every tick
+it sleeps until an enemy steps inside its trigger region: its footprint expanded by its aggro range.
+
+The regions are stored in a bitmask map per team: one int per cell, bit i set means that the cell is in the region of the unit in slot i.
+spawn_unit and move_unit check the cells of the moving troop in the map of the other team, O(1) per cell.
+
+Attackers locked on a target in range wait in the same way between their attack events: only the target moving or dying
+changes what their update does, so move_unit and the removals wake the attackers of that troop.
+"""
+
+class ActivityScheduler:
+    """
+    Trigger regions and sleeping state of the stationary units of an arena
+    """
+    def __init__(self, height, width):
+        """
+        - Time: Worst case = Average case = O(h * w) to fill the maps
+        - Space: O(h * w) one int per cell for each team
+        """
+        self.height = height
+        self.width = width
+        self.trigger_maps = {1: [0] * (height * width), 2: [0] * (height * width)} # key: team of the stationary units
+        self.slots = [] # slot --> troop, None when free
+        self.free_slots = []
+        self.slot_of = {} # troop --> slot
+        self.sleeping = {} # dictionary used as an ordered set of the sleeping troops
+        self.waiting_attackers = {} # attacker --> target, attackers that only run their attack events
+        self.attackers_of = {} # target --> dictionary used as an ordered set of the attackers waiting on it
+        self.wake_ups = 0
+
+    def get_region(self, troop):
+        """
+        Bounds (min_row, min_col, max_row, max_col) of the trigger region of a troop clamped to the arena
+
+        - Time: Worst case = Average case = O(1)
+        - Space: O(1)
+
+        NOTE: the edge to edge distance between two troops is never smaller than their gap on the rows or on the columns,
+        so every cell that could be in range is inside the footprint expanded by the range on every side (plus one cell of margin)
+        """
+        reach = ceil(max(troop.attack_aggro_range, troop.attack_range)) + 1
+        row, col = troop.location
+        return (
+            max(0, row - reach),
+            max(0, col - reach),
+            min(self.height - 1, row + troop.height - 1 + reach),
+            min(self.width - 1, col + troop.width - 1 + reach),
+        )
+
+    def register(self, troop):
+        """
+        Gives a slot to a stationary troop and marks its trigger region, the troop starts awake
+
+        - Time: Worst case = Average case = O(r^2) where r is the side of the region
+        - Space: O(1) the map is preallocated
+        """
+        if troop in self.slot_of:
+            return
+        slot = self.free_slots.pop() if self.free_slots else len(self.slots)
+        if slot == len(self.slots):
+            self.slots.append(troop)
+        else:
+            self.slots[slot] = troop
+        self.slot_of[troop] = slot
+        self._mark_region(troop, 1 << slot)
+
+    def unregister(self, troop):
+        """
+        Frees the slot of a troop and clears its region, and wakes the attackers waiting on it (when it dies)
+
+        - Time: Worst case = Average case = O(r^2 + k) where k are its waiting attackers
+        - Space: O(1)
+        """
+        self.wake_attacker(troop)
+        self.wake_attackers_of(troop)
+        slot = self.slot_of.pop(troop, None)
+        if slot is None:
+            return
+        self._mark_region(troop, 1 << slot, clear=True)
+        self.slots[slot] = None
+        self.free_slots.append(slot)
+        self.sleeping.pop(troop, None)
+
+    def _mark_region(self, troop, bit, clear=False):
+        trigger_map = self.trigger_maps[troop.team]
+        min_row, min_col, max_row, max_col = self.get_region(troop)
+        for row in range(min_row, max_row + 1):
+            base = row * self.width
+            for index in range(base + min_col, base + max_col + 1):
+                if clear:
+                    trigger_map[index] &= ~bit
+                else:
+                    trigger_map[index] |= bit
+
+    def sleep(self, troop):
+        """Puts a registered troop to sleep, O(1) time"""
+        if troop in self.slot_of:
+            self.sleeping[troop] = None
+
+    def wake(self, troop):
+        """Wakes a troop up (es the king tower when it gets activated), O(1) time"""
+        if troop in self.sleeping:
+            del self.sleeping[troop]
+            self.wake_ups += 1
+
+    def is_sleeping(self, troop):
+        return troop in self.sleeping
+
+    def notify(self, troop, cells):
+        """
+        A troop entered some cells, wakes up the sleeping enemy units whose region contains one of them
+
+        - Time: Worst case = Average case = O(c) where c are the cells, plus O(k) for the k units woken up
+        - Space: O(1)
+        """
+        if not self.sleeping:
+            return
+        enemy_team = 2 if troop.team == 1 else 1
+        trigger_map = self.trigger_maps[enemy_team]
+        width = self.width
+        for row, col in cells:
+            if not (0 <= row < self.height and 0 <= col < width):
+                continue
+            mask = trigger_map[row * width + col]
+            while mask:
+                lowest_bit = mask & -mask
+                mask ^= lowest_bit
+                unit = self.slots[lowest_bit.bit_length() - 1]
+                if unit in self.sleeping:
+                    del self.sleeping[unit]
+                    self.wake_ups += 1
+
+    def wait_on_attack(self, troop, target):
+        """Skips the updates of an attacker until its next attack event or until its target moves or dies, O(1) time"""
+        self.waiting_attackers[troop] = target
+        self.attackers_of.setdefault(target, {})[troop] = None
+
+    def wake_attacker(self, troop):
+        """Gives an attacker back its update on every tick, O(1) time"""
+        target = self.waiting_attackers.pop(troop, None)
+        if target is None:
+            return
+        attackers = self.attackers_of[target]
+        del attackers[troop]
+        if not attackers:
+            del self.attackers_of[target]
+
+    def wake_attackers_of(self, target):
+        """
+        A troop moved or died, the attackers waiting on it update again to check the range or pick a new target
+
+        - Time: Worst case = Average case = O(k) where k are its waiting attackers
+        - Space: O(1)
+        """
+        attackers = self.attackers_of.pop(target, None)
+        if attackers is None:
+            return
+        for troop in attackers:
+            del self.waiting_attackers[troop]
+        self.wake_ups += len(attackers)
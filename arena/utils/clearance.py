@@ -0,0 +1,101 @@
+from array import array
+from constants import *
+
+"""
+The clearance of a cell is the side of the biggest square of walkable cells that has that cell as top left corner,
+a troop of width x height fits on a cell if the square is at least max(width, height) big, so one lookup replaces tw*th checks.
+Values are stored in a flat array at index row * width + col, cells outside the grid count as 0.
+"""
+
+def compute_clearance(clearance, grid, allowed_cells, row, col):
+    """
+    Clearance of one cell from the already computed cells below and to the right
+
+    - Time: Worst case = Average case = O(1)
+    - Space: O(1)
+    """
+    if grid[row][col] not in allowed_cells:
+        return 0
+
+    grid_height = len(grid)
+    grid_width = len(grid[0])
+    below = clearance[(row + 1) * grid_width + col] if row + 1 < grid_height else 0
+    right = clearance[row * grid_width + col + 1] if col + 1 < grid_width else 0
+    diagonal = clearance[(row + 1) * grid_width + col + 1] if row + 1 < grid_height and col + 1 < grid_width else 0
+    return 1 + min(below, right, diagonal)
+
+def build_clearance_map(grid, is_flying=False):
+    """
+    Builds the clearance of every cell with dynamic programming from the bottom right corner
+
+    - Time: Worst case = Average case = O(V) where V is h*w grid cells, each cell looks at 3 neighbors
+    - Space: O(V) two bytes per cell
+    """
+    allowed_cells = flyable_cells if is_flying else walkable_cells
+    grid_height = len(grid)
+    grid_width = len(grid[0])
+    clearance = array('H', [0]) * (grid_height * grid_width)
+
+    for row in range(grid_height - 1, -1, -1):
+        for col in range(grid_width - 1, -1, -1):
+            clearance[row * grid_width + col] = compute_clearance(clearance, grid, allowed_cells, row, col)
+
+    return clearance
+
+def update_clearance_map(clearance, grid, changed_bounds, is_flying=False):
+    """
+    Updates the clearance after the cells inside changed_bounds (min_row, min_col, max_row, max_col) changed type
+
+    - Time: Worst case O(V), Average case O(r * w) where r is the number of rows until the values stop changing
+    - Space: O(1) the map is updated in place
+
+    NOTE: a cell only depends on the cells below and to the right, so only cells above and left of the change can be affected,
+    once a whole row above the change comes out the same nothing above it can change either and we stop
+    """
+    allowed_cells = flyable_cells if is_flying else walkable_cells
+    grid_width = len(grid[0])
+    min_row, _, max_row, max_col = changed_bounds
+    max_row = min(max_row, len(grid) - 1)
+    max_col = min(max_col, grid_width - 1)
+
+    for row in range(max_row, -1, -1):
+        row_changed = False
+        for col in range(max_col, -1, -1):
+            value = compute_clearance(clearance, grid, allowed_cells, row, col)
+            index = row * grid_width + col
+            if clearance[index] != value:
+                clearance[index] = value
+                row_changed = True
+
+        if row < min_row and not row_changed:
+            break
+
+    return clearance
+
+def footprint_fits(clearance, grid, row, col, width, height, is_flying=False):
+    """
+    Checks if a troop of width x height with top left corner in (row, col) is fully in bounds and on walkable cells
+
+    - Time: Worst case O(tw * th) only for non square troops in the uncertain range, Average case O(1) one lookup
+    - Space: O(1)
+    """
+    grid_height = len(grid)
+    grid_width = len(grid[0])
+    if not (0 <= row < grid_height and 0 <= col < grid_width):
+        return False
+
+    size = clearance[row * grid_width + col]
+    if size >= width and size >= height:
+        return True
+    if size < width and size < height:
+        return False
+
+    # non square troop, the square tells us nothing for sure so we check the cells
+    if row + height > grid_height or col + width > grid_width:
+        return False
+    allowed_cells = flyable_cells if is_flying else walkable_cells
+    for r in range(row, row + height):
+        for c in range(col, col + width):
+            if grid[r][c] not in allowed_cells:
+                return False
+    return True
@@ -80,7 +80,7 @@ def generate_tower(
     if tower_type == 0: # deactivate the middle tower 
         tower.is_active = False
 
-    arena.unique_troops.add(tower)
+    arena.track_unit(tower)
     if team == 1:
         arena.towers_P1[tower_type] = tower
     else:
@@ -187,7 +187,7 @@ def mirror_arena(height, width, arena, asset_manager, team=2):
                     if (row_offset == 0 or row_offset == tower.height - 1 or col_offset == 0 or col_offset == tower.width - 1) and (col_offset % GAP_BETWEEN_TOWER_CELLS == 0 or row_offset % GAP_BETWEEN_TOWER_CELLS == 0):
                         arena.occupancy_grid[cell] = mirrored_tower
         
-        arena.unique_troops.add(mirrored_tower)
+        arena.track_unit(mirrored_tower)
         if team == 1:
             arena.towers_P1[tower_type] = mirrored_tower
         else:
@@ -0,0 +1,125 @@
+import heapq
+from math import inf
+from constants import *
+from core.node import Node
+from core.linked_list import reconstruct_path
+from arena.utils.grids import OccupancyGrid
+from core.profiler import profiler
+from arena.utils.find_path_bfs import get_valid_neighbors
+from arena.utils.target_bounds import get_target_bounds, octile_distance
+
+"""
+A* works on the same graph as find_path_bfs: every move (also diagonal) costs exactly 1 step,
+so the octile distance with diagonal cost 1 (which is the chebyshev distance) is the tightest heuristic that never overestimates.
+With a real octile cost of sqrt(2) A* would return paths that are longer than the bfs ones.
+"""
+
+def find_path_astar(start, grid, collision_grid, target_grid, self_troop, goal_cell=None, cell_type=None, one_tile_range=True, include_diagonals=True, max_radius=None, max_expansions=None):
+    """
+    A* pathfinding, drop in alternative of find_path_bfs (same arguments, paths of the same length)
+
+    collision_grid: Used for obstacle avoidance (based on moving troop's type)
+    target_grid: Used for finding the target (based on target's type)
+    goal_cell = the specific (row, col) of the cell we want to find
+    cell_type = find closest cell of this type (or this troop) and the path to it
+    max_radius = cells further than this (chebyshev distance) from start are never visited, None means no limit
+    max_expansions = the search stops after expanding this many cells, None means no limit
+
+    - Time: Worst case O((V + E) log V) where V is h*w grid cells and E up to 8*V, Average case much lower because the heuristic only expands cells towards the target,
+            with the bounds at most O(min(r^2, n) log n) where r is max_radius and n is max_expansions
+    - Space: O(V) for the best cost dictionary and the heap
+
+    NOTE: cells next to the target are pushed as "arrived" entries with cost g + 1 instead of returning straight away like the bfs does,
+    with a weighted queue the first arrival found is not always the shortest one, the first one popped is
+    NOTE: when a bound stops the search we return the path to the visited cell closest to the target (best effort, the troop walks it and searches again),
+    None if no visited cell is closer than the start
+    """
+    if cell_type and goal_cell:
+        raise ValueError("Either cell_type or goal_cell need to have a value, not both")
+    if not cell_type and not goal_cell:
+        raise ValueError("Either cell_type or goal_cell need to have a value, neither is set")
+
+    bounds = get_target_bounds(self_troop, goal_cell=goal_cell, cell_type=cell_type)
+
+    # when the target grid is an occupancy grid we compare the target id on the flat array instead of going through (row, col) keys
+    target_ids = target_grid.ids if isinstance(target_grid, OccupancyGrid) else None
+    target_id = getattr(cell_type, "occupancy_id", 0) or -1 # a tower cell type has no id, -1 never matches
+    grid_width = len(grid[0])
+
+    def is_goal(cell):
+        if cell_type and grid[cell[0]][cell[1]] == cell_type:
+            return True
+        if goal_cell and cell == goal_cell:
+            return True
+        if target_ids is not None:
+            return target_ids[cell[0] * grid_width + cell[1]] == target_id
+        return cell in target_grid and target_grid[cell] == cell_type
+
+    def heuristic(cell):
+        if bounds is None:
+            return 0 # without a target box A* becomes a dijkstra, still correct
+        return octile_distance(cell, bounds)
+
+    if is_goal(start):
+        return [start]
+
+    start_h = heuristic(start)
+    start_node = Node(start, None)
+    # heap entries: (f, h, counter, g, node, arrived) the h and counter break ties, prefering cells closer to the target
+    heap = [(start_h, start_h, 0, 0, start_node, False)]
+    best_cost = {start: 0}
+    counter = 1
+
+    closest_node, closest_h = start_node, start_h # visited cell closest to the target, used for the partial path when a bound is hit
+    bound_hit = False
+
+    expanded = 0 # cells taken out of the heap (old entries excluded), reported to the profiler
+    try:
+        while heap:
+            _, h, _, cost, current_node, arrived = heapq.heappop(heap)
+
+            if arrived:
+                return reconstruct_path(current_node)
+
+            current = current_node.value
+            if cost > best_cost.get(current, inf):
+                continue # old entry, we already found a cheaper way to this cell
+            if max_expansions is not None and expanded >= max_expansions:
+                bound_hit = True
+                break
+            expanded += 1
+            if h < closest_h:
+                closest_node, closest_h = current_node, h
+
+            if not one_tile_range and is_goal(current):
+                return reconstruct_path(current_node)
+
+            neighbors = get_valid_neighbors(current, grid, collision_grid, self_troop, include_non_walkable=one_tile_range, include_diagonals=include_diagonals)
+
+            for neighbor in neighbors:
+                is_valid = neighbor[2]
+                neighbor = (neighbor[0], neighbor[1])
+                new_cost = cost + 1
+
+                if one_tile_range and is_goal(neighbor):
+                    heapq.heappush(heap, (new_cost, 0, counter, new_cost, Node(neighbor, current_node), True))
+                    counter += 1
+                    continue
+
+                if max_radius is not None and max(abs(neighbor[0] - start[0]), abs(neighbor[1] - start[1])) > max_radius:
+                    bound_hit = True
+                    continue
+
+                if is_valid and new_cost < best_cost.get(neighbor, inf):
+                    best_cost[neighbor] = new_cost
+                    h = heuristic(neighbor)
+                    heapq.heappush(heap, (new_cost + h, h, counter, new_cost, Node(neighbor, current_node), False))
+                    counter += 1
+
+        if bound_hit:
+            profiler.count("search_bound_hits")
+            if closest_node is not start_node:
+                return reconstruct_path(closest_node)
+        return None # meaning couldn't find any path
+    finally:
+        profiler.count("nodes_expanded", expanded)
@@ -1,15 +1,18 @@
 from arena.utils.random_utils import is_walkable
 from arena.utils.random_utils import is_cell_in_bounds
-from core.linked_list import reconstruct_path, insert
-from core.node import Node
-from core.queue import Queue # We are using the implementation from core, not deque library
+from arena.utils.clearance import footprint_fits
+from arena.utils.grids import OccupancyGrid
+from arena.utils.target_bounds import get_target_bounds, octile_distance
+from core.profiler import profiler
+from core.parent_array import ParentArray, UNVISITED
+from core.ring_queue import RingQueue # We are using the implementation from core, not deque library
 
 # we modified this function to take into account the width of the troop so that we can check if the path is valid for the troop if it isn't 1 sized
 def get_valid_neighbors(cell: (int, int), grid, collision_grid, self_troop, include_non_walkable=False, include_diagonals=False):
     """
     Gets valid neighboring cells for pathfinding, accounting for troop size
 
-    - Time: Worst case = Average case = O(d * tw * th) where d is directions 4 or 8 and tw/th are troop dimensions
+    - Time: Worst case = Average case = O(d) where d is directions 4 or 8 using the arena clearance map, O(d * tw * th) with a collision grid or without clearance map
     - Space: O(d)
     """
     if include_diagonals:
@@ -18,25 +21,53 @@ def get_valid_neighbors(cell: (int, int), grid, collision_grid, self_troop, incl
     else:
         # these are the 4 directions --> up, down, left, right
         directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-    
+
+    # the clearance map tells us with one lookup if the whole troop fits on walkable cells, it only describes the arena grid
+    arena = self_troop.arena
+    clearance = arena.get_clearance_map(is_flying=self_troop.troop_can_fly) if arena is not None and grid is arena.grid else None
+    grid_height = len(grid)
+    grid_width = len(grid[0])
+    troop_size = max(self_troop.width, self_troop.height)
+    # occupancy grids are checked on their flat id array, other dictionaries through their (row, col) keys
+    collision_ids = collision_grid.ids if isinstance(collision_grid, OccupancyGrid) else None
+    own_id = self_troop.occupancy_id
+
     neighbors = []
 
     for direction in directions:
         row = cell[0] + direction[0]
         col = cell[1] + direction[1]
 
-        all_cells_valid = True
-        for r in range(row, row + self_troop.height):
-            for c in range(col, col + self_troop.width):
-                if not is_cell_in_bounds((r, c), grid):
-                    all_cells_valid = False
-                    break
-                if not is_walkable(r, c, grid, is_flying=self_troop.troop_can_fly):
-                    all_cells_valid = False
-                    break
-                if ((r, c) in collision_grid and collision_grid[(r, c)] != self_troop):
-                    all_cells_valid = False
-                    break
+        if clearance is not None:
+            if 0 <= row < grid_height and 0 <= col < grid_width and clearance[row * grid_width + col] >= troop_size:
+                all_cells_valid = True
+            else:
+                all_cells_valid = footprint_fits(clearance, grid, row, col, self_troop.width, self_troop.height, is_flying=self_troop.troop_can_fly)
+
+            if all_cells_valid and collision_grid:
+                for r in range(row, row + self_troop.height):
+                    for c in range(col, col + self_troop.width):
+                        if collision_ids is not None:
+                            occupant_id = collision_ids[r * grid_width + c]
+                            blocked = occupant_id != 0 and occupant_id != own_id
+                        else:
+                            blocked = (r, c) in collision_grid and collision_grid[(r, c)] != self_troop
+                        if blocked:
+                            all_cells_valid = False
+                            break
+        else:
+            all_cells_valid = True
+            for r in range(row, row + self_troop.height):
+                for c in range(col, col + self_troop.width):
+                    if not is_cell_in_bounds((r, c), grid):
+                        all_cells_valid = False
+                        break
+                    if not is_walkable(r, c, grid, is_flying=self_troop.troop_can_fly):
+                        all_cells_valid = False
+                        break
+                    if ((r, c) in collision_grid and collision_grid[(r, c)] != self_troop):
+                        all_cells_valid = False
+                        break
 
         # we need the include_non_walkable to find path that is 1 away to something unwalkable, es towers
         if all_cells_valid:
@@ -49,7 +80,7 @@ def get_valid_neighbors(cell: (int, int), grid, collision_grid, self_troop, incl
     return neighbors
 
 
-def find_path_bfs(start, grid, collision_grid, target_grid, self_troop, goal_cell=None, cell_type=None, one_tile_range=True, include_diagonals=True): # one tile range means we are going to check for adiencent impossible to reach points
+def find_path_bfs(start, grid, collision_grid, target_grid, self_troop, goal_cell=None, cell_type=None, one_tile_range=True, include_diagonals=True, max_radius=None, max_expansions=None): # one tile range means we are going to check for adiencent impossible to reach points
     """
     BFS pathfinding to find shortest path to goal or nearest cell of type
 
@@ -57,68 +88,111 @@ def find_path_bfs(start, grid, collision_grid, target_grid, self_troop, goal_cel
     target_grid: Used for finding the target (based on target's type)
     goal_cell = the specific (row, col) of the cell we want to find
     cell_type = find closest cell of this type and the path to it
+    max_radius = cells further than this (chebyshev distance) from start are never visited, None means no limit
+    max_expansions = the search stops after expanding this many cells, None means no limit
 
-    - Time: Worst case = Average case = O(V + E) where V is vertices h*w grid cells and E is edges up to 8*V for 8 directional
-    - Space: O(V) for visited set and queue may visit all cells in worst case
+    - Time: Worst case = Average case = O(V + E) where V is vertices h*w grid cells and E is edges up to 8*V for 8 directional, O(min(r^2, n)) with the bounds
+    - Space: O(V) for the parent array (one int per cell) and the ring queue
     
     This implementation is better than a DFS because it guarantees the shortest path
+    NOTE: the queue holds flat cell indices and the parents are an int array, a search doesn't allocate a Node per visited cell anymore
+    NOTE: when a bound stops the search we return the path to the visited cell closest to the target (best effort), None if no visited cell is closer than the start
     """
     if cell_type and goal_cell: # xor opearor 
         raise ValueError("Either cell_type or goal_cell need to have a value, not both")
     if not cell_type and not goal_cell:
         raise ValueError("Either cell_type or goal_cell need to have a value, neither is set")
 
-    # queue holds tuples: (current_tile, path_list)
-    # we start at 'start', and the path contains just ['start']
-    queue = Queue()
-    start_node = Node(start, None) # this one is a Node used for the linked list not for the queue itself, it is added to the queue as a if it was a value
-    queue.enqueue(start_node)
-
-    # we keep track of seen tiles to not incur in loops
-    visited = set()
-    visited.add(start)
-
-    # while our list isn't empty
-    while not queue.is_empty():
-        # get the first node from queue
-        current_node = queue.dequeue()
-        curr_row, curr_col = current_node.value
-
-        if cell_type and grid[curr_row][curr_col] == cell_type:
-            # found the cell type that we wanted (edge case: if we somehow start on the target cell type)
-            return reconstruct_path(current_node)
-        elif goal_cell and (curr_row, curr_col) == goal_cell:
-            # found the specific cell that we wanted
-            return reconstruct_path(current_node)
+    grid_height = len(grid)
+    grid_width = len(grid[0])
+
+    # queue holds the flat index (row * width + col) of the cells to expand, every cell is enqueued at most once
+    queue = RingQueue(grid_height * grid_width)
+    start_index = start[0] * grid_width + start[1]
+    queue.enqueue(start_index)
+
+    # the parent of every visited cell, we keep track of seen tiles to not incur in loops and walk the parents back for the path
+    parents = ParentArray(grid_height, grid_width)
+    parents.visit(start_index)
+    parent_links = parents.parents # the hot loop reads and writes the int array directly
+
+    # when the target grid is an occupancy grid we compare the target id on the flat array instead of going through (row, col) keys
+    target_ids = target_grid.ids if isinstance(target_grid, OccupancyGrid) else None
+    target_id = getattr(cell_type, "occupancy_id", 0) or -1 # a tower cell type has no id, -1 never matches
+
+    # visited cell closest to the target, used for the partial path when a bound is hit
+    bounds = get_target_bounds(self_troop, goal_cell=goal_cell, cell_type=cell_type) if max_radius is not None or max_expansions is not None else None
+    closest_index = start_index
+    closest_distance = octile_distance(start, bounds) if bounds is not None else 0
+    bound_hit = False
+
+    expanded = 0 # nodes taken out of the queue, reported to the profiler
+    try:
+        # while our list isn't empty
+        while not queue.is_empty():
+            # get the first node from queue
+            current_index = queue.dequeue()
+            if max_expansions is not None and expanded >= max_expansions:
+                bound_hit = True
+                break
+            expanded += 1
+            curr_row, curr_col = divmod(current_index, grid_width)
+            if bounds is not None:
+                distance = octile_distance((curr_row, curr_col), bounds)
+                if distance < closest_distance:
+                    closest_index, closest_distance = current_index, distance
+
+            if cell_type and grid[curr_row][curr_col] == cell_type:
+                # found the cell type that we wanted (edge case: if we somehow start on the target cell type)
+                return parents.reconstruct_path(current_index)
+            elif goal_cell and (curr_row, curr_col) == goal_cell:
+                # found the specific cell that we wanted
+                return parents.reconstruct_path(current_index)
         
-        if (curr_row, curr_col) in target_grid and target_grid[(curr_row, curr_col)] == cell_type:
-            return reconstruct_path(current_node)
+            if target_ids is not None:
+                if target_ids[current_index] == target_id:
+                    return parents.reconstruct_path(current_index)
+            elif (curr_row, curr_col) in target_grid and target_grid[(curr_row, curr_col)] == cell_type:
+                return parents.reconstruct_path(current_index)
         
-        neighbors = get_valid_neighbors((curr_row, curr_col), grid, collision_grid, self_troop, include_non_walkable=one_tile_range, include_diagonals=include_diagonals)
+            neighbors = get_valid_neighbors((curr_row, curr_col), grid, collision_grid, self_troop, include_non_walkable=one_tile_range, include_diagonals=include_diagonals)
 
-        # we loop each neighbor
-        for neighbor in neighbors:
-            is_valid = neighbor[2]
-            neighbor = (neighbor[0], neighbor[1])
+            # we loop each neighbor
+            for neighbor in neighbors:
+                is_valid = neighbor[2]
+                neighbor = (neighbor[0], neighbor[1])
+                neighbor_index = neighbor[0] * grid_width + neighbor[1]
 
-            # if it is in visited then we skip it
-            if not (neighbor in visited):
+                # if it is in visited then we skip it
+                if parent_links[neighbor_index] == UNVISITED:
                 
-                if one_tile_range:
-                    if (cell_type and grid[neighbor[0]][neighbor[1]] == cell_type): # sometimes the cell type will be of a class so it will not be in this grid but in the others, for comodity we check if it is in the grid and then if it is the same type eitherway enabling a bit more flexibility for possible changes in the future
-                        return reconstruct_path(Node(neighbor, current_node))
-
-                    if goal_cell and (neighbor[0], neighbor[1]) == goal_cell:
-                        return reconstruct_path(Node(neighbor, current_node))
-
-                    if neighbor in target_grid and target_grid[neighbor] == cell_type:
-                        return reconstruct_path(Node(neighbor, current_node))
-                
-                # so that we don't visit it in the future
-                if is_valid:
-                    visited.add(neighbor)
-                    new_last_node = insert(current_node, neighbor) # use this instead of line below
-                    queue.enqueue(new_last_node)
+                    if one_tile_range:
+                        if (cell_type and grid[neighbor[0]][neighbor[1]] == cell_type): # sometimes the cell type will be of a class so it will not be in this grid but in the others, for comodity we check if it is in the grid and then if it is the same type eitherway enabling a bit more flexibility for possible changes in the future
+                            return parents.reconstruct_path(current_index) + [neighbor]
+
+                        if goal_cell and (neighbor[0], neighbor[1]) == goal_cell:
+                            return parents.reconstruct_path(current_index) + [neighbor]
+
+                        if target_ids is not None:
+                            if target_ids[neighbor_index] == target_id:
+                                return parents.reconstruct_path(current_index) + [neighbor]
+                        elif neighbor in target_grid and target_grid[neighbor] == cell_type:
+                            return parents.reconstruct_path(current_index) + [neighbor]
                 
-    return None # meaning couldn't find any path
-            
\ No newline at end of file
+                    if max_radius is not None and max(abs(neighbor[0] - start[0]), abs(neighbor[1] - start[1])) > max_radius:
+                        bound_hit = True
+                        continue
+
+                    # so that we don't visit it in the future
+                    if is_valid:
+                        parent_links[neighbor_index] = current_index
+                        queue.enqueue(neighbor_index)
+
+        if bound_hit:
+            profiler.count("search_bound_hits")
+            if closest_index != start_index:
+                return parents.reconstruct_path(closest_index)
+        return None # meaning couldn't find any path
+    finally:
+        profiler.count("nodes_expanded", expanded)
+            
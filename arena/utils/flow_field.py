@@ -0,0 +1,122 @@
+from array import array
+from constants import *
+from core.ring_queue import RingQueue
+from arena.utils.clearance import footprint_fits
+
+"""
+A distance field (flow field) stores for every cell the number of steps needed to reach the closest cell of a type,
+it is built once with a reverse bfs starting from the target and then every troop just walks down the values.
+Cells are stored in a flat array at index row * width + col, -1 means that the target can't be reached from there.
+"""
+
+directions = [(-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (1, 1), (-1, 1), (1, -1)] # same order as get_valid_neighbors
+
+def build_valid_positions(grid, width, height, is_flying=False, clearance=None):
+    """
+    Marks the top left cells where a troop of width x height can stand (all its cells in bounds and walkable)
+
+    - Time: Worst case = Average case = O(V) with the clearance map, O(V * tw * th) without it, where V is h*w grid cells and tw/th are troop dimensions
+    - Space: O(V) one byte per cell
+    """
+    allowed_cells = flyable_cells if is_flying else walkable_cells
+    grid_height = len(grid)
+    grid_width = len(grid[0])
+    valid = bytearray(grid_height * grid_width)
+
+    for row in range(grid_height - height + 1):
+        for col in range(grid_width - width + 1):
+            if clearance is not None:
+                all_cells_valid = footprint_fits(clearance, grid, row, col, width, height, is_flying=is_flying)
+            else:
+                all_cells_valid = True
+                for r in range(row, row + height):
+                    for c in range(col, col + width):
+                        if grid[r][c] not in allowed_cells:
+                            all_cells_valid = False
+                            break
+                    if not all_cells_valid:
+                        break
+            if all_cells_valid:
+                valid[row * grid_width + col] = 1
+
+    return valid
+
+def build_distance_field(grid, cell_type, width, height, is_flying=False, clearance=None):
+    """
+    Builds the distance field towards the cells of cell_type for a troop of width x height
+    The value of a position is the length of the path that find_path_bfs would return minus 1 (the number of moves)
+
+    - Time: Worst case = Average case = O(V + E) valid positions (O(V * tw * th) without clearance map) plus one reverse bfs, E is up to 8*V
+    - Space: O(V) for the field, the valid positions and the queue
+
+    NOTE: the bfs is multi source, every position that is one step away from a target cell starts with distance 1,
+    moves are symmetric (if we can go from a to b we can also go from b to a) so the reverse search gives the forward distances
+    """
+    grid_height = len(grid)
+    grid_width = len(grid[0])
+    valid = build_valid_positions(grid, width, height, is_flying=is_flying, clearance=clearance)
+    field = array('i', [-1]) * (grid_height * grid_width)
+    queue = RingQueue(grid_height * grid_width) # every position is enqueued at most once, the buffer never grows
+
+    for row in range(grid_height):
+        for col in range(grid_width):
+            index = row * grid_width + col
+            if not valid[index]:
+                continue
+            for d_row, d_col in directions:
+                r, c = row + d_row, col + d_col
+                if 0 <= r < grid_height and 0 <= c < grid_width and grid[r][c] == cell_type:
+                    field[index] = 1
+                    queue.enqueue(index)
+                    break
+
+    while not queue.is_empty():
+        index = queue.dequeue()
+        row, col = divmod(index, grid_width)
+        next_distance = field[index] + 1
+        for d_row, d_col in directions:
+            r, c = row + d_row, col + d_col
+            if 0 <= r < grid_height and 0 <= c < grid_width:
+                neighbor_index = r * grid_width + c
+                if valid[neighbor_index] and field[neighbor_index] == -1:
+                    field[neighbor_index] = next_distance
+                    queue.enqueue(neighbor_index)
+
+    return field
+
+def walk_distance_field(field, grid, start, cell_type):
+    """
+    Follows the distance field downhill from start, returns the same kind of path of find_path_bfs (start and target cell included)
+    Returns None if the target can't be reached from start
+
+    - Time: Worst case = Average case = O(L) where L is the path length, 8 checks per step
+    - Space: O(L) for the path
+    """
+    grid_height = len(grid)
+    grid_width = len(grid[0])
+    row, col = start
+    if not (0 <= row < grid_height and 0 <= col < grid_width):
+        return None
+
+    distance = field[row * grid_width + col]
+    if distance == -1:
+        return None
+
+    path = [start]
+    while distance > 1:
+        for d_row, d_col in directions:
+            r, c = row + d_row, col + d_col
+            if 0 <= r < grid_height and 0 <= c < grid_width and field[r * grid_width + c] == distance - 1:
+                row, col = r, c
+                break
+        distance -= 1
+        path.append((row, col))
+
+    # last step goes inside the target like the bfs does with one_tile_range
+    for d_row, d_col in directions:
+        r, c = row + d_row, col + d_col
+        if 0 <= r < grid_height and 0 <= c < grid_width and grid[r][c] == cell_type:
+            path.append((r, c))
+            return path
+
+    return None # the field is outdated, the caller should rebuild it
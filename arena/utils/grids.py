@@ -0,0 +1,141 @@
+from array import array
+from constants import *
+
+"""
+Flat, index addressed storage for the arena, the cell (row, col) lives at index row * width + col
+- terrain is one byte per cell
+- occupancy is one int32 troop id per cell (0 means empty), the id is turned back into the troop with the TroopTable
+
+The old interfaces still work on top of them (grid[row][col] and occupancy_grid[(row, col)]) so the rest of the code doesn't need to change,
+the hot loops use the flat arrays directly to avoid creating and hashing (row, col) tuples.
+"""
+
+class TerrainGrid:
+    """
+    Cell types of the arena stored in a bytearray, grid[row] returns a writable view of the row
+    """
+    def __init__(self, height, width, fill=GRASS):
+        """
+        - Time: Worst case = Average case = O(h * w) to fill the cells
+        - Space: O(h * w) one byte per cell plus one view per row
+        """
+        self.height = height
+        self.width = width
+        self.cells = bytearray([fill]) * (height * width)
+        view = memoryview(self.cells)
+        self.rows = [view[row * width:(row + 1) * width] for row in range(height)] # views share the memory of cells, no copies
+
+    def __getitem__(self, row):
+        return self.rows[row]
+
+    def __len__(self):
+        return self.height
+
+    def __iter__(self):
+        return iter(self.rows)
+
+
+class TroopTable:
+    """
+    Id to troop table shared by the occupancy grids, id 0 is reserved for empty cells
+    """
+    def __init__(self):
+        self.troops = [None]
+
+    def id_of(self, troop):
+        """
+        Returns the id of a troop, registering it the first time
+
+        - Time: Worst case = Average case = O(1) amortized list append
+        - Space: O(1) one slot per troop that ever entered the arena, the slot is emptied by release when the troop leaves
+
+        NOTE: ids are never reused, a match spawns a few hundred troops so the table stays small and a stale id can never point to a new troop
+        """
+        troop_id = troop.occupancy_id
+        if troop_id and troop_id < len(self.troops) and self.troops[troop_id] is troop:
+            return troop_id
+
+        troop_id = len(self.troops)
+        self.troops.append(troop)
+        troop.occupancy_id = troop_id
+        return troop_id
+
+    def release(self, troop):
+        """
+        Clears the slot of a troop that left the arena, so the table doesn't keep dead troops (and their paths and sprites) alive until the match ends
+
+        - Time: Worst case = Average case = O(1)
+        - Space: O(1), the empty slot stays because ids are never reused
+        """
+        troop_id = troop.occupancy_id
+        if troop_id and troop_id < len(self.troops) and self.troops[troop_id] is troop:
+            self.troops[troop_id] = None
+        troop.occupancy_id = 0
+
+
+class OccupancyGrid:
+    """
+    Troop ids per cell in an int32 array, behaves like the old dictionary with (row, col) keys
+    """
+    def __init__(self, height, width, troop_table):
+        """
+        - Time: Worst case = Average case = O(h * w) to fill the ids
+        - Space: O(h * w) four bytes per cell
+        """
+        self.height = height
+        self.width = width
+        self.troop_table = troop_table
+        self.ids = array('i', [0]) * (height * width)
+        self.occupied_count = 0
+
+    def index_of(self, cell):
+        """Flat index of a cell or -1 if it is out of bounds, O(1) time"""
+        row, col = cell
+        if 0 <= row < self.height and 0 <= col < self.width:
+            return row * self.width + col
+        return -1
+
+    def occupant(self, index):
+        """Troop on the cell with this flat index or None, O(1) time"""
+        troop_id = self.ids[index]
+        if troop_id:
+            return self.troop_table.troops[troop_id]
+        return None
+
+    def get(self, cell, default=None):
+        """Troop on the cell or default, O(1) time"""
+        index = self.index_of(cell)
+        if index == -1 or not self.ids[index]:
+            return default
+        return self.troop_table.troops[self.ids[index]]
+
+    def pop(self, cell, default=None):
+        """Removes and returns the troop on the cell, O(1) time"""
+        index = self.index_of(cell)
+        if index == -1 or not self.ids[index]:
+            return default
+        troop = self.troop_table.troops[self.ids[index]]
+        self.ids[index] = 0
+        self.occupied_count -= 1
+        return troop
+
+    def __contains__(self, cell):
+        index = self.index_of(cell)
+        return index != -1 and self.ids[index] != 0
+
+    def __getitem__(self, cell):
+        index = self.index_of(cell)
+        if index == -1 or not self.ids[index]:
+            raise KeyError(cell)
+        return self.troop_table.troops[self.ids[index]]
+
+    def __setitem__(self, cell, troop):
+        index = self.index_of(cell)
+        if index == -1:
+            raise KeyError(cell)
+        if not self.ids[index]:
+            self.occupied_count += 1
+        self.ids[index] = self.troop_table.id_of(troop)
+
+    def __len__(self):
+        return self.occupied_count
@@ -0,0 +1,269 @@
+import heapq
+from math import inf
+from constants import *
+from core.profiler import profiler
+from arena.utils.find_path_astar import find_path_astar
+from arena.utils.target_bounds import get_target_bounds, octile_distance
+
+"""
+Hierarchical pathfinding (HPA*) for big arenas.
+The arena is split in square clusters of HIERARCHICAL_CLUSTER_SIZE cells. Where two clusters touch, every run of cells that is walkable
+on both sides becomes an entrance (a pair of cells, one per side), so the river only has entrances on the bridges.
+The abstract graph has the entrance cells as nodes, a transition edge of cost 1 between the two cells of an entrance and
+intra cluster edges with the bfs distance between the entrances of the same cluster (computed the first time the cluster is expanded).
+
+A query searches the abstract graph (a few hundred nodes instead of h * w cells) and only refines the first segments into cells,
+the troop walks them and the next query continues from where it is. The terrain only changes when a tower is destroyed,
+the arena drops its graphs then and they are rebuilt on the next query.
+"""
+
+directions = [(-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (1, 1), (-1, 1), (1, -1)] # same order as get_valid_neighbors
+
+class NavigationGraph:
+    """
+    Abstract graph of the entrances between clusters for one troop size and layer (ground or flying)
+    """
+    def __init__(self, grid, clearance, troop_size, cluster_size=HIERARCHICAL_CLUSTER_SIZE):
+        """
+        - Time: Worst case = Average case = O(h * w / c) to scan the borders of the clusters where c is the cluster size
+        - Space: O(e) where e are the entrance cells
+        """
+        self.height = len(grid)
+        self.width = len(grid[0])
+        self.clearance = clearance
+        self.troop_size = troop_size
+        self.cluster_size = cluster_size
+
+        self.entrances = {} # key: cluster (cluster_row, cluster_col) value: list of its entrance cells
+        self.edges = {} # key: entrance cell value: list of (cell, cost), transition edges first, intra cluster edges once the cluster is built
+        self.built_clusters = set() # clusters whose intra cluster edges were already computed
+        self.build_entrances()
+
+    def cluster_of(self, cell):
+        return (cell[0] // self.cluster_size, cell[1] // self.cluster_size)
+
+    def cluster_bounds(self, cluster):
+        """(min_row, min_col, max_row, max_col) of a cluster, the last row and column of clusters can be smaller, O(1) time"""
+        size = self.cluster_size
+        return (
+            cluster[0] * size,
+            cluster[1] * size,
+            min(self.height, (cluster[0] + 1) * size) - 1,
+            min(self.width, (cluster[1] + 1) * size) - 1,
+        )
+
+    def fits(self, row, col):
+        return self.clearance[row * self.width + col] >= self.troop_size
+
+    def add_entrance(self, inside, outside):
+        for cell in (inside, outside):
+            if cell not in self.edges:
+                self.edges[cell] = []
+                self.entrances.setdefault(self.cluster_of(cell), []).append(cell)
+        self.edges[inside].append((outside, 1))
+        self.edges[outside].append((inside, 1))
+
+    def add_run(self, run):
+        """
+        Turns a run of border cell pairs into entrances, one in the middle of short runs and one at each end of long ones
+
+        - Time: Worst case = Average case = O(1)
+        - Space: O(1)
+        """
+        if len(run) <= HIERARCHICAL_ENTRANCE_SPLIT:
+            self.add_entrance(*run[len(run) // 2])
+        else:
+            self.add_entrance(*run[0])
+            self.add_entrance(*run[-1])
+
+    def build_entrances(self):
+        """
+        Scans the borders between neighbouring clusters and adds an entrance for every walkable run
+
+        - Time: Worst case = Average case = O(h * w / c) the border cells
+        - Space: O(e) for the entrances
+        """
+        size = self.cluster_size
+
+        # horizontal borders, the upper cell is on boundary - 1 and the lower one on boundary
+        for boundary in range(size, self.height, size):
+            run = []
+            for col in range(self.width):
+                if col % size == 0 and run: # runs never cross a cluster column
+                    self.add_run(run)
+                    run = []
+                if self.fits(boundary - 1, col) and self.fits(boundary, col):
+                    run.append(((boundary - 1, col), (boundary, col)))
+                elif run:
+                    self.add_run(run)
+                    run = []
+            if run:
+                self.add_run(run)
+
+        # vertical borders, the left cell is on boundary - 1 and the right one on boundary
+        for boundary in range(size, self.width, size):
+            run = []
+            for row in range(self.height):
+                if row % size == 0 and run:
+                    self.add_run(run)
+                    run = []
+                if self.fits(row, boundary - 1) and self.fits(row, boundary):
+                    run.append(((row, boundary - 1), (row, boundary)))
+                elif run:
+                    self.add_run(run)
+                    run = []
+            if run:
+                self.add_run(run)
+
+    def cluster_distances(self, start, cluster):
+        """
+        Bfs distances from start to the entrances of cluster without leaving it, with the same moves of find_path_bfs (8 directions, cost 1)
+
+        - Time: Worst case = Average case = O(c^2 * d) where c is the cluster size and d the 8 directions
+        - Space: O(c^2) for the distances
+        """
+        min_row, min_col, max_row, max_col = self.cluster_bounds(cluster)
+        distances = {start: 0}
+        frontier = [start]
+        while frontier:
+            next_frontier = []
+            for row, col in frontier:
+                distance = distances[(row, col)] + 1
+                for d_row, d_col in directions:
+                    next_row = row + d_row
+                    next_col = col + d_col
+                    if not (min_row <= next_row <= max_row and min_col <= next_col <= max_col):
+                        continue
+                    cell = (next_row, next_col)
+                    if cell in distances or not self.fits(next_row, next_col):
+                        continue
+                    distances[cell] = distance
+                    next_frontier.append(cell)
+            frontier = next_frontier
+        profiler.count("nodes_expanded", len(distances))
+        return {cell: distances[cell] for cell in self.entrances.get(cluster, []) if cell in distances and cell != start}
+
+    def build_cluster(self, cluster):
+        """
+        Adds the intra cluster edges between all the entrances of a cluster
+
+        - Time: Worst case = Average case = O(k * c^2 * d) where k are the entrances of the cluster
+        - Space: O(k^2) for the edges
+        """
+        if cluster in self.built_clusters:
+            return
+        self.built_clusters.add(cluster)
+        for entrance in self.entrances.get(cluster, []):
+            for cell, distance in self.cluster_distances(entrance, cluster).items():
+                self.edges[entrance].append((cell, distance))
+
+    def find_abstract_path(self, start, bounds):
+        """
+        A* on the abstract graph from start to the clusters around the target bounding box (min_row, min_col, max_row, max_col)
+        Returns the list of cells [start, entrance, ..., last entrance] or None if the static terrain doesn't connect them
+
+        - Time: Worst case O(n log n + b) where n are the abstract nodes and b the cells of the clusters built for the first time
+        - Space: O(n)
+
+        NOTE: like find_path_astar, reaching a cluster of the target pushes an "arrived" entry with the cost plus the straight distance left,
+        the first arrived entry popped is the cheapest way found to the target
+        """
+        min_row, min_col, max_row, max_col = bounds
+        # the target can be reached from the cells around it, they can be in the neighbouring clusters
+        first_cluster = self.cluster_of((max(0, min_row - 1), max(0, min_col - 1)))
+        last_cluster = self.cluster_of((min(self.height - 1, max_row + 1), min(self.width - 1, max_col + 1)))
+
+        def is_goal_cluster(cell):
+            cluster_row, cluster_col = self.cluster_of(cell)
+            return first_cluster[0] <= cluster_row <= last_cluster[0] and first_cluster[1] <= cluster_col <= last_cluster[1]
+
+        start_h = octile_distance(start, bounds)
+        heap = [(start_h, start_h, 0, 0, start, False)]
+        best_cost = {start: 0}
+        parents = {start: None}
+        counter = 1
+
+        while heap:
+            _, _, _, cost, cell, arrived = heapq.heappop(heap)
+            if arrived:
+                waypoints = []
+                while cell is not None:
+                    waypoints.append(cell)
+                    cell = parents[cell]
+                waypoints.reverse()
+                return waypoints
+
+            if cost > best_cost.get(cell, inf):
+                continue
+
+            if is_goal_cluster(cell):
+                final_cost = cost + octile_distance(cell, bounds)
+                heapq.heappush(heap, (final_cost, 0, counter, final_cost, cell, True))
+                counter += 1
+
+            if cell in self.edges:
+                self.build_cluster(self.cluster_of(cell))
+                neighbors = self.edges[cell]
+            else:
+                neighbors = self.cluster_distances(cell, self.cluster_of(cell)).items() # the start is not an entrance
+
+            for neighbor, distance in neighbors:
+                new_cost = cost + distance
+                if new_cost < best_cost.get(neighbor, inf):
+                    best_cost[neighbor] = new_cost
+                    parents[neighbor] = cell
+                    h = octile_distance(neighbor, bounds)
+                    heapq.heappush(heap, (new_cost + h, h, counter, new_cost, neighbor, False))
+                    counter += 1
+
+        return None
+
+
+def find_path_hierarchical(start, grid, collision_grid, target_grid, self_troop, goal_cell=None, cell_type=None, one_tile_range=True, include_diagonals=True, max_radius=None, max_expansions=None, refined_segments=HIERARCHICAL_REFINED_SEGMENTS):
+    """
+    Hierarchical pathfinding, same arguments of find_path_astar
+    Close targets (or searches we can't describe with the abstract graph) go straight to find_path_astar, far ones search the abstract graph
+    and refine only the first refined_segments segments with find_path_astar, so the returned path can stop before the target
+
+    - Time: Worst case O(n log n) on the abstract graph plus O(s * c^2 log c) to refine s segments in clusters of side c (the expansion budget of each segment), almost flat with the grid size
+    - Space: O(n + L) for the abstract search and the path
+
+    NOTE: the troop walks the refined part and searches again once it is over, with the same moves on both levels the paths stay within a few percent of the shortest one
+    NOTE: max_radius only bounds the direct A* of close targets, it is measured from the start and the segments start further on.
+    Every refinement gets at most max_expansions and the cells of two clusters: a segment joins two entrances of the same cluster (or the two sides of an entrance),
+    so with the terrain alone it never needs more, troops in the way can make it fail and then the troop walks what was refined
+    """
+    if cell_type and goal_cell:
+        raise ValueError("Either cell_type or goal_cell need to have a value, not both")
+    if not cell_type and not goal_cell:
+        raise ValueError("Either cell_type or goal_cell need to have a value, neither is set")
+
+    arena = self_troop.arena
+    bounds = get_target_bounds(self_troop, goal_cell=goal_cell, cell_type=cell_type)
+    if arena is None or grid is not arena.grid or bounds is None or not include_diagonals or octile_distance(start, bounds) <= 2 * HIERARCHICAL_CLUSTER_SIZE:
+        return find_path_astar(start, grid, collision_grid, target_grid, self_troop, goal_cell=goal_cell, cell_type=cell_type, one_tile_range=one_tile_range, include_diagonals=include_diagonals, max_radius=max_radius, max_expansions=max_expansions)
+
+    graph = arena.get_navigation_graph(self_troop.width, self_troop.height, is_flying=self_troop.troop_can_fly)
+    waypoints = graph.find_abstract_path(start, bounds)
+    if waypoints is None:
+        return None # not even the terrain without troops connects them, a cell search would visit everything reachable to find out
+
+    segment_expansions = 2 * graph.cluster_size ** 2 # the cells of a cluster pair
+    if max_expansions is not None:
+        segment_expansions = min(segment_expansions, max_expansions)
+
+    path = [start]
+    for waypoint in waypoints[1:1 + refined_segments]:
+        segment = find_path_astar(path[-1], grid, collision_grid, {}, self_troop, goal_cell=waypoint, one_tile_range=one_tile_range, max_expansions=segment_expansions)
+        if not segment:
+            return path if len(path) > 1 else None # troops are in the way, we walk what we have and search again later
+        path.extend(segment[1:])
+        if segment[-1] != waypoint:
+            return path # the budget ran out, the partial segment ends closer to the waypoint and the next query continues from there
+
+    if len(waypoints) - 1 <= refined_segments:
+        # every entrance was refined, the last segment goes to the target itself
+        segment = find_path_astar(path[-1], grid, collision_grid, target_grid, self_troop, goal_cell=goal_cell, cell_type=cell_type, one_tile_range=one_tile_range, max_expansions=segment_expansions)
+        if segment:
+            path.extend(segment[1:])
+    return path
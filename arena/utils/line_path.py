@@ -0,0 +1,79 @@
+from constants import *
+from core.profiler import profiler
+from arena.utils.grids import OccupancyGrid
+
+"""
+Straight line paths for flying troops.
+Every move (also diagonal) costs 1 step, so the shortest path between two cells is as long as their chebyshev distance
+and a bresenham line has exactly that many steps: when the line is clear of other flying troops it is already a shortest path.
+Flying troops cross water, the only things that can be on the line are the towers and the other flying troops.
+"""
+
+def line_cells(start, end):
+    """
+    Cells of the 8 connected bresenham line from start to end, start excluded and end included
+
+    - Time: Worst case = Average case = O(d) where d is the chebyshev distance between the cells
+    - Space: O(d) for the cells
+    """
+    start_row, start_col = start
+    end_row, end_col = end
+    d_row = abs(end_row - start_row)
+    d_col = abs(end_col - start_col)
+    step_row = 1 if end_row > start_row else -1
+    step_col = 1 if end_col > start_col else -1
+    error = d_col - d_row
+
+    cells = []
+    row, col = start_row, start_col
+    while (row, col) != (end_row, end_col):
+        double_error = 2 * error
+        if double_error > -d_row:
+            error -= d_row
+            col += step_col
+        if double_error < d_col:
+            error += d_col
+            row += step_row
+        cells.append((row, col))
+    return cells
+
+def find_line_path(start, grid, collision_grid, self_troop, bounds):
+    """
+    Straight path from start to the closest cell of the bounding box (min_row, min_col, max_row, max_col) of the target,
+    same kind of path of find_path_bfs with one_tile_range (the last cell is the target cell), None if the line is blocked
+
+    - Time: Worst case = Average case = O(d) where d is the chebyshev distance, O(d * tw * th) with a collision grid
+    - Space: O(d) for the path
+
+    NOTE: the cells of the line are checked like get_valid_neighbors does, one clearance lookup for the footprint and the collision grid for the troops
+    """
+    min_row, min_col, max_row, max_col = bounds
+    end = (min(max(start[0], min_row), max_row), min(max(start[1], min_col), max_col))
+    if end == start:
+        return [start]
+
+    arena = self_troop.arena
+    clearance = arena.get_clearance_map(is_flying=self_troop.troop_can_fly)
+    grid_height = len(grid)
+    grid_width = len(grid[0])
+    troop_size = max(self_troop.width, self_troop.height)
+    collision_ids = collision_grid.ids if isinstance(collision_grid, OccupancyGrid) else None
+    own_id = self_troop.occupancy_id
+
+    cells = line_cells(start, end)
+    for row, col in cells[:-1]: # the last cell is the target, it is occupied by it
+        if not (0 <= row < grid_height and 0 <= col < grid_width) or clearance[row * grid_width + col] < troop_size:
+            return None
+        if not collision_grid:
+            continue
+        for r in range(row, row + self_troop.height):
+            for c in range(col, col + self_troop.width):
+                if collision_ids is not None:
+                    occupant_id = collision_ids[r * grid_width + c]
+                    if occupant_id != 0 and occupant_id != own_id:
+                        return None
+                elif (r, c) in collision_grid and collision_grid[(r, c)] != self_troop:
+                    return None
+
+    profiler.count("line_paths")
+    return [start] + cells
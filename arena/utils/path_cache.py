@@ -0,0 +1,159 @@
+from constants import *
+
+class PathCache:
+    """
+    LRU cache of computed paths, key: (start, target, footprint, is_flying, collision mode, search bounds)
+
+    Entries are dropped when:
+    - the grid version changes (a tower was removed, every path could now be shorter)
+    - a troop is spawned, moved or removed on a cell of a path that was searched considering the troops
+    - the cache is full, the least recently used entry goes first
+    """
+    def __init__(self, capacity=PATH_CACHE_SIZE):
+        self.capacity = capacity
+        # python dictionaries keep insertion order, we reinsert an entry every time it is used so the first key is always the least recently used
+        self.entries = {} # key: cache key value: (grid_version, path, indexed cells)
+        self.cell_index = {False: {}, True: {}} # for ground and flying troops, key: cell value: set of cache keys whose path uses that cell
+        self.grid_version = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    def make_key(self, troop, collision_grid, goal_cell=None, cell_type=None, max_radius=None, max_expansions=None):
+        """
+        Builds the cache key of a search started by troop
+
+        - Time: Worst case = Average case = O(1)
+        - Space: O(1)
+
+        NOTE: when the target is a troop we add its location, if it moves the key changes so we never return a path to where it was
+        NOTE: the bounds are part of the key, a partial path found with a small radius is not the answer of a search with a bigger one
+        """
+        if goal_cell:
+            target = goal_cell
+        elif isinstance(cell_type, int):
+            target = cell_type
+        else:
+            target = (cell_type, cell_type.location)
+
+        return (troop.location, target, troop.width, troop.height, troop.troop_can_fly, bool(collision_grid), max_radius, max_expansions)
+
+    def get(self, key):
+        """
+        Returns the cached path for key or None
+
+        - Time: Worst case = Average case = O(1) hash table lookup and reinsertion
+        - Space: O(1)
+        """
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if entry[0] != self.grid_version:
+            self._unindex(key, entry)
+            self.invalidations += 1
+            self.misses += 1
+            return None
+
+        self.entries[key] = entry # most recently used now
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key, path, troop):
+        """
+        Stores a path, paths that avoided troops are indexed by the cells they use so that they can be invalidated
+
+        - Time: Worst case = Average case = O(L * tw * th) where L is the path length and tw/th are the troop dimensions
+        - Space: O(L * tw * th) for the index
+        """
+        if not path:
+            return # unreachable results are not stored, any change in the arena could make them reachable
+
+        old_entry = self.entries.pop(key, None)
+        if old_entry is not None:
+            self._unindex(key, old_entry)
+
+        if len(self.entries) >= self.capacity:
+            oldest_key = next(iter(self.entries))
+            self._unindex(oldest_key, self.entries.pop(oldest_key))
+            self.evictions += 1
+
+        indexed_cells = None
+        if key[5]: # the path avoided troops, it stays valid only while nobody steps on it
+            indexed_cells = set()
+            cell_index = self.cell_index[troop.troop_can_fly]
+            for row, col in path:
+                for r in range(row, row + troop.height):
+                    for c in range(col, col + troop.width):
+                        indexed_cells.add((r, c))
+            for cell in indexed_cells:
+                if cell not in cell_index:
+                    cell_index[cell] = set()
+                cell_index[cell].add(key)
+
+        self.entries[key] = (self.grid_version, path, indexed_cells)
+
+    def invalidate_cells(self, cells, is_flying=False):
+        """
+        Drops every troop avoiding path that goes through one of the cells (called when a troop occupies or frees them)
+
+        - Time: Worst case O(c + k * L) where c are the cells, k the dropped entries and L their length, Average case O(c) most cells are not on a path
+        - Space: O(1)
+        """
+        cell_index = self.cell_index[is_flying]
+        for cell in cells:
+            keys = cell_index.pop(cell, None)
+            if not keys:
+                continue
+            for key in keys:
+                entry = self.entries.pop(key, None)
+                if entry is not None:
+                    self._unindex(key, entry)
+                    self.invalidations += 1
+
+    def bump_grid_version(self):
+        """
+        Marks every stored path as outdated, they are dropped the next time they are requested or evicted
+
+        - Time: Worst case = Average case = O(1)
+        - Space: O(1)
+        """
+        self.grid_version += 1
+
+    def _unindex(self, key, entry):
+        """
+        Removes a key from the cells index
+
+        - Time: Worst case = Average case = O(L * tw * th) for the indexed cells
+        - Space: O(1)
+        """
+        indexed_cells = entry[2]
+        if not indexed_cells:
+            return
+        cell_index = self.cell_index[key[4]]
+        for cell in indexed_cells:
+            keys = cell_index.get(cell)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    cell_index.pop(cell)
+
+    def stats(self):
+        """
+        Returns the counters of the cache
+
+        - Time: Worst case = Average case = O(1)
+        - Space: O(1)
+        """
+        requests = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / requests if requests else 0.0,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions,
+            "size": len(self.entries),
+        }
@@ -0,0 +1,68 @@
+from constants import *
+from core.profiler import profiler
+from core.parent_array import ParentArray
+from core.ring_queue import RingQueue
+from arena.utils.find_path_bfs import get_valid_neighbors
+
+"""
+Local repair of a path that got blocked by troops that moved onto it after it was found.
+The old path is the search state we keep: everything after the blocked cell is still a shortest way to the target,
+so we only need a detour from where the troop stands to a later cell of the old path.
+The detour is a bfs restricted to a small window around the troop, if it doesn't reconnect the caller runs a full search.
+Like find_path_bfs the queue holds flat indices and the parents are an int array, both sized to the window and not to the grid.
+"""
+
+def repair_path(path, blocked_index, grid, collision_grid, self_troop, max_radius=PATH_REPAIR_RADIUS, max_nodes=PATH_REPAIR_MAX_NODES):
+    """
+    Returns a new path from path[blocked_index - 1] that walks around the blocked cells and rejoins path after blocked_index,
+    None if the old path can't be reached inside the window
+
+    - Time: Worst case = Average case = O(min(r^2, n) * d) where r is max_radius, n is max_nodes and d the 8 directions, plus O(L) to stitch the path
+    - Space: O(L + r^2) for the cells of the old path, the parent array and the queue of the window
+
+    NOTE: the detour is a shortest one inside the window but the repaired path can be a bit longer than a full search would find,
+    the rest of the old path is reused as it is
+    """
+    start = path[blocked_index - 1]
+    # cells of the old path we can rejoin, the farthest index wins if a cell is repeated
+    rejoin_index = {cell: index for index, cell in enumerate(path) if index > blocked_index}
+    if not rejoin_index:
+        return None # the blocked cell was the last one, nothing to rejoin
+
+    start_row, start_col = start
+    # the window is (2r + 1) x (2r + 1) cells centered on the start, indices are local to it
+    side = 2 * max_radius + 1
+    origin_row, origin_col = start_row - max_radius, start_col - max_radius
+    queue = RingQueue(side * side)
+    start_index = max_radius * side + max_radius
+    queue.enqueue(start_index)
+    parents = ParentArray(side, side)
+    parents.visit(start_index)
+
+    expanded = 0 # nodes taken out of the queue, reported to the profiler
+    try:
+        while not queue.is_empty() and expanded < max_nodes:
+            current_index = queue.dequeue()
+            expanded += 1
+            local_row, local_col = divmod(current_index, side)
+
+            neighbors = get_valid_neighbors((origin_row + local_row, origin_col + local_col), grid, collision_grid, self_troop, include_diagonals=True)
+            for row, col, _ in neighbors:
+                if abs(row - start_row) > max_radius or abs(col - start_col) > max_radius:
+                    continue
+                neighbor_index = (row - origin_row) * side + (col - origin_col)
+                if parents.is_visited(neighbor_index):
+                    continue
+                parents.visit(neighbor_index, current_index)
+
+                index = rejoin_index.get((row, col))
+                if index is not None:
+                    profiler.count("path_repairs")
+                    detour = [(origin_row + r, origin_col + c) for r, c in parents.reconstruct_path(neighbor_index)]
+                    return detour + path[index + 1:]
+                queue.enqueue(neighbor_index)
+
+        profiler.count("path_repair_failures")
+        return None
+    finally:
+        profiler.count("nodes_expanded", expanded)
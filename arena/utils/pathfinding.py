@@ -0,0 +1,41 @@
+from constants import *
+from arena.utils.find_path_bfs import find_path_bfs
+from arena.utils.find_path_astar import find_path_astar
+from arena.utils.target_bounds import get_target_bounds
+from arena.utils.line_path import find_line_path
+from arena.utils.hierarchical import find_path_hierarchical
+from core.profiler import profiler
+
+engines = {
+    "bfs": find_path_bfs,
+    "astar": find_path_astar,
+    "hierarchical": find_path_hierarchical,
+}
+
+def find_path(start, grid, collision_grid, target_grid, self_troop, goal_cell=None, cell_type=None, one_tile_range=True, include_diagonals=True, engine=None, max_radius=None, max_expansions=None):
+    """
+    Runs the selected pathfinding engine, same arguments and return value of find_path_bfs
+    engine = "bfs", "astar" or "hierarchical", None uses PATHFINDING_ENGINE from the constants (hierarchical on arenas with HIERARCHICAL_MIN_ROWS rows or more),
+    this way they can be compared on the same arena
+    max_radius, max_expansions = optional bounds of the search, when one is hit the engine returns a partial path towards the target or None
+
+    - Time: O(d) when a flying troop has a clear straight line to the target (d is the distance), otherwise the one of the selected engine
+    - Space: the one of the selected engine
+
+    NOTE: flying troops try the straight line first, with moves of cost 1 in 8 directions a clear line is already a shortest path
+    """
+    if engine is None:
+        engine = "hierarchical" if len(grid) >= HIERARCHICAL_MIN_ROWS else PATHFINDING_ENGINE
+    if engine not in engines:
+        raise ValueError(f"Unknown pathfinding engine {engine}, use one of {list(engines)}")
+
+    if self_troop.troop_can_fly and self_troop.arena is not None and grid is self_troop.arena.grid and one_tile_range and include_diagonals:
+        bounds = get_target_bounds(self_troop, goal_cell=goal_cell, cell_type=cell_type)
+        if bounds is not None:
+            path = find_line_path(start, grid, collision_grid, self_troop, bounds)
+            if path is not None:
+                return path
+
+    profiler.count("path_searches")
+
+    return engines[engine](start, grid, collision_grid, target_grid, self_troop, goal_cell=goal_cell, cell_type=cell_type, one_tile_range=one_tile_range, include_diagonals=include_diagonals, max_radius=max_radius, max_expansions=max_expansions)
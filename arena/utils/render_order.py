@@ -0,0 +1,69 @@
+"""
+Render order of the troops kept up to date while they move, so drawing doesn't sort every frame.
+Rows are small bounded integers (0 to height - 1), every row has a bucket with the troops whose top left corner is on it,
+walking the buckets from the top row gives the troops top to bottom like sort_for_visualization did.
+"""
+
+class RenderOrder:
+    """
+    Row buckets of the troops, buckets[row] is an insertion ordered dictionary (key: troop value: None)
+    """
+    def __init__(self, height):
+        """
+        - Time: Worst case = Average case = O(h) one bucket per row
+        - Space: O(h + n) where n are the troops
+        """
+        self.buckets = [{} for _ in range(height)]
+        self.troop_rows = {} # key: troop value: row of the bucket it is in
+
+    def __len__(self):
+        return len(self.troop_rows)
+
+    def insert(self, troop):
+        """
+        Adds a troop in the bucket of its row (or moves it there if it is already inside)
+
+        - Time: Worst case = Average case = O(1)
+        - Space: O(1)
+        """
+        row = troop.location[0]
+        old_row = self.troop_rows.get(troop)
+        if old_row == row:
+            return
+        if old_row is not None:
+            del self.buckets[old_row][troop]
+        self.buckets[row][troop] = None
+        self.troop_rows[troop] = row
+
+    def move(self, troop):
+        """
+        Updates the bucket of a troop after its location changed, a move along the same row costs one lookup
+
+        - Time: Worst case = Average case = O(1)
+        - Space: O(1)
+        """
+        self.insert(troop)
+
+    def remove(self, troop):
+        """
+        Removes a troop, nothing happens if it isn't inside
+
+        - Time: Worst case = Average case = O(1)
+        - Space: O(1)
+        """
+        row = self.troop_rows.pop(troop, None)
+        if row is not None:
+            del self.buckets[row][troop]
+
+    def __iter__(self):
+        """
+        Troops from the top row to the bottom one, troops on the same row in the order they entered it
+
+        - Time: Worst case = Average case = O(n + h) where h are the rows
+        - Space: O(1) no list is built, the buckets are walked in place
+
+        NOTE: the troops can't be moved or removed while this is iterating (drawing doesn't do it)
+        """
+        for bucket in self.buckets:
+            if bucket:
+                yield from bucket
@@ -0,0 +1,125 @@
+from math import ceil
+from constants import *
+
+"""
+Space-time reservation table for cooperative movement.
+Every walking troop claims the next RESERVATION_STEPS cells of its path together with the frames in which it expects to be on them,
+so a troop whose next cell is taken can tell if the cell is going to free up soon (wait), if it has to walk around it (sidestep)
+or if it really needs a new search.
+
+One claim per cell and per layer (ground and air never collide), the first troop that claims a cell keeps it until its claim expires
+or it releases it (new path, reset_path, death).
+"""
+
+class ReservationTable:
+    """
+    Claims of the walking troops of an arena, key: flat cell index (row * width + col)
+    """
+    def __init__(self, height, width, steps=RESERVATION_STEPS):
+        self.height = height
+        self.width = width
+        self.steps = steps
+        self.claims = {False: {}, True: {}} # key: is_flying value: {cell index: (troop, first frame, last frame)}
+        self.troop_claims = {} # key: troop value: list of the cell indexes it claimed
+
+        # counters of how the blocked moves were resolved
+        self.waits = 0
+        self.sidesteps = 0
+        self.repairs = 0
+        self.searches = 0
+        self.conflicts = 0
+
+    def footprint(self, troop, cell):
+        """
+        Flat indexes of the cells covered by troop if its top left corner was on cell
+
+        - Time: Worst case = Average case = O(tw * th)
+        - Space: O(tw * th)
+        """
+        base_row, base_col = cell
+        if troop.width == 1 and troop.height == 1:
+            return [base_row * self.width + base_col] # every troop of the stats is 1x1
+        return [
+            row * self.width + col
+            for row in range(base_row, min(base_row + troop.height, self.height))
+            for col in range(base_col, min(base_col + troop.width, self.width))
+        ]
+
+    def release(self, troop):
+        """
+        Drops every claim of a troop
+
+        - Time: Worst case = Average case = O(s * tw * th) where s are the claimed steps
+        - Space: O(1)
+        """
+        claimed = self.troop_claims.pop(troop, None)
+        if not claimed:
+            return
+        layer = self.claims[troop.troop_can_fly]
+        for index in claimed:
+            claim = layer.get(index)
+            if claim is not None and claim[0] is troop:
+                del layer[index]
+
+    def reserve_path(self, troop, path, path_index, frame):
+        """
+        Replaces the claims of troop with the cells from path[path_index] to RESERVATION_STEPS steps ahead,
+        each one with the frames in which the troop is expected to be on it given its speed and movement accumulator
+
+        - Time: Worst case = Average case = O(s * tw * th)
+        - Space: O(s * tw * th) for the claims
+
+        NOTE: a cell already claimed by another troop for a frame that didn't expire yet is not taken over, first come first served
+        """
+        self.release(troop)
+        speed = troop.raw_movement_speed
+        if not path or speed <= 0:
+            return
+
+        layer = self.claims[troop.troop_can_fly]
+        claimed = []
+        first_frame = frame
+        last_step = min(len(path) - 1, path_index + self.steps)
+        for step in range(path_index, last_step + 1):
+            # the troop leaves path[step] when the accumulator reaches the next step
+            missing = (step - path_index + 1) - troop.movement_accumulator
+            last_frame = frame + (ceil(missing / speed) if missing > 0 else 0)
+            for index in self.footprint(troop, path[step]):
+                claim = layer.get(index)
+                if claim is None or claim[0] is troop or claim[2] < frame:
+                    layer[index] = (troop, first_frame, last_frame)
+                    claimed.append(index)
+                else:
+                    self.conflicts += 1
+            first_frame = last_frame
+        self.troop_claims[troop] = claimed
+
+    def is_claimed_by_other(self, troop, cell, frame):
+        """
+        True if another troop claimed one of the cells troop would cover on cell during frame
+
+        - Time: Worst case = Average case = O(tw * th)
+        - Space: O(tw * th) for the footprint
+        """
+        layer = self.claims[troop.troop_can_fly]
+        for index in self.footprint(troop, cell):
+            claim = layer.get(index)
+            if claim is not None and claim[0] is not troop and claim[1] <= frame <= claim[2]:
+                return True
+        return False
+
+    def is_moving(self, troop):
+        """
+        True if troop claimed a cell outside of its current footprint, so it is walking away from where it is
+
+        - Time: Worst case = Average case = O(s * tw * th)
+        - Space: O(tw * th) for the footprint
+        """
+        claimed = self.troop_claims.get(troop)
+        if not claimed or troop.location is None:
+            return False
+        current = self.footprint(troop, troop.location)
+        return any(index not in current for index in claimed)
+
+    def stats(self):
+        return {"waits": self.waits, "sidesteps": self.sidesteps, "repairs": self.repairs, "searches": self.searches, "conflicts": self.conflicts}
@@ -0,0 +1,166 @@
+from math import inf
+from constants import *
+from deck.stats import stats, stats_tower_small, stats_tower_center
+from arena.utils.random_utils import calculate_edge_to_edge_distance
+
+"""
+Bucketed spatial hash of the troops, the arena is split in square buckets as big as the largest aggro range
+so that every troop in range of another is at most one ring of buckets away.
+Buckets are kept separately for every team and layer (ground, air, building) so a query only looks at troops it could target.
+"""
+
+def get_bucket_size():
+    """
+    Side of a bucket in cells, the largest aggro (or tower attack) range scaled by the grid multiplier
+
+    - Time: Worst case = Average case = O(s) where s is the number of troop stats (16)
+    - Space: O(1)
+    """
+    largest_range = max(troop_stats.get("troop_attack_aggro_range", 0) for troop_stats in stats.values())
+    largest_range = max(largest_range, stats_tower_small["troop_attack_range"], stats_tower_center["troop_attack_range"])
+    return max(1, int(largest_range * MULTIPLIER_GRID_HEIGHT))
+
+def get_layer(troop):
+    """Layer of a troop inside the index, O(1) time"""
+    if troop.troop_type == "building":
+        return "building"
+    if troop.troop_can_fly:
+        return "air"
+    return "ground"
+
+
+class SpatialIndex:
+    """
+    Spatial hash of the troops, key: (team, layer) value: dictionary of buckets, key: (bucket_row, bucket_col) value: troops inside it
+    """
+    def __init__(self, height, width, bucket_size=None):
+        self.height = height
+        self.width = width
+        self.bucket_size = bucket_size if bucket_size else get_bucket_size()
+        self.buckets = {}
+        self.troop_buckets = {} # key: troop value: list of ((team, layer), bucket) it was inserted in
+
+    def _covered_buckets(self, troop):
+        """
+        Buckets touched by the footprint of a troop (big troops such as towers can sit on more than one)
+
+        - Time: Worst case = Average case = O(b) where b is the number of buckets covered, 1 for normal troops
+        - Space: O(b)
+        """
+        row, col = troop.location
+        size = self.bucket_size
+        return [
+            (bucket_row, bucket_col)
+            for bucket_row in range(row // size, (row + troop.height - 1) // size + 1)
+            for bucket_col in range(col // size, (col + troop.width - 1) // size + 1)
+        ]
+
+    def insert(self, troop):
+        """
+        Adds a troop to the buckets covered by its footprint
+
+        - Time: Worst case = Average case = O(b) where b is the number of covered buckets
+        - Space: O(b)
+        """
+        if troop in self.troop_buckets:
+            self.remove(troop)
+
+        key = (troop.team, get_layer(troop))
+        layer_buckets = self.buckets.setdefault(key, {})
+        entries = []
+        for bucket in self._covered_buckets(troop):
+            # dictionaries with None values are used as sets that keep insertion order
+            layer_buckets.setdefault(bucket, {})[troop] = None
+            entries.append((key, bucket))
+        self.troop_buckets[troop] = entries
+
+    def remove(self, troop):
+        """
+        Removes a troop from the index
+
+        - Time: Worst case = Average case = O(b) where b is the number of covered buckets
+        - Space: O(1)
+        """
+        entries = self.troop_buckets.pop(troop, None)
+        if entries is None:
+            return
+        for key, bucket in entries:
+            layer_buckets = self.buckets[key]
+            bucket_troops = layer_buckets.get(bucket)
+            if bucket_troops is not None:
+                bucket_troops.pop(troop, None)
+                if not bucket_troops:
+                    layer_buckets.pop(bucket)
+
+    def move(self, troop):
+        """
+        Updates the buckets of a troop after its location changed, most moves stay inside the same bucket and cost nothing
+
+        - Time: Worst case = Average case = O(b) where b is the number of covered buckets
+        - Space: O(b)
+        """
+        entries = self.troop_buckets.get(troop)
+        if entries is not None and len(entries) == 1:
+            row, col = troop.location
+            size = self.bucket_size
+            if entries[0][1] == (row // size, col // size) and troop.height <= 1 and troop.width <= 1:
+                return # still in the same bucket
+        self.insert(troop)
+
+    def find_closest_enemy(self, source_troop, max_distance=inf):
+        """
+        Finds the closest enemy that source_troop can target within max_distance (edge to edge)
+        Returns (distance, troop) or (inf, None)
+
+        - Time: Worst case O(n) when all troops are close, Average case O(k) where k are the troops in the rings of buckets around the source
+        - Space: O(1)
+
+        NOTE: rings are visited from the inside out and we stop as soon as a whole ring is farther than the best troop found (or max_distance)
+        """
+        enemy_team = 2 if source_troop.team == 1 else 1
+        if source_troop.troop_favorite_target != "any":
+            layers = [source_troop.troop_favorite_target] # es "building"
+        elif source_troop.troop_can_target_air:
+            layers = ["ground", "air", "building"]
+        else:
+            layers = ["ground", "building"]
+        layer_buckets = [self.buckets[(enemy_team, layer)] for layer in layers if (enemy_team, layer) in self.buckets]
+
+        closest_troop = None
+        minimum_distance = inf
+        if not layer_buckets:
+            return minimum_distance, closest_troop
+
+        size = self.bucket_size
+        row, col = source_troop.location
+        min_bucket_row = row // size
+        max_bucket_row = (row + source_troop.height - 1) // size
+        min_bucket_col = col // size
+        max_bucket_col = (col + source_troop.width - 1) // size
+        max_ring = max(self.height, self.width) // size + 1
+
+        for ring in range(max_ring + 1):
+            # every cell of this ring is at least (ring - 1) full buckets away from the source footprint
+            if ring > 0 and (ring - 1) * size >= min(minimum_distance, max_distance):
+                break
+
+            for bucket_row in range(min_bucket_row - ring, max_bucket_row + ring + 1):
+                on_edge_row = bucket_row == min_bucket_row - ring or bucket_row == max_bucket_row + ring
+                for bucket_col in range(min_bucket_col - ring, max_bucket_col + ring + 1):
+                    if not on_edge_row and min_bucket_col - ring < bucket_col < max_bucket_col + ring:
+                        continue # inner buckets were visited by the previous rings
+
+                    bucket = (bucket_row, bucket_col)
+                    for buckets in layer_buckets:
+                        bucket_troops = buckets.get(bucket)
+                        if not bucket_troops:
+                            continue
+                        for troop in bucket_troops:
+                            if not troop.is_alive:
+                                continue
+                            distance = calculate_edge_to_edge_distance(source_troop, troop)
+                            if distance < minimum_distance and distance <= max_distance:
+                                minimum_distance = distance
+                                closest_troop = troop
+
+        return minimum_distance, closest_troop
@@ -0,0 +1,49 @@
+from constants import *
+
+"""
+Bounding box of what a search is looking for and the distance of a cell from it, shared by all the pathfinding engines:
+A* and the hierarchical engine use the distance as heuristic, bounded searches use it to pick the visited cell closest to the target.
+"""
+
+def octile_distance(cell, bounds, diagonal_cost=1):
+    """
+    Octile distance from a cell to the closest cell of a bounding box (min_row, min_col, max_row, max_col)
+
+    - Time: Worst case = Average case = O(1)
+    - Space: O(1)
+    """
+    min_row, min_col, max_row, max_col = bounds
+    d_row = max(min_row - cell[0], 0, cell[0] - max_row)
+    d_col = max(min_col - cell[1], 0, cell[1] - max_col)
+    return max(d_row, d_col) + (diagonal_cost - 1) * min(d_row, d_col)
+
+def get_target_bounds(self_troop, goal_cell=None, cell_type=None):
+    """
+    Returns the bounding box (min_row, min_col, max_row, max_col) of what we are searching for, None if we can't tell
+
+    - Time: Worst case = Average case = O(1) towers are found with a dictionary lookup
+    - Space: O(1)
+
+    NOTE: for tower cell types we use the footprint of the tower that owns those cells instead of scanning the grid which would be O(h * w)
+    """
+    if goal_cell:
+        return (goal_cell[0], goal_cell[1], goal_cell[0], goal_cell[1])
+
+    if isinstance(cell_type, int):
+        arena = self_troop.arena
+        if arena is None:
+            return None
+        if TOWER_P1 - 1 <= cell_type <= TOWER_P1 + 1:
+            target = arena.towers_P1.get(cell_type - TOWER_P1)
+        elif TOWER_P2 - 1 <= cell_type <= TOWER_P2 + 1:
+            target = arena.towers_P2.get(cell_type - TOWER_P2)
+        else:
+            return None
+    else:
+        target = cell_type # we are searching for a troop
+
+    if target is None or target.location is None:
+        return None
+
+    row, col = target.location
+    return (row, col, row + target.height - 1, col + target.width - 1)
@@ -0,0 +1,80 @@
+import time
+from constants import *
+from core.profiler import profiler
+
+"""
+Time sliced troop updates: path searches that miss the cache are the expensive part of a tick,
+when the searches of a frame already used UPDATE_BUDGET_MS the next ones are deferred to the following frames.
+A deferred troop keeps walking along the path it already has (or waits one frame if it has none) and searches again on the next frame.
+
+The budget depends on the wall clock, two runs with the same seed would defer different searches,
+so it is only enabled by game_loop.py, the headless simulation and the benchmarks keep it off to stay deterministic.
+"""
+
+class UpdateScheduler:
+    """
+    Per frame budget for the path searches of the troops, with counters of the deferred work
+    """
+    def __init__(self, budget_ms=UPDATE_BUDGET_MS, max_deferred_frames=UPDATE_MAX_DEFERRED_FRAMES, enabled=False):
+        self.budget_seconds = budget_ms / 1000
+        self.max_deferred_frames = max_deferred_frames # a troop deferred this many frames in a row searches anyway, nobody starves
+        self.enabled = enabled
+        self.frame_start = time.perf_counter()
+
+        self.deferred_streak = {} # key: troop value: consecutive frames its search was deferred
+        self.searches_last_frame = 0
+        self.deferred_last_frame = 0
+        self.searches_total = 0
+        self.deferred_total = 0
+        self.longest_streak = 0
+
+    def start_frame(self):
+        """Starts the budget of a new frame, O(1) time"""
+        self.frame_start = time.perf_counter()
+        self.searches_last_frame = 0
+        self.deferred_last_frame = 0
+
+    def allow_search(self, troop):
+        """
+        Returns True if troop can run an expensive search now, False if it has to wait for the next frame
+
+        - Time: Worst case = Average case = O(1)
+        - Space: O(1) one entry per deferred troop
+        """
+        if self.enabled:
+            over_budget = time.perf_counter() - self.frame_start >= self.budget_seconds
+            streak = self.deferred_streak.get(troop, 0)
+            if over_budget and streak < self.max_deferred_frames:
+                self.deferred_streak[troop] = streak + 1
+                self.longest_streak = max(self.longest_streak, streak + 1)
+                self.deferred_last_frame += 1
+                self.deferred_total += 1
+                profiler.count("deferred_searches")
+                return False
+            self.deferred_streak.pop(troop, None)
+
+        self.searches_last_frame += 1
+        self.searches_total += 1
+        return True
+
+    def forget(self, troop):
+        """Drops the counters of a troop (when it is removed from the arena), O(1) time"""
+        self.deferred_streak.pop(troop, None)
+
+    def stats(self):
+        """
+        Counters of the scheduler, used to tune UPDATE_BUDGET_MS
+
+        - Time: Worst case = Average case = O(1)
+        - Space: O(1)
+        """
+        return {
+            "enabled": self.enabled,
+            "budget_ms": self.budget_seconds * 1000,
+            "searches_last_frame": self.searches_last_frame,
+            "deferred_last_frame": self.deferred_last_frame,
+            "searches_total": self.searches_total,
+            "deferred_total": self.deferred_total,
+            "waiting_troops": len(self.deferred_streak),
+            "longest_streak": self.longest_streak,
+        }
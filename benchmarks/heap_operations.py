@@ -0,0 +1,118 @@
+import sys
+import time
+import heapq
+import random
+import argparse
+
+"""
+Micro-benchmarks of core.heap against the heapq library, run from the repository root:
+    python -m benchmarks.heap_operations
+    python -m benchmarks.heap_operations --sizes 1000,100000 --repeats 5
+
+push/pop pushes n random (priority, counter) tuples and pops them all.
+decrease key runs the same dijkstra on a random grid with weighted cells (a move costs the weight of both cells): heapq pushes a second entry for every cheaper cost
+and skips the old ones when they are popped (lazy deletion), IndexedHeap lowers the priority of the cell already inside.
+"""
+
+def push_pop_heapq(priorities):
+    heap = []
+    for counter, priority in enumerate(priorities):
+        heapq.heappush(heap, (priority, counter))
+    while heap:
+        heapq.heappop(heap)
+
+def push_pop_binary_heap(priorities):
+    from core.heap import BinaryHeap
+    heap = BinaryHeap()
+    for counter, priority in enumerate(priorities):
+        heap.push((priority, counter))
+    while heap:
+        heap.pop()
+
+def grid_neighbors(cell, side):
+    row, col = cell
+    for d_row, d_col in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+        if 0 <= row + d_row < side and 0 <= col + d_col < side:
+            yield (row + d_row, col + d_col)
+
+def dijkstra_heapq(weights, side):
+    best_cost = {(0, 0): 0}
+    heap = [(0, (0, 0))]
+    popped = 0
+    while heap:
+        cost, cell = heapq.heappop(heap)
+        popped += 1
+        if cost > best_cost[cell]:
+            continue # old entry
+        for neighbor in grid_neighbors(cell, side):
+            new_cost = cost + weights[cell[0] * side + cell[1]] + weights[neighbor[0] * side + neighbor[1]] # leaving and entering cost, the first way found isn't always the cheapest
+            if new_cost < best_cost.get(neighbor, float("inf")):
+                best_cost[neighbor] = new_cost
+                heapq.heappush(heap, (new_cost, neighbor))
+    return best_cost, popped
+
+def dijkstra_indexed_heap(weights, side):
+    from core.heap import IndexedHeap
+    best_cost = {(0, 0): 0}
+    heap = IndexedHeap()
+    heap.push((0, 0), 0)
+    popped = 0
+    while heap:
+        cost, cell, _ = heap.pop()
+        popped += 1
+        for neighbor in grid_neighbors(cell, side):
+            new_cost = cost + weights[cell[0] * side + cell[1]] + weights[neighbor[0] * side + neighbor[1]] # leaving and entering cost, the first way found isn't always the cheapest
+            if new_cost < best_cost.get(neighbor, float("inf")):
+                best_cost[neighbor] = new_cost
+                heap.push(neighbor, new_cost) # decrease key if the cell is already inside
+    return best_cost, popped
+
+def best_time(function, arguments, repeats):
+    """
+    Smallest wall time in milliseconds of repeats calls, the smallest is the one with the least noise from the machine
+
+    - Time: Worst case = Average case = O(repeats * cost of the function)
+    - Space: O(1)
+    """
+    best = float("inf")
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        function(*arguments)
+        best = min(best, time.perf_counter() - start_time)
+    return best * 1000
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="core.heap against heapq")
+    parser.add_argument("--sizes", type=str, default="1000,10000,100000", help="comma separated item counts (cells of the dijkstra grid)")
+    parser.add_argument("--repeats", type=int, default=3, help="runs per measure, the best one is reported")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random priorities and weights")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    rng = random.Random(args.seed)
+
+    print(f"{'n':>8}{'heapq ms':>11}{'binary ms':>11}{'ratio':>7}{'lazy ms':>10}{'indexed ms':>12}{'ratio':>7}{'lazy pops':>11}{'indexed pops':>14}")
+    for size in (int(size) for size in args.sizes.split(",")):
+        priorities = [rng.random() for _ in range(size)]
+        heapq_ms = best_time(push_pop_heapq, (priorities,), args.repeats)
+        binary_ms = best_time(push_pop_binary_heap, (priorities,), args.repeats)
+
+        side = max(2, int(size ** 0.5))
+        weights = [rng.randint(1, 9) for _ in range(side * side)]
+        lazy_costs, lazy_pops = dijkstra_heapq(weights, side)
+        indexed_costs, indexed_pops = dijkstra_indexed_heap(weights, side)
+        if lazy_costs != indexed_costs:
+            raise RuntimeError(f"the two dijkstra disagree on a {side}x{side} grid")
+        lazy_ms = best_time(dijkstra_heapq, (weights, side), args.repeats)
+        indexed_ms = best_time(dijkstra_indexed_heap, (weights, side), args.repeats)
+
+        print(
+            f"{size:>8}{heapq_ms:>11.2f}{binary_ms:>11.2f}{binary_ms / heapq_ms:>7.2f}{lazy_ms:>10.2f}{indexed_ms:>12.2f}{indexed_ms / lazy_ms:>7.2f}"
+            f"{lazy_pops:>11}{indexed_pops:>14}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+import io
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import contextlib
+import subprocess
+
+"""
+Cost per query of the pathfinding engines as the arena grows, run from the repository root:
+    python -m benchmarks.pathfinding_queries
+    python -m benchmarks.pathfinding_queries --multipliers 4,8,16 --queries 100
+
+Random pairs of walkable cells are searched with find_path_astar and find_path_hierarchical (without troops in the way),
+the hierarchical path is fully refined here to compare its length with the shortest one. Every multiplier runs in its own process
+because MULTIPLIER_GRID_HEIGHT is read by the constants at import time.
+"""
+
+REPOSITORY_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def run_queries(queries, seed):
+    """
+    Runs the queries in this process and returns the average time per query of both engines and the path length ratio
+
+    - Time: Worst case = Average case = O(q * (V + E) log V) where q are the queries, dominated by A*
+    - Space: O(V) for the searches
+    """
+    from constants import BASE_GRID_HEIGHT, MULTIPLIER_GRID_HEIGHT
+    from arena.arena import Arena
+    from deck.card import Card
+    from troops.generic_troop import Troop
+    from arena.utils.find_path_astar import find_path_astar
+    from arena.utils.hierarchical import find_path_hierarchical
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        arena = Arena(BASE_GRID_HEIGHT * MULTIPLIER_GRID_HEIGHT, seed=seed)
+        arena.world_generation()
+        troop = Card(name="knight", color=(128, 128, 128), troop_class=Troop, troop_name="knight", asset_manager=None).create_troops(1)[0]
+        arena.spawn_unit(troop, (arena.height - 1, 0))
+
+    rng = random.Random(seed)
+    clearance = arena.get_clearance_map()
+    cells = [(row, col) for row in range(arena.height) for col in range(arena.width) if clearance[row * arena.width + col] >= 1]
+    pairs = [tuple(rng.sample(cells, 2)) for _ in range(queries)]
+
+    start_time = time.perf_counter()
+    graph = arena.get_navigation_graph(troop.width, troop.height)
+    for cluster_row in range(0, arena.height, graph.cluster_size):
+        for cluster_col in range(0, arena.width, graph.cluster_size):
+            graph.build_cluster(graph.cluster_of((cluster_row, cluster_col)))
+    build_seconds = time.perf_counter() - start_time
+
+    astar_seconds = 0.0
+    hierarchical_seconds = 0.0
+    lazy_seconds = 0.0
+    ratios = []
+    for start, goal in pairs:
+        start_time = time.perf_counter()
+        shortest = find_path_astar(start, arena.grid, {}, {}, troop, goal_cell=goal)
+        astar_seconds += time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        refined = find_path_hierarchical(start, arena.grid, {}, {}, troop, goal_cell=goal, refined_segments=len(cells))
+        hierarchical_seconds += time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        find_path_hierarchical(start, arena.grid, {}, {}, troop, goal_cell=goal) # what a troop pays, only the first segments are refined
+        lazy_seconds += time.perf_counter() - start_time
+
+        if shortest and refined:
+            ratios.append(len(refined) / len(shortest))
+
+    return {
+        "multiplier": MULTIPLIER_GRID_HEIGHT,
+        "grid": [arena.height, arena.width],
+        "entrances": len(graph.edges),
+        "graph_build_ms": build_seconds * 1000,
+        "astar_ms": astar_seconds / queries * 1000,
+        "hierarchical_full_ms": hierarchical_seconds / queries * 1000,
+        "hierarchical_query_ms": lazy_seconds / queries * 1000,
+        "mean_length_ratio": sum(ratios) / len(ratios) if ratios else 0.0,
+        "max_length_ratio": max(ratios) if ratios else 0.0,
+    }
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Cost per query of A* and hierarchical pathfinding for growing arenas")
+    parser.add_argument("--multipliers", type=str, default="2,4,8,16", help="comma separated MULTIPLIER_GRID_HEIGHT values")
+    parser.add_argument("--queries", type=int, default=50, help="random queries per multiplier")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the arena and of the random queries")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS) # internal, runs the queries in this process
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+
+    if args.worker:
+        print(json.dumps(run_queries(args.queries, args.seed)))
+        return 0
+
+    print(f"{'multiplier':>10}{'grid':>12}{'entrances':>11}{'build ms':>10}{'astar ms':>10}{'full ms':>10}{'query ms':>10}{'mean len':>10}{'max len':>10}")
+    for multiplier in args.multipliers.split(","):
+        command = [sys.executable, "-m", "benchmarks.pathfinding_queries", "--worker", "--queries", str(args.queries), "--seed", str(args.seed)]
+        environment = dict(os.environ, MULTIPLIER_GRID_HEIGHT=multiplier)
+        completed = subprocess.run(command, cwd=REPOSITORY_DIRECTORY, env=environment, capture_output=True, text=True)
+        if completed.returncode != 0:
+            raise RuntimeError(f"Queries at multiplier {multiplier} failed:\n{completed.stderr}")
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        grid = f"{result['grid'][0]}x{result['grid'][1]}"
+        print(
+            f"{result['multiplier']:>10}{grid:>12}{result['entrances']:>11}{result['graph_build_ms']:>10.1f}{result['astar_ms']:>10.2f}"
+            f"{result['hierarchical_full_ms']:>10.2f}{result['hierarchical_query_ms']:>10.2f}{result['mean_length_ratio']:>10.3f}{result['max_length_ratio']:>10.3f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
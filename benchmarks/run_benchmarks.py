@@ -0,0 +1,253 @@
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import contextlib
+import subprocess
+
+"""
+Scenario benchmark suite, run from the repository root:
+    python -m benchmarks.run_benchmarks
+    python -m benchmarks.run_benchmarks --scenarios mixed --multipliers 2
+    python -m benchmarks.run_benchmarks --update-baseline
+
+Every (scenario, multiplier) runs in its own process: MULTIPLIER_GRID_HEIGHT is read by the constants at import time
+and the peak memory (max resident set size) is per process, so a fresh interpreter keeps both measures clean.
+Results are written to json and compared with the stored baseline, the exit code is 1 if something regressed.
+Only the counters that are the same on every machine are compared and stored in the baseline (the scenarios are seeded and run without the frame budget),
+timings and peak memory depend on the machine and are only reported.
+"""
+
+BENCHMARKS_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+REPOSITORY_DIRECTORY = os.path.dirname(BENCHMARKS_DIRECTORY)
+DEFAULT_BASELINE = os.path.join(BENCHMARKS_DIRECTORY, "baseline.json")
+DEFAULT_OUTPUT = os.path.join(BENCHMARKS_DIRECTORY, "results.json")
+DEFAULT_MULTIPLIERS = [2, 4, 8]
+
+# metric: True if a higher value is better
+compared_metrics = {
+    "path_searches": False,
+    "nodes_expanded": False,
+    "bytes_per_troop": False,
+}
+# stored in the baseline next to the compared metrics to tell what was measured
+baseline_fields = ("scenario", "multiplier", "grid", "troops_spawned", "ticks")
+
+def percentile(sorted_values, fraction):
+    """
+    Nearest rank percentile of an already sorted list
+
+    - Time: Worst case = Average case = O(1)
+    - Space: O(1)
+    """
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+def get_peak_memory_kb():
+    """Max resident set size of this process in KB, None where the resource module doesn't exist (windows)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        peak //= 1024 # macos reports bytes, linux KB
+    return peak
+
+def get_bytes_per_troop(copies=100):
+    """
+    Average bytes allocated by one troop, measured with tracemalloc creating copies troops of every card in deck.stats
+    The shared stats are created by the first troop of each type so they are (almost) not counted, like in a long match
+
+    - Time: Worst case = Average case = O(copies * s) where s are the troop types
+    - Space: O(copies * s) for the troops, released before returning
+    """
+    import tracemalloc
+    from deck.card import Card
+    from deck.stats import stats
+    from troops.generic_troop import Troop
+
+    cards = [Card(name=troop_name, color=(128, 128, 128), troop_class=Troop, troop_name=troop_name, asset_manager=None) for troop_name in stats]
+    for card in cards:
+        card.create_troops(1) # the first troops build the shared stats
+
+    tracemalloc.start()
+    start_bytes = tracemalloc.get_traced_memory()[0]
+    troops = []
+    for _ in range(copies):
+        for card in cards:
+            troops.extend(card.create_troops(1))
+    allocated = tracemalloc.get_traced_memory()[0] - start_bytes
+    tracemalloc.stop()
+    return allocated / len(troops)
+
+def run_scenario(name, ticks=None):
+    """
+    Runs one scenario in this process and returns its metrics
+
+    - Time: Worst case = Average case = O(t * tick) where t is the number of ticks
+    - Space: O(t) for the tick latencies plus the arena
+    """
+    # imported here so that the parent process never loads the arena with the wrong multiplier
+    from constants import BASE_GRID_HEIGHT, MULTIPLIER_GRID_HEIGHT
+    from arena.arena import Arena
+    from core.profiler import profiler
+    from benchmarks.scenarios import scenarios
+
+    setup, default_ticks = scenarios[name]
+    ticks = ticks if ticks else default_ticks
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        arena = Arena(BASE_GRID_HEIGHT * MULTIPLIER_GRID_HEIGHT, seed=0)
+        arena.world_generation()
+        spawned = setup(arena)
+
+        profiler.toggle() # the counters of the searches only exist while the profiler is enabled
+        latencies = []
+        start_time = time.perf_counter()
+        for _ in range(ticks):
+            tick_start = time.perf_counter()
+            if not arena.tick():
+                break
+            arena.update_troops()
+            latencies.append(time.perf_counter() - tick_start)
+            profiler.end_frame(arena.frame_count)
+        total_seconds = time.perf_counter() - start_time
+
+    path_searches = sum(row[3].get("path_searches", 0) for row in profiler.history)
+    nodes_expanded = sum(row[3].get("nodes_expanded", 0) for row in profiler.history)
+    latencies.sort()
+    return {
+        "scenario": name,
+        "multiplier": MULTIPLIER_GRID_HEIGHT,
+        "grid": [arena.height, arena.width],
+        "troops_spawned": spawned,
+        "ticks": len(latencies),
+        "seconds": total_seconds,
+        "ticks_per_second": len(latencies) / total_seconds if total_seconds else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "path_searches": path_searches,
+        "nodes_expanded": nodes_expanded,
+        "peak_memory_kb": get_peak_memory_kb(),
+        "bytes_per_troop": get_bytes_per_troop(),
+    }
+
+def run_in_subprocess(name, multiplier, ticks=None):
+    """
+    Runs a scenario in a new interpreter with the given multiplier, the worker prints its metrics as json on the last line
+
+    - Time: Worst case = Average case = the one of the scenario plus the interpreter start up
+    - Space: O(1) in this process
+    """
+    command = [sys.executable, "-m", "benchmarks.run_benchmarks", "--worker", name]
+    if ticks:
+        command += ["--ticks", str(ticks)]
+    environment = dict(os.environ, MULTIPLIER_GRID_HEIGHT=str(multiplier))
+    completed = subprocess.run(command, cwd=REPOSITORY_DIRECTORY, env=environment, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"Scenario {name} at multiplier {multiplier} failed:\n{completed.stderr}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def result_key(result):
+    return f"{result['scenario']}@{result['multiplier']}"
+
+def compare_with_baseline(results, baseline, tolerance):
+    """
+    Returns the list of regressions, a metric regresses if it is worse than the baseline by more than tolerance (relative)
+
+    - Time: Worst case = Average case = O(r * m) where r are the results and m the compared metrics
+    - Space: O(r) for the regressions
+    """
+    regressions = []
+    for result in results:
+        key = result_key(result)
+        if key not in baseline:
+            continue
+        for metric, higher_is_better in compared_metrics.items():
+            current = result.get(metric)
+            reference = baseline[key].get(metric)
+            if current is None or not reference:
+                continue
+            change = (current - reference) / reference
+            if (higher_is_better and change < -tolerance) or (not higher_is_better and change > tolerance):
+                regressions.append(f"{key} {metric}: {reference:.2f} -> {current:.2f} ({change:+.1%})")
+    return regressions
+
+def print_results(results):
+    print(f"{'scenario':<24}{'ticks/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'searches':>10}{'nodes':>12}{'peak KB':>10}{'B/troop':>9}")
+    for result in results:
+        print(
+            f"{result_key(result):<24}{result['ticks_per_second']:>10.1f}{result['p50_ms']:>10.3f}{result['p99_ms']:>10.3f}"
+            f"{result['path_searches']:>10}{result['nodes_expanded']:>12}{str(result['peak_memory_kb']):>10}{result['bytes_per_troop']:>9.0f}"
+        )
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Headless scenario benchmarks of the simulation")
+    parser.add_argument("--scenarios", type=str, default=None, help="comma separated scenario names, all by default")
+    parser.add_argument("--multipliers", type=str, default=",".join(str(multiplier) for multiplier in DEFAULT_MULTIPLIERS), help="comma separated MULTIPLIER_GRID_HEIGHT values")
+    parser.add_argument("--ticks", type=int, default=None, help="overrides the ticks of every scenario")
+    parser.add_argument("--output", type=str, default=DEFAULT_OUTPUT, help="json file for the results")
+    parser.add_argument("--baseline", type=str, default=DEFAULT_BASELINE, help="json file with the stored baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative regression before failing")
+    parser.add_argument("--update-baseline", action="store_true", help="stores these results as the new baseline")
+    parser.add_argument("--worker", type=str, default=None, help=argparse.SUPPRESS) # internal, runs one scenario in this process
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+
+    if args.worker:
+        print(json.dumps(run_scenario(args.worker, ticks=args.ticks)))
+        return 0
+
+    from benchmarks.scenarios import scenarios
+    names = args.scenarios.split(",") if args.scenarios else list(scenarios)
+    for name in names:
+        if name not in scenarios:
+            raise ValueError(f"Unknown scenario {name}, use one of {list(scenarios)}")
+    multipliers = [int(multiplier) for multiplier in args.multipliers.split(",")]
+
+    results = []
+    for multiplier in multipliers:
+        for name in names:
+            results.append(run_in_subprocess(name, multiplier, ticks=args.ticks))
+    print_results(results)
+
+    with open(args.output, "w") as file:
+        json.dump(results, file, indent=2)
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as file:
+                baseline = json.load(file)
+        for result in results:
+            baseline[result_key(result)] = {field: result[field] for field in (*baseline_fields, *compared_metrics)}
+        with open(args.baseline, "w") as file:
+            json.dump(baseline, file, indent=2, sort_keys=True)
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline to compare with, run with --update-baseline to store one")
+        return 0
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    regressions = compare_with_baseline(results, baseline, args.tolerance)
+    if regressions:
+        print("Regressions:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    print(f"No regressions against the baseline (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+from constants import *
+from deck.card import Card
+from deck.stats import stats
+from troops.generic_troop import Troop
+from troops.troop_group import TroopGroup
+
+"""
+Scripted benchmark scenarios, every scenario spawns its troops on a freshly generated arena and then only the simulation runs (no bots).
+Positions are fractions of the arena height and width so the same scenario works at every MULTIPLIER_GRID_HEIGHT.
+Team 1 plays at the bottom of the arena and team 2 at the top.
+"""
+
+# columns of the two lanes (the bridges are in front of the princess towers, see generate_mock_bridges)
+LEFT_LANE = 3.5 / 18
+RIGHT_LANE = 14.5 / 18
+
+def spawn_card(arena, troop_name, team, row_fraction, col_fraction):
+    """
+    Spawns all the troops of a card as close as possible to the requested position, as a group like Player.place_troop does
+    Returns the number of troops spawned
+
+    - Time: Worst case O(h * w) if the area around the position is full, Average case O(c) where c is the troop count of the card
+    - Space: O(c) for the troops
+    """
+    card = Card(name=troop_name, color=(128, 128, 128), troop_class=Troop, troop_name=troop_name, asset_manager=None)
+    target_row = int(row_fraction * (arena.height - 1))
+    target_col = int(col_fraction * (arena.width - 1))
+
+    spawned = []
+    for troop in card.create_troops(team):
+        # search rings of cells around the position until the troop fits
+        for radius in range(max(arena.height, arena.width)):
+            if spawn_in_ring(arena, troop, target_row, target_col, radius):
+                spawned.append(troop)
+                break
+    if len(spawned) > 1:
+        TroopGroup(spawned)
+    return len(spawned)
+
+def spawn_in_ring(arena, troop, center_row, center_col, radius):
+    """
+    Tries to spawn a troop on the cells at chebyshev distance radius from the center
+
+    - Time: Worst case = Average case = O(radius) cells checked
+    - Space: O(1)
+    """
+    for row in range(center_row - radius, center_row + radius + 1):
+        for col in range(center_col - radius, center_col + radius + 1):
+            if max(abs(row - center_row), abs(col - center_col)) != radius:
+                continue
+            if arena.spawn_unit(troop, (row, col)):
+                return True
+    return False
+
+def setup_empty(arena):
+    """Only the towers, measures the fixed cost of a tick"""
+    return 0
+
+def setup_skeleton_swarms(arena):
+    """10 skeleton cards per side spread over both lanes, lots of small troops fighting in the middle"""
+    spawned = 0
+    for index in range(10):
+        col_fraction = LEFT_LANE if index % 2 == 0 else RIGHT_LANE
+        offset = (index // 2) * 0.02
+        spawned += spawn_card(arena, "skeletons", 1, 0.62 + offset, col_fraction)
+        spawned += spawn_card(arena, "skeletons", 2, 0.38 - offset, col_fraction)
+    return spawned
+
+def setup_mixed(arena):
+    """Every troop of deck/stats.py once per side, ground, air, swarms and tanks together"""
+    spawned = 0
+    for index, troop_name in enumerate(sorted(stats)):
+        col_fraction = 0.15 + 0.7 * (index / max(1, len(stats) - 1))
+        spawned += spawn_card(arena, troop_name, 1, 0.65, col_fraction)
+        spawned += spawn_card(arena, troop_name, 2, 0.35, col_fraction)
+    return spawned
+
+def setup_giant_push(arena):
+    """Giants with support walking over the bridges into the tower fire of the other team"""
+    spawned = 0
+    for col_fraction in (LEFT_LANE, RIGHT_LANE):
+        spawned += spawn_card(arena, "giant", 1, 0.56, col_fraction)
+        spawned += spawn_card(arena, "musketeer", 1, 0.62, col_fraction)
+        spawned += spawn_card(arena, "archer", 1, 0.64, col_fraction)
+    return spawned
+
+# name: (setup function, ticks to simulate)
+scenarios = {
+    "empty": (setup_empty, 600),
+    "skeleton_swarms": (setup_skeleton_swarms, 600),
+    "mixed": (setup_mixed, 600),
+    "giant_push": (setup_giant_push, 1200),
+}
@@ -0,0 +1,96 @@
+import sys
+import time
+import random
+import argparse
+
+"""
+Micro-benchmarks of core.sorting.merge_sort_by_key, run from the repository root:
+    python -m benchmarks.sort_operations
+    python -m benchmarks.sort_operations --sizes 200,5000 --repeats 5
+
+The bottom-up natural merge sort is compared with the recursive top-down one it replaced (kept here as reference) and with sorted().
+The items are fake troops sorted by row like the render order: random rows, sorted, reversed and nearly sorted
+(the order of the previous frame after a few troops moved one row, the common case from one frame to the next).
+"""
+
+class FakeTroop:
+    __slots__ = ("location",)
+
+    def __init__(self, row, col):
+        self.location = (row, col)
+
+def top_down_merge_sort(items, key, reverse=False):
+    """The recursive version with slices and a key call per comparison, the reference of the benchmark"""
+    from core.sorting import merge_by_key
+    if len(items) <= 1:
+        return items
+    mid = len(items) // 2
+    left = top_down_merge_sort(items[:mid], key, reverse)
+    right = top_down_merge_sort(items[mid:], key, reverse)
+    return merge_by_key(left, right, key, reverse)
+
+def make_inputs(size, rows, rng):
+    """
+    Lists of fake troops for every kind of input
+
+    - Time: Worst case = Average case = O(n log n) to build the sorted ones
+    - Space: O(n) per input
+    """
+    troops = [FakeTroop(rng.randrange(rows), rng.randrange(rows)) for _ in range(size)]
+    in_order = sorted(troops, key=lambda troop: troop.location[0])
+    nearly_sorted = list(in_order)
+    for _ in range(max(1, size // 50)): # 2% of the troops changed row since the last frame
+        index = rng.randrange(size)
+        row, col = nearly_sorted[index].location
+        nearly_sorted[index] = FakeTroop(row + rng.choice((-1, 1)), col)
+    return {
+        "random": troops,
+        "sorted": in_order,
+        "reversed": in_order[::-1],
+        "nearly sorted": nearly_sorted,
+    }
+
+def best_time(function, items, repeats):
+    """
+    Smallest wall time in milliseconds of repeats sorts of a copy of items
+
+    - Time: Worst case = Average case = O(repeats * cost of the sort)
+    - Space: O(n) for the copy
+    """
+    best = float("inf")
+    for _ in range(repeats):
+        copy = list(items)
+        start_time = time.perf_counter()
+        function(copy, key=lambda troop: troop.location[0])
+        best = min(best, time.perf_counter() - start_time)
+    return best * 1000
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="core.sorting against the recursive merge sort and sorted()")
+    parser.add_argument("--sizes", type=str, default="200,2000,20000", help="comma separated item counts")
+    parser.add_argument("--rows", type=int, default=64, help="distinct rows of the fake troops (64 is the arena at multiplier 2)")
+    parser.add_argument("--repeats", type=int, default=5, help="runs per measure, the best one is reported")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random troops")
+    return parser.parse_args()
+
+def main():
+    from core.sorting import merge_sort_by_key
+
+    args = parse_args()
+    rng = random.Random(args.seed)
+
+    print(f"{'n':>7}  {'input':<15}{'top down ms':>13}{'bottom up ms':>14}{'speedup':>9}{'sorted() ms':>13}")
+    for size in (int(size) for size in args.sizes.split(",")):
+        for kind, items in make_inputs(size, args.rows, rng).items():
+            expected = top_down_merge_sort(list(items), key=lambda troop: troop.location[0])
+            if merge_sort_by_key(list(items), key=lambda troop: troop.location[0]) != expected:
+                raise RuntimeError(f"the two merge sorts disagree on {kind} input of {size} items")
+            top_down_ms = best_time(top_down_merge_sort, items, args.repeats)
+            bottom_up_ms = best_time(merge_sort_by_key, items, args.repeats)
+            builtin_ms = best_time(sorted, items, args.repeats)
+            print(f"{size:>7}  {kind:<15}{top_down_ms:>13.3f}{bottom_up_ms:>14.3f}{top_down_ms / bottom_up_ms:>8.1f}x{builtin_ms:>13.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,5 @@
+import os
+
 
 # must be bigger equal than 1
 TICK_RATE = 1 # N frames per tick (meaning if N = 5, we will tick every 5 frames)
@@ -7,11 +9,14 @@ EMPTY=0; GRASS=1; WATER=2; BRIDGE=3; TOWER_P1=5; TOWER_P2=8
 walkable_cells = set([GRASS, BRIDGE])
 flyable_cells = set([GRASS, BRIDGE, WATER])
 BASE_GRID_HEIGHT = 32 # in cells (min is 32) maintain constant, change the multiplier
-MULTIPLIER_GRID_HEIGHT = int(2) # the number we multiply the base grid height by to get the actual grid height
+MULTIPLIER_GRID_HEIGHT = int(os.environ.get("MULTIPLIER_GRID_HEIGHT", 2)) # the number we multiply the base grid height by to get the actual grid height (the environment variable lets the benchmarks run other sizes)
 
 # this is just for efficency purposes, don't modify
 GAP_BETWEEN_TOWER_CELLS = 1 # this is the multiple of the number of cells to not add for example 3 would mean 1 every 3 is added to the occupancy grid
 
+PATHFINDING_ENGINE = "astar" # "bfs" or "astar", both return paths of the same length but astar expands only the cells towards the target
+PATH_CACHE_SIZE = 512 # max number of paths kept in the arena path cache (least recently used are dropped first)
+
 DRAW_BORDERS = True
 HAND_AREA_HEIGHT = 140
 HEALTHBAR_OFFSET_Y = -8
@@ -19,4 +24,24 @@ ARENA_BACKGROUND_USE_IMAGE = True # if you want to see the grid behind the arena
 DRAW_ATTACK_RANGES_DEBUG = False # this is really fun to see all the attack ranges but it shouldn't be on when not debugging
 
 TICKS_PER_SECOND = 60
+FIXED_STEP_MODE = False # True runs the ticks as fast as the cpu allows instead of pacing them at TICKS_PER_SECOND (the match logic is the same, only the wall clock changes)
+PROFILER_ENABLED = False # toggle in game with F3, when disabled the profiled functions only pay one attribute check
+PROFILER_HISTORY_FRAMES = 3600 # frames kept in the profiler ring buffer (one minute at 60 ticks per second)
+PROFILER_PANEL_FRAMES = 60 # frames averaged by the on screen panel
+PROFILER_CSV_PATH = "profiler.csv" # written when the profiler is turned off
+UPDATE_BUDGET_ENABLED = True # game_loop only: path searches over the budget of a frame are deferred to the next frames (the simulation keeps it off to stay deterministic)
+UPDATE_BUDGET_MS = 4.0 # milliseconds of path searches per frame, a frame at 60 fps lasts 16.6 ms
+UPDATE_MAX_DEFERRED_FRAMES = 6 # a troop deferred this many frames in a row searches anyway
+RESERVATION_STEPS = 2 # cells of its path a walking troop claims ahead in the reservation table
+RESERVATION_MAX_WAIT_TICKS = 10 # ticks a blocked troop waits for a cell that is going to free up before searching a new path
+PATH_REPAIR_RADIUS = 4 # a blocked path is repaired with a detour inside this many cells from the troop before running a full search
+PATH_REPAIR_MAX_NODES = 64 # cells the repair search can expand
+HIERARCHICAL_MIN_ROWS = 160 # arenas with at least this many rows (multiplier 5 and up) use hierarchical pathfinding, smaller ones search the cells directly
+HIERARCHICAL_CLUSTER_SIZE = 16 # side in cells of the clusters of the hierarchical pathfinding
+HIERARCHICAL_ENTRANCE_SPLIT = 6 # border runs longer than this get an entrance at each end instead of one in the middle
+HIERARCHICAL_REFINED_SEGMENTS = 2 # abstract segments turned into cells per query, the troop searches again when it walked them
+GROUP_MAX_SEPARATION = 1 # cells a group member can be away from its place in the formation and still follow the leader
+SEARCH_RADIUS_FACTOR = 2 # searches towards a locked troop don't go further than this many aggro ranges from the troop
+SEARCH_MAX_EXPANSIONS = 200 * MULTIPLIER_GRID_HEIGHT ** 2 # cells a search started by the targeting can expand, then it returns the partial path found so far
+MATCH_SEED = None # seed of the match random generator, None picks a different one every match
 
@@ -0,0 +1,227 @@
+"""
+Binary heaps for the scheduled events of the arena and for the heap benchmarks.
+BinaryHeap is the queue of the attack events (Arena.schedule_event). IndexedHeap has no users in the game, it is kept only for
+benchmarks/heap_operations.py: A* and the hierarchical search measured faster with heapq and lazy deletion than with decrease key.
+"""
+
+class BinaryHeap:
+    """
+    Min binary heap stored in a list, the children of the item at i are at 2i + 1 and 2i + 2
+    Items are compared with <, tuples like (priority, counter, value) keep the order stable between equal priorities
+    """
+    def __init__(self, items=None):
+        """
+        - Time: Worst case = Average case = O(n) bottom up heapify of the starting items
+        - Space: O(n) for the list
+        """
+        self.items = list(items) if items else []
+        for index in range(len(self.items) // 2 - 1, -1, -1):
+            self._sift_down(index)
+
+    def __len__(self):
+        return len(self.items)
+
+    def is_empty(self):
+        """Returns True if the heap is empty, O(1) time"""
+        return not self.items
+
+    def peek(self):
+        """Returns the smallest item without removing it, None if the heap is empty, O(1) time"""
+        return self.items[0] if self.items else None
+
+    def push(self, item):
+        """
+        Adds an item to the heap
+
+        - Time: Worst case O(log n) sift up from the last leaf, Average case O(1) because most items stop near the bottom
+        - Space: O(1) amortized
+        """
+        self.items.append(item)
+        self._sift_up(len(self.items) - 1)
+
+    def pop(self):
+        """
+        Removes and returns the smallest item, None if the heap is empty like Queue and Stack
+
+        - Time: Worst case = Average case = O(log n) the last leaf is moved to the root and sifted down
+        - Space: O(1)
+        """
+        items = self.items
+        if not items:
+            return None
+        last = items.pop()
+        if not items:
+            return last
+        smallest = items[0]
+        items[0] = last
+        self._sift_down(0)
+        return smallest
+
+    def _sift_up(self, index):
+        """Moves the item at index up while it is smaller than its parent, O(log n) time"""
+        items = self.items
+        item = items[index]
+        while index > 0:
+            parent = (index - 1) >> 1
+            if not item < items[parent]:
+                break
+            items[index] = items[parent] # we move the parent down and write the item once at the end
+            index = parent
+        items[index] = item
+
+    def _sift_down(self, index):
+        """Moves the item at index down while a child is smaller, O(log n) time"""
+        items = self.items
+        size = len(items)
+        item = items[index]
+        child = 2 * index + 1
+        while child < size:
+            if child + 1 < size and items[child + 1] < items[child]:
+                child += 1
+            if not items[child] < item:
+                break
+            items[index] = items[child]
+            index = child
+            child = 2 * index + 1
+        items[index] = item
+
+
+class IndexedHeap:
+    """
+    Min binary heap of keys with a priority each, a dictionary keeps the position of every key in the heap
+    so the priority of a key already inside can be lowered (decrease key) instead of pushing a second copy of it
+
+    Every key carries a value (es. the parent node of a cell in a search), it is replaced together with the priority
+    """
+    def __init__(self):
+        self.entries = [] # heap ordered [priority, key, value] lists, a list so decrease key updates it in place
+        self.positions = {} # key: index of its entry in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.positions
+
+    def is_empty(self):
+        """Returns True if the heap is empty, O(1) time"""
+        return not self.entries
+
+    def priority(self, key):
+        """Returns the priority of a key inside the heap, None if it is not inside, O(1) time"""
+        position = self.positions.get(key)
+        return self.entries[position][0] if position is not None else None
+
+    def peek(self):
+        """Returns (priority, key, value) of the smallest key without removing it, None if the heap is empty, O(1) time"""
+        if not self.entries:
+            return None
+        return tuple(self.entries[0])
+
+    def push(self, key, priority, value=None):
+        """
+        Adds a key, or lowers its priority if it is already inside with a higher one,
+        returns True if the heap changed (False when the key is inside with a priority lower or equal)
+
+        - Time: Worst case O(log n) sift up, Average case O(1)
+        - Space: O(1) amortized
+
+        NOTE: with decrease key the heap holds every key once, a lazy heap keeps the old entries and has to skip them when they are popped
+        """
+        position = self.positions.get(key)
+        if position is not None:
+            entry = self.entries[position]
+            if not priority < entry[0]:
+                return False
+            entry[0] = priority
+            entry[2] = value
+            self._sift_up(position)
+            return True
+
+        self.entries.append([priority, key, value])
+        self._sift_up(len(self.entries) - 1)
+        return True
+
+    def decrease_key(self, key, priority, value=None):
+        """
+        Lowers the priority of a key already inside the heap, raises KeyError if it is missing and ValueError if the priority is higher
+
+        - Time: Worst case = Average case = O(log n) sift up from its position
+        - Space: O(1)
+        """
+        position = self.positions[key]
+        if self.entries[position][0] < priority:
+            raise ValueError("decrease_key can't raise the priority of a key")
+        self.push(key, priority, value)
+
+    def pop(self):
+        """
+        Removes the smallest key and returns (priority, key, value), None if the heap is empty
+
+        - Time: Worst case = Average case = O(log n) sift down of the last entry moved to the root
+        - Space: O(1)
+        """
+        entries = self.entries
+        if not entries:
+            return None
+        last = entries.pop()
+        if entries:
+            smallest = entries[0]
+            entries[0] = last
+            self._sift_down(0)
+        else:
+            smallest = last
+        del self.positions[smallest[1]]
+        return smallest[0], smallest[1], smallest[2]
+
+    def _sift_up(self, index):
+        """Moves the entry at index up while its priority is smaller than the one of its parent, O(log n) time"""
+        entries = self.entries
+        positions = self.positions
+        entry = entries[index]
+        priority = entry[0]
+        while index > 0:
+            parent = (index - 1) >> 1
+            parent_entry = entries[parent]
+            if not priority < parent_entry[0]:
+                break
+            entries[index] = parent_entry
+            positions[parent_entry[1]] = index
+            index = parent
+        entries[index] = entry
+        positions[entry[1]] = index
+
+    def _sift_down(self, index):
+        """Moves the entry at index down while a child has a smaller priority, O(log n) time"""
+        entries = self.entries
+        positions = self.positions
+        size = len(entries)
+        entry = entries[index]
+        priority = entry[0]
+        child = 2 * index + 1
+        while child < size:
+            child_entry = entries[child]
+            if child + 1 < size and entries[child + 1][0] < child_entry[0]:
+                child += 1
+                child_entry = entries[child]
+            if not child_entry[0] < priority:
+                break
+            entries[index] = child_entry
+            positions[child_entry[1]] = index
+            index = child
+            child = 2 * index + 1
+        entries[index] = entry
+        positions[entry[1]] = index
+
+
+if __name__ == "__main__":
+    heap = BinaryHeap([5, 3, 8, 1])
+    heap.push(2)
+    print([heap.pop() for _ in range(len(heap))])
+
+    indexed = IndexedHeap()
+    indexed.push("a", 5)
+    indexed.push("b", 3)
+    indexed.push("c", 4)
+    indexed.decrease_key("a", 1)
+    print([indexed.pop()[1] for _ in range(len(indexed))])
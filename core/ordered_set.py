@@ -0,0 +1,54 @@
+class OrderedSet:
+    """
+    Set that iterates in insertion order, backed by a dictionary with None values
+
+    A normal set of troops iterates by memory address (the default hash of an object),
+    which changes from run to run, so two runs with the same seed could update the troops in a different order.
+    """
+    def __init__(self, values=None):
+        self.items = {}
+        if values:
+            for value in values:
+                self.items[value] = None
+
+    def add(self, value):
+        """
+        Adds a value at the end of the order, values already inside keep their position
+
+        - Time: Worst case O(n) on rehash, Average case O(1) hash table insert
+        - Space: O(1)
+        """
+        self.items[value] = None
+
+    def remove(self, value):
+        """
+        Removes a value, raises KeyError if it is missing like set.remove
+
+        - Time: Worst case O(n), Average case O(1) hash table delete
+        - Space: O(1)
+        """
+        del self.items[value]
+
+    def discard(self, value):
+        """Removes a value if it is inside, O(1) average time"""
+        self.items.pop(value, None)
+
+    def __contains__(self, value):
+        return value in self.items
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __repr__(self):
+        return f"OrderedSet({list(self.items)})"
+
+
+if __name__ == "__main__":
+    ordered_set = OrderedSet([3, 1, 2])
+    ordered_set.add(1)
+    ordered_set.discard(3)
+    ordered_set.add(3)
+    print(ordered_set) # OrderedSet([1, 2, 3])
@@ -0,0 +1,57 @@
+from array import array
+
+UNVISITED = -1 # parent of the cells the search didn't reach
+NO_PARENT = -2 # parent of the start cell
+
+
+class ParentArray:
+    """
+    Parent links of a grid search stored as one int per cell (flat index row * width + col),
+    it replaces the visited set and the Node linked list of the path: a cell is visited when its parent is set
+    """
+    def __init__(self, height, width):
+        """
+        - Time: Worst case = Average case = O(h * w) to fill the array
+        - Space: O(h * w) one int per cell
+        """
+        self.width = width
+        self.parents = array("i", [UNVISITED]) * (height * width)
+
+    def index(self, cell):
+        """Flat index of a (row, col) cell, O(1) time"""
+        return cell[0] * self.width + cell[1]
+
+    def is_visited(self, index):
+        """Returns True if the cell at index already has a parent (or is the start), O(1) time"""
+        return self.parents[index] != UNVISITED
+
+    def visit(self, index, parent_index=NO_PARENT):
+        """Sets the parent of the cell at index, the start cell has no parent, O(1) time"""
+        self.parents[index] = parent_index
+
+    def reconstruct_path(self, last_index):
+        """
+        Path of (row, col) cells from the start to the cell at last_index following the parents back
+
+        - Time: Worst case = Average case = O(n) where n is the path length, one walk back and one reverse
+        - Space: O(n) for the path list
+
+        NOTE: same result of linked_list.reconstruct_path, the list is reversed in place instead of going through a Stack
+        """
+        width = self.width
+        parents = self.parents
+        path = []
+        index = last_index
+        while index >= 0:
+            path.append(divmod(index, width))
+            index = parents[index]
+        path.reverse()
+        return path
+
+
+if __name__ == "__main__":
+    parents = ParentArray(2, 3)
+    parents.visit(0)
+    parents.visit(4, 0)
+    parents.visit(5, 4)
+    print(parents.reconstruct_path(5))
@@ -0,0 +1,125 @@
+import csv
+import time
+import functools
+from collections import deque
+from constants import *
+
+"""
+Per frame profiler: functions decorated with @profiled(section) add their time to the section of the current frame,
+counters (es nodes expanded by the pathfinding) are added with profiler.count.
+At the end of every frame the totals go in a ring buffer (the last PROFILER_HISTORY_FRAMES frames) that can be exported to csv.
+
+When the profiler is disabled a decorated call costs one attribute check, nothing is timed or stored.
+"""
+
+class Profiler:
+    """
+    Collects section times and counters per frame, the history is a ring buffer (deque with maxlen)
+    """
+    def __init__(self, history_size=PROFILER_HISTORY_FRAMES, enabled=PROFILER_ENABLED):
+        self.enabled = enabled
+        self.section_times = {} # current frame, key: section value: seconds
+        self.counters = {} # current frame, key: counter value: amount
+        self.section_names = {} # every section and counter ever seen in order (dictionaries as ordered sets), used as csv columns
+        self.counter_names = {}
+        self.history = deque(maxlen=history_size) # (frame, frame seconds, section times, counters), old frames are dropped in O(1)
+        self.last_frame_end = time.perf_counter()
+
+    def add_time(self, section, seconds):
+        """Adds time to a section of the current frame, O(1) time"""
+        self.section_times[section] = self.section_times.get(section, 0.0) + seconds
+
+    def count(self, counter, amount=1):
+        """Adds to a counter of the current frame, O(1) time"""
+        if self.enabled:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def end_frame(self, frame):
+        """
+        Stores the totals of the frame in the history and starts a new one
+
+        - Time: Worst case = Average case = O(s + c) where s are the sections and c the counters of the frame
+        - Space: O(s + c) per stored frame, O(f * (s + c)) for the whole ring buffer of f frames
+        """
+        now = time.perf_counter()
+        if self.enabled:
+            for section in self.section_times:
+                self.section_names[section] = None
+            for counter in self.counters:
+                self.counter_names[counter] = None
+            self.history.append((frame, now - self.last_frame_end, self.section_times, self.counters))
+            self.section_times = {}
+            self.counters = {}
+        self.last_frame_end = now
+
+    def toggle(self):
+        """Enables or disables the profiler, the data of a half measured frame is dropped, O(1) time"""
+        self.enabled = not self.enabled
+        self.section_times = {}
+        self.counters = {}
+        self.last_frame_end = time.perf_counter()
+        return self.enabled
+
+    def reset(self):
+        """Drops the whole history, O(1) time"""
+        self.history.clear()
+        self.section_times = {}
+        self.counters = {}
+
+    def averages(self, frames=PROFILER_PANEL_FRAMES):
+        """
+        Average milliseconds per frame of every section (and of the whole frame) and average counters per frame over the last frames
+
+        - Time: Worst case = Average case = O(f * (s + c)) where f is the number of frames averaged
+        - Space: O(s + c)
+        """
+        recent = list(self.history)[-frames:]
+        if not recent:
+            return 0.0, {}, {}
+
+        frame_ms = sum(row[1] for row in recent) * 1000 / len(recent)
+        section_ms = {section: sum(row[2].get(section, 0.0) for row in recent) * 1000 / len(recent) for section in self.section_names}
+        counters = {counter: sum(row[3].get(counter, 0) for row in recent) / len(recent) for counter in self.counter_names}
+        return frame_ms, section_ms, counters
+
+    def export_csv(self, path=PROFILER_CSV_PATH):
+        """
+        Writes the ring buffer to a csv file, one row per frame with the times in milliseconds
+
+        - Time: Worst case = Average case = O(f * (s + c))
+        - Space: O(s + c) one row at a time
+        """
+        sections = list(self.section_names)
+        counters = list(self.counter_names)
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["frame", "frame_ms"] + [f"{section}_ms" for section in sections] + counters)
+            for frame, frame_seconds, section_times, frame_counters in self.history:
+                writer.writerow(
+                    [frame, round(frame_seconds * 1000, 4)]
+                    + [round(section_times.get(section, 0.0) * 1000, 4) for section in sections]
+                    + [frame_counters.get(counter, 0) for counter in counters]
+                )
+        return path
+
+
+profiler = Profiler() # one profiler for the whole process, like the constants
+
+def profiled(section):
+    """
+    Decorator that adds the time of every call to a section of the profiler
+
+    NOTE: the check on profiler.enabled happens at call time so the profiler can be turned on and off while the game runs
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                profiler.add_time(section, time.perf_counter() - start)
+        return wrapper
+    return decorator
@@ -0,0 +1,64 @@
+class RingQueue:
+    """
+    FIFO Queue backed by a fixed size list used as a ring buffer, head and tail are indices that wrap around
+
+    Queue allocates a Node for every enqueue, this one reuses the same slots so a search doesn't create one object per visited cell.
+    """
+    def __init__(self, capacity=16):
+        self.items = [None] * max(capacity, 1)
+        self.head = 0 # index of the first value
+        self.size = 0
+
+    def is_empty(self):
+        """Returns True if the queue is empty, O(1) time"""
+        return self.size == 0
+
+    def __len__(self):
+        return self.size
+
+    def enqueue(self, value):
+        """
+        Enqueues a value at the back of the queue
+
+        - Time: Worst case O(n) when the buffer is full and doubles, Average case O(1) amortized
+        - Space: O(1), O(n) when the buffer doubles
+
+        NOTE: a BFS over a grid enqueues every cell at most once, giving h*w as capacity it never grows
+        """
+        capacity = len(self.items)
+        if self.size == capacity:
+            # unroll the ring in order in a buffer twice as big
+            self.items = self.items[self.head:] + self.items[:self.head] + [None] * capacity
+            self.head = 0
+            capacity *= 2
+        tail = self.head + self.size
+        if tail >= capacity:
+            tail -= capacity
+        self.items[tail] = value
+        self.size += 1
+
+    def dequeue(self):
+        """
+        Dequeues a value from the front of the queue, None if it is empty like Queue
+
+        - Time: Worst case = Average case = O(1) moves the head index
+        - Space: O(1) no extra space
+        """
+        if self.size == 0:
+            return None
+        value = self.items[self.head]
+        self.items[self.head] = None # don't keep a reference to the value
+        self.head += 1
+        if self.head == len(self.items):
+            self.head = 0
+        self.size -= 1
+        return value
+
+
+if __name__ == "__main__":
+    queue = RingQueue(2)
+    queue.enqueue(1)
+    queue.enqueue(2)
+    queue.enqueue(3)
+    print(queue.dequeue())
+    print(queue.dequeue())
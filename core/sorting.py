@@ -15,19 +15,84 @@ def merge_by_key(left, right, key, reverse=False):
             result.append(right[j]); j += 1
     return result + left[i:] + right[j:]
 
+def find_runs(keys, order):
+    """
+    Splits order (indices into keys) in already sorted runs, strictly descending runs are reversed in place so every run is ascending
+    Returns the start of every run plus len(order) at the end
+
+    - Time: Worst case = Average case = O(n) one pass over the keys
+    - Space: O(r) for the run starts where r is the number of runs
+
+    NOTE: only strictly descending runs are reversed, reversing equal keys would break the stability
+    """
+    n = len(order)
+    starts = [0]
+    start = 0
+    while start < n:
+        end = start + 1
+        if end < n and keys[order[end]] < keys[order[end - 1]]:
+            while end < n and keys[order[end]] < keys[order[end - 1]]:
+                end += 1
+            order[start:end] = order[start:end][::-1]
+        else:
+            while end < n and not keys[order[end]] < keys[order[end - 1]]:
+                end += 1
+        starts.append(end)
+        start = end
+    return starts
+
 def merge_sort_by_key(items, key, reverse=False):
     """
-    Merge sort implementation with custom key function
+    Merge sort implementation with custom key function, bottom-up natural merge sort
+
+    - Time: Worst case = Average case = O(n log r) where r is the number of already sorted runs found in the input (r <= n),
+            so O(n) on sorted, reversed or nearly sorted inputs and O(n log n) on random ones
+    - Space: O(n) for the cached keys and the two index buffers, no recursion
 
-    - Time: Worst case = Average case = O(n log n) divides list in half recursively log n levels and merges at each level with n work
-    - Space: O(n) for temporary arrays during merge plus O(log n) recursion stack
+    NOTE: key is called once per item (the keys are cached in a list), the merges move indices between two buffers allocated once
+    instead of slicing and concatenating new lists at every level
+    NOTE: with reverse the result is the ascending one reversed, equal keys come out in the opposite order like the recursive version did
     """
-    if len(items) <= 1:
+    n = len(items)
+    if n <= 1:
         return items
-    mid = len(items) // 2
-    left = merge_sort_by_key(items[:mid], key, reverse)
-    right = merge_sort_by_key(items[mid:], key, reverse)
-    return merge_by_key(left, right, key, reverse)
+
+    keys = [key(item) for item in items]
+    source = list(range(n)) # indices of items, merged by their keys
+    target = [0] * n
+    starts = find_runs(keys, source)
+
+    # every pass merges the runs two by two from source to target, then the buffers swap
+    while len(starts) > 2:
+        merged_starts = [0]
+        for run in range(0, len(starts) - 1, 2):
+            low = starts[run]
+            if run + 2 >= len(starts):
+                # odd run out, it is copied as it is
+                high = starts[run + 1]
+                target[low:high] = source[low:high]
+                merged_starts.append(high)
+                continue
+            middle, high = starts[run + 1], starts[run + 2]
+            i, j, k = low, middle, low
+            while i < middle and j < high:
+                # <= on the left one keeps equal keys in their original order (stable)
+                if keys[source[i]] <= keys[source[j]]:
+                    target[k] = source[i]; i += 1
+                else:
+                    target[k] = source[j]; j += 1
+                k += 1
+            if i < middle:
+                target[k:high] = source[i:middle]
+            else:
+                target[k:high] = source[j:high]
+            merged_starts.append(high)
+        source, target = target, source
+        starts = merged_starts
+
+    if reverse:
+        source.reverse()
+    return [items[index] for index in source]
 
 def sort_for_visualization(unique_troops, ascending_order=True):
     """
@@ -1,10 +1,42 @@
 import math
 from deck.stats import stats
 
+def card_stat(key):
+    """
+    Read only attribute of Card that reads the stats dictionary of its troop, card.cost reads stats[troop_name]["troop_cost"]
+
+    - Time: Worst case = Average case = O(1) hash table lookup
+    - Space: O(1)
+    """
+    return property(lambda card: card.stats.get(key), doc=f"{key} of the shared stats of the troop")
+
+
 class Card:
     """
     Represents a playable card that spawns troops
+
+    NOTE: the stats are not copied, every card keeps a reference to the dictionary of its troop inside deck.stats (shared by all the cards of that troop)
     """
+    __slots__ = ("name", "troop_class", "color", "asset_manager", "troop_name", "stats")
+
+    troop_health = card_stat("troop_health")
+    troop_damage = card_stat("troop_damage")
+    troop_movement_speed = card_stat("troop_movement_speed")
+    troop_can_fly = card_stat("troop_can_fly")
+    troop_attack_type = card_stat("troop_attack_type")
+    troop_attack_speed = card_stat("troop_attack_speed")
+    troop_attack_range = card_stat("troop_attack_range")
+    troop_attack_aggro_range = card_stat("troop_attack_aggro_range")
+    troop_attack_tile_radius = card_stat("troop_attack_tile_radius")
+    troop_width = card_stat("troop_width")
+    troop_height = card_stat("troop_height")
+    cost = card_stat("troop_cost")
+    troop_count = card_stat("troop_count")
+    scale_multiplier = card_stat("scale_multiplier")
+    troop_type = card_stat("troop_type")
+    troop_favorite_target = card_stat("troop_favorite_target")
+    troop_can_target_air = card_stat("troop_can_target_air")
+
     def __init__(self, 
     name, 
     color, 
@@ -12,12 +44,10 @@ class Card:
     troop_name,
     asset_manager=None):
         """
-        Initializes a card by loading stats from the stats dictionary (hash table)
+        Initializes a card with a reference to the stats of its troop in the stats dictionary (hash table)
 
-        - Time: Worst case = Average case = O(1)
-            - Dictionary membership check 'in stats' is O(1) average
-            - 17 hash table lookups via stats.get().get() are each O(1)
-        - Space: O(1) stores fixed number of attributes
+        - Time: Worst case = Average case = O(1) dictionary membership check 'in stats' is O(1) average
+        - Space: O(1) stores fixed number of attributes, the stats are shared
 
         NOTE: Uses hash table lookups for O(1) stat retrieval instead of linear search through a list which would be O(n).
         """
@@ -29,23 +59,7 @@ class Card:
 
         self.troop_name = troop_name
         if troop_name in stats:
-            self.troop_health = stats.get(troop_name).get("troop_health")
-            self.troop_damage = stats.get(troop_name).get("troop_damage")
-            self.troop_movement_speed = stats.get(troop_name).get("troop_movement_speed")
-            self.troop_can_fly = stats.get(troop_name).get("troop_can_fly")
-            self.troop_attack_type = stats.get(troop_name).get("troop_attack_type")
-            self.troop_attack_speed = stats.get(troop_name).get("troop_attack_speed")
-            self.troop_attack_range = stats.get(troop_name).get("troop_attack_range")
-            self.troop_attack_aggro_range = stats.get(troop_name).get("troop_attack_aggro_range")
-            self.troop_attack_tile_radius = stats.get(troop_name).get("troop_attack_tile_radius")
-            self.troop_width = stats.get(troop_name).get("troop_width")
-            self.troop_height = stats.get(troop_name).get("troop_height")
-            self.cost = stats.get(troop_name).get("troop_cost")
-            self.troop_count = stats.get(troop_name).get("troop_count")
-            self.scale_multiplier = stats.get(troop_name).get("scale_multiplier")
-            self.troop_type = stats.get(troop_name).get("troop_type")
-            self.troop_favorite_target = stats.get(troop_name).get("troop_favorite_target")
-            self.troop_can_target_air = stats.get(troop_name).get("troop_can_target_air")
+            self.stats = stats[troop_name]
         else:
             raise ValueError(f"Troop {troop_name} not found in stats")
 
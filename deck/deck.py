@@ -6,8 +6,9 @@ class Deck:
     """
     Manages a deck of cards using a queue for draw order
     """
-    def __init__(self, cards):
+    def __init__(self, cards, rng=None):
         self.full_list = cards
+        self.rng = rng if rng is not None else random # a seeded random.Random makes the shuffles reproducible, the module keeps the old behaviour
         self.cards = None
         self.list_to_queue(cards)
 
@@ -24,14 +25,14 @@ class Deck:
 
     def shuffle_cards(self):
         """
-        Shuffles deck using Fisher-Yates shuffle (via random.shuffle)
+        Shuffles deck using Fisher-Yates shuffle (via random.shuffle of the deck generator)
 
         - Time: Worst case = Average case = O(n) for shuffle plus O(n) for queue rebuild equals O(n)
         - Space: O(n) for new queue
 
         We used an already existing library because we felt like the manual implementation wouldn't have added much value
         """
-        random.shuffle(self.full_list)
+        self.rng.shuffle(self.full_list)
         self.list_to_queue(self.full_list)
 
     def get_card(self):
@@ -8,7 +8,8 @@ from troops.bot import GreedyBot
 from UI.menu import run_deck_builder
 from troops.generic_troop import Troop
 from assets.asset_manager import AssetManager
-from UI.components.debug_ui import draw_attack_ranges
+from core.profiler import profiler
+from UI.components.debug_ui import draw_attack_ranges, draw_profiler_panel
 from UI.finish_battle_screen import FinishBattleScreen
 from UI.components.arena_ui import draw_arena, draw_units
 from UI.components.hand_ui import draw_elixir_icon, draw_hand
@@ -65,8 +66,9 @@ def setup_arena():
     screen = pygame.display.set_mode((int(cols * tile_size), int(rows * tile_size) + HAND_AREA_HEIGHT))
     clock = pygame.time.Clock()
 
-    arena = Arena(rows)
+    arena = Arena(rows, seed=MATCH_SEED)
     arena.asset_manager = asset_manager
+    arena.update_scheduler.enabled = UPDATE_BUDGET_ENABLED # path searches over the frame budget wait for the next frames, only in the interactive game
     arena.world_generation()
     arena.arena_background_dirty = True
 
@@ -74,16 +76,10 @@ def game_tick():
     """
     Processes one game tick - updates all troop movements
 
-    - Time: Worst case = Average case = O(n * (n + V + E)) where:
-        - n is the number of active troops
-        - For each troop: O(n) linear scan to find closest enemy + O(V + E) BFS pathfinding
-        - V = h * w grid cells, E = up to 8V edges for 8-directional movement
+    - Time: Worst case = Average case = O(n * (k + V + E)) see Arena.update_troops
     - Space: O(V) per troop for path storage, O(n * V) total in worst case
     """
-    # only every N frames
-    if arena.frame_count % TICK_RATE == 0:
-        for troop in list(arena.unique_troops):
-            troop.move_to_tower()
+    arena.update_troops()
 
 """FONT"""
 def get_font(font_size=24):
@@ -108,12 +104,12 @@ while looping: # bigger loop for the game loop
     ]
 
     setup_arena()
-    deck_p1 = run_deck_builder(screen, asset_manager)
+    deck_p1 = run_deck_builder(screen, asset_manager, rng=arena.rng)
     if deck_p1 is None:
         break
 
     deck_p1.shuffle_cards()
-    deck_p2 = Deck(cards)
+    deck_p2 = Deck(cards, rng=arena.rng)
     deck_p2.shuffle_cards()
 
     finish_battle_screen = None
@@ -136,6 +132,11 @@ while looping: # bigger loop for the game loop
             if event.type == pygame.QUIT:
                 pygame.quit()
                 exit()
+
+            # F3 turns the profiler on and off, when it is turned off the recorded frames are saved to csv
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                if not profiler.toggle():
+                    print(f"Profiler data saved to {profiler.export_csv()}")
             
             # left click
             if event.type == pygame.MOUSEBUTTONDOWN:
@@ -196,6 +197,8 @@ while looping: # bigger loop for the game loop
         if DRAW_ATTACK_RANGES_DEBUG:
             draw_attack_ranges(arena, tile_size, screen)
 
+        draw_profiler_panel(profiler, screen, get_font(20), 10, 40, update_scheduler=arena.update_scheduler)
+
         card_rects = draw_hand(player_1, rows, cols, tile_size, asset_manager, screen, selected_card=selected_card)
 
         font = get_font(30)
@@ -218,7 +221,11 @@ while looping: # bigger loop for the game loop
             )
 
         pygame.display.flip()
-        clock.tick(TICKS_PER_SECOND+1) # we add 1 to have a bit of a margin, sometimes it goes a bit slow
+        profiler.end_frame(arena.frame_count)
+        if FIXED_STEP_MODE:
+            clock.tick() # no cap, one tick per frame as fast as possible (still measures the fps)
+        else:
+            clock.tick(TICKS_PER_SECOND+1) # we add 1 to have a bit of a margin, sometimes it goes a bit slow
     
     print("Match over")
 
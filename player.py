@@ -1,4 +1,5 @@
 from core.linear_search import linear_search
+from troops.troop_group import TroopGroup
 
 class Player:
     """
@@ -20,6 +21,10 @@ class Player:
 
         # at base rate it's 1 Elixir every 2.8 seconds, which equals to 0.06 every tick
         self.elixir_per_tick = 0.006 # every tick, with a bit of eccess (0,0008) but it is fine in this case
+
+        # match stats, read by the headless simulation
+        self.elixir_spent = 0
+        self.cards_played = 0
     
     def increase_elixir(self):
         """
@@ -69,8 +74,12 @@ class Player:
                 if not self.arena.spawn_unit(troops[index], position):
                     print("Strange failure spawning troops")
                     return False
+            if len(formation_positions) > 1:
+                TroopGroup(troops[:len(formation_positions)]) # one leader path for the formation, the others follow it
 
         self.current_elixir = self.current_elixir - cost
+        self.elixir_spent += cost
+        self.cards_played += 1
         # use my custom linear search to find the card index
         index = linear_search(self.hand, card)
         if index != -1:
@@ -0,0 +1,163 @@
+import io
+import time
+import contextlib
+from constants import *
+from player import Player
+from deck.card import Card
+from deck.deck import Deck
+from arena.arena import Arena
+from troops.bot import GreedyBot
+from troops.generic_troop import Troop
+from core.profiler import profiler
+
+"""
+Headless match runner: same arena, players, bots and troop updates of game_loop.py but without pygame,
+no window, no sprites and no clock so a match runs as fast as the cpu allows (always in fixed step mode).
+"""
+
+# same cards the bot uses in game_loop.py
+default_deck = [
+    "barbarian", "archer", "giant", "goblins", "dart goblin", "elite barbs",
+    "knight", "mini pekka", "musketeer", "pekka", "bats", "skeletons",
+]
+
+def build_deck(troop_names, rng=None):
+    """
+    Builds a deck from a list of troop names, cards have no asset manager so troops never load sprites
+    rng: random generator used to shuffle the deck (the arena one in a simulation)
+
+    - Time: Worst case = Average case = O(n) where n is the number of cards
+    - Space: O(n) for the cards and the queue
+    """
+    cards = [
+        Card(name=f"{troop_name} {index + 1}", color=(128, 128, 128), troop_class=Troop, troop_name=troop_name, asset_manager=None)
+        for index, troop_name in enumerate(troop_names)
+    ]
+    return Deck(cards, rng=rng)
+
+
+class Simulation:
+    """
+    Match between two GreedyBots without any rendering
+
+    Usage:
+        result = Simulation(deck_p1=["knight", ...], deck_p2=["giant", ...]).run()
+    """
+    def __init__(self, deck_p1=None, deck_p2=None, seed=None, rows=None, max_frames=None, verbose=False):
+        """
+        deck_p1, deck_p2: lists of troop names (keys of deck.stats), default_deck if None
+        seed: seed of the match random generator, the same seed and decks always play the same match
+        rows: arena height in cells, the same of game_loop.py if None
+        max_frames: stops the match early (for quick benchmarks), None plays the full 3 minutes
+        verbose: keeps the prints of the arena and players, they are silenced by default
+        """
+        self.deck_p1 = list(deck_p1) if deck_p1 else list(default_deck)
+        self.deck_p2 = list(deck_p2) if deck_p2 else list(default_deck)
+        self.rows = rows if rows else int(BASE_GRID_HEIGHT * MULTIPLIER_GRID_HEIGHT)
+        self.seed = seed
+        self.max_frames = max_frames
+        self.verbose = verbose
+
+        self.arena = None
+        self.player_1 = None
+        self.player_2 = None
+        self.bot_1 = None
+        self.bot_2 = None
+        self.elapsed_seconds = 0.0
+
+    def setup(self):
+        """
+        Creates the arena, the players and their bots
+
+        - Time: Worst case = Average case = O(h * w) for arena grid creation and world generation
+        - Space: O(h * w) for the arena grids
+        """
+        self.arena = Arena(self.rows, seed=self.seed)
+        self.arena.world_generation()
+
+        # both decks use the arena generator so the whole match depends on a single seed
+        deck_p1 = build_deck(self.deck_p1, rng=self.arena.rng)
+        deck_p2 = build_deck(self.deck_p2, rng=self.arena.rng)
+        deck_p1.shuffle_cards()
+        deck_p2.shuffle_cards()
+
+        self.player_1 = Player(name="Player 1", deck=deck_p1, team=1, arena=self.arena)
+        self.player_2 = Player(name="Player 2", deck=deck_p2, team=2, arena=self.arena)
+        self.player_1.setup_hand()
+        self.player_2.setup_hand()
+
+        self.bot_1 = GreedyBot(self.player_1, self.arena)
+        self.bot_2 = GreedyBot(self.player_2, self.arena)
+
+    def step(self):
+        """
+        Plays one frame in the same order of game_loop.py (tick, bots, elixir, troops), returns False when the match is over
+
+        - Time: Worst case = Average case = O(n * (k + V + E)) see Arena.update_troops, plus the two bots thinking every other frame
+        - Space: O(V) per troop for path storage
+        """
+        if not self.arena.tick():
+            return False
+        if self.max_frames is not None and self.arena.frame_count > self.max_frames:
+            return False
+
+        if self.arena.frame_count % 2 == 0:
+            for bot, player in ((self.bot_1, self.player_1), (self.bot_2, self.player_2)):
+                bot_card, bot_position = bot.think()
+                if bot_card and bot_position:
+                    player.place_troop(bot_position, bot_card)
+
+        self.player_1.increase_elixir()
+        self.player_2.increase_elixir()
+
+        self.arena.update_troops()
+        profiler.end_frame(self.arena.frame_count) # only stores something if the profiler was enabled
+        return True
+
+    def run(self):
+        """
+        Plays a whole match and returns its result (see get_result)
+
+        - Time: Worst case = Average case = O(f * n * (k + V + E)) where f is the number of frames (10800 for a full match)
+        - Space: O(h * w) for the arena plus the paths of the troops
+        """
+        start_time = time.perf_counter()
+        if self.verbose:
+            self._play()
+        else:
+            # the arena and the players print a lot, with thousands of matches that is most of the time spent
+            with contextlib.redirect_stdout(io.StringIO()):
+                self._play()
+        self.elapsed_seconds = time.perf_counter() - start_time
+        return self.get_result()
+
+    def _play(self):
+        self.setup()
+        while self.step():
+            pass
+
+    def get_result(self):
+        """
+        Outcome and stats of the match, a plain dictionary so it can be sent between processes
+
+        - Time: Worst case = Average case = O(1)
+        - Space: O(1)
+        """
+        winner_team, number_of_crowns = self.arena.get_match_result()
+        return {
+            "winner_team": winner_team, # 0 is a draw
+            "crowns": number_of_crowns,
+            "crowns_p1": 3 if 0 not in self.arena.towers_P2 else 3 - len(self.arena.towers_P2), # the king tower gives all 3 crowns
+            "crowns_p2": 3 if 0 not in self.arena.towers_P1 else 3 - len(self.arena.towers_P1),
+            "elixir_spent_p1": self.player_1.elixir_spent,
+            "elixir_spent_p2": self.player_2.elixir_spent,
+            "cards_played_p1": self.player_1.cards_played,
+            "cards_played_p2": self.player_2.cards_played,
+            "seed": self.seed,
+            "frames": self.arena.frame_count,
+            "seconds": self.elapsed_seconds,
+        }
+
+
+if __name__ == "__main__":
+    print(Simulation().run())
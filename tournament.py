@@ -0,0 +1,173 @@
+import os
+import json
+import time
+import random
+import argparse
+from multiprocessing import Pool
+from deck.stats import stats
+from simulation import Simulation, default_deck
+
+"""
+Bot vs bot tournament: plays many headless matches on a process pool (one worker per core by default)
+and collects the results in a single summary.
+Every match is independent (own arena, players and seed) so the workers share nothing and only the result dictionaries travel back.
+
+Usage:
+    python tournament.py --matches 200
+    python tournament.py --matches 200 --random-decks --seed 7
+    python tournament.py --pairs pairs.json   (json list of [deck_p1, deck_p2] troop name lists)
+"""
+
+DECK_SIZE = 8
+
+def random_deck_pair(seed):
+    """
+    Draws two random decks of DECK_SIZE different troops, the same seed always gives the same pair
+
+    - Time: Worst case = Average case = O(s) where s is the number of troop stats
+    - Space: O(s)
+    """
+    rng = random.Random(seed)
+    troop_names = sorted(stats)
+    return rng.sample(troop_names, DECK_SIZE), rng.sample(troop_names, DECK_SIZE)
+
+def build_jobs(matches, base_seed, pairs=None, random_decks=False, max_frames=None):
+    """
+    One job per match: (match index, seed, deck_p1, deck_p2, max_frames), deck pairs are used round robin
+
+    - Time: Worst case = Average case = O(m) where m is the number of matches
+    - Space: O(m) for the jobs
+    """
+    if not pairs:
+        pairs = [(default_deck, default_deck)]
+
+    jobs = []
+    for match_index in range(matches):
+        seed = base_seed + match_index
+        if random_decks:
+            deck_p1, deck_p2 = random_deck_pair(seed)
+        else:
+            deck_p1, deck_p2 = pairs[match_index % len(pairs)]
+        jobs.append((match_index, seed, list(deck_p1), list(deck_p2), max_frames))
+    return jobs
+
+def play_match(job):
+    """
+    Worker function, plays one headless match and returns its result with the job information
+
+    - Time: Worst case = Average case = O(f * n * (k + V + E)) see Simulation.run
+    - Space: O(h * w) for the arena
+    """
+    match_index, seed, deck_p1, deck_p2, max_frames = job
+    # every match is reproducible on its own, no matter which worker runs it
+    result = Simulation(deck_p1=deck_p1, deck_p2=deck_p2, seed=seed, max_frames=max_frames).run()
+    result["match_index"] = match_index
+    result["deck_p1"] = deck_p1
+    result["deck_p2"] = deck_p2
+    return result
+
+def summarize(results):
+    """
+    Aggregates the match results: wins, draws, crowns and elixir spent for each team
+
+    - Time: Worst case = Average case = O(m) where m is the number of results
+    - Space: O(1)
+    """
+    summary = {
+        "matches": len(results),
+        "wins_p1": 0,
+        "wins_p2": 0,
+        "draws": 0,
+        "crowns_p1": 0,
+        "crowns_p2": 0,
+        "elixir_spent_p1": 0,
+        "elixir_spent_p2": 0,
+        "frames": 0,
+        "cpu_seconds": 0.0,
+    }
+    for result in results:
+        if result["winner_team"] == 1:
+            summary["wins_p1"] += 1
+        elif result["winner_team"] == 2:
+            summary["wins_p2"] += 1
+        else:
+            summary["draws"] += 1
+        summary["crowns_p1"] += result["crowns_p1"]
+        summary["crowns_p2"] += result["crowns_p2"]
+        summary["elixir_spent_p1"] += result["elixir_spent_p1"]
+        summary["elixir_spent_p2"] += result["elixir_spent_p2"]
+        summary["frames"] += result["frames"]
+        summary["cpu_seconds"] += result["seconds"]
+    return summary
+
+def run_tournament(jobs, workers=None):
+    """
+    Plays all the jobs on a pool of workers, returns (results sorted by match index, wall clock seconds)
+
+    - Time: Worst case = Average case = O(m * match) / p where m is the number of matches and p the number of workers
+    - Space: O(m) for the results
+    """
+    workers = workers if workers else os.cpu_count()
+    start_time = time.perf_counter()
+    if workers == 1:
+        results = [play_match(job) for job in jobs] # easier to profile and debug without the pool
+    else:
+        with Pool(processes=workers) as pool:
+            results = list(pool.imap_unordered(play_match, jobs))
+    wall_seconds = time.perf_counter() - start_time
+    results.sort(key=lambda result: result["match_index"])
+    return results, wall_seconds
+
+def print_summary(summary, wall_seconds, workers):
+    matches = summary["matches"]
+    if matches == 0:
+        print("No matches played")
+        return
+    print(f"Matches: {matches} on {workers} workers in {wall_seconds:.1f}s ({matches / wall_seconds:.2f} matches/s, {summary['frames'] / wall_seconds:.0f} frames/s)")
+    print(f"Wins P1: {summary['wins_p1']} ({summary['wins_p1'] / matches:.1%})  Wins P2: {summary['wins_p2']} ({summary['wins_p2'] / matches:.1%})  Draws: {summary['draws']} ({summary['draws'] / matches:.1%})")
+    print(f"Average crowns P1: {summary['crowns_p1'] / matches:.2f}  P2: {summary['crowns_p2'] / matches:.2f}")
+    print(f"Average elixir spent P1: {summary['elixir_spent_p1'] / matches:.1f}  P2: {summary['elixir_spent_p2'] / matches:.1f}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Plays headless GreedyBot vs GreedyBot matches on all cores")
+    parser.add_argument("--matches", type=int, default=100, help="number of matches to play")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes, one per core by default")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first match, match i uses seed + i")
+    parser.add_argument("--deck-p1", type=str, default=None, help="comma separated troop names for player 1")
+    parser.add_argument("--deck-p2", type=str, default=None, help="comma separated troop names for player 2")
+    parser.add_argument("--pairs", type=str, default=None, help="json file with a list of [deck_p1, deck_p2] pairs")
+    parser.add_argument("--random-decks", action="store_true", help="every match draws two random decks from its seed")
+    parser.add_argument("--max-frames", type=int, default=None, help="cut every match after this many frames")
+    parser.add_argument("--output", type=str, default=None, help="writes the results of every match and the summary to this json file")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+
+    pairs = None
+    if args.pairs:
+        with open(args.pairs) as file:
+            pairs = json.load(file)
+    elif args.deck_p1 or args.deck_p2:
+        deck_p1 = args.deck_p1.split(",") if args.deck_p1 else default_deck
+        deck_p2 = args.deck_p2.split(",") if args.deck_p2 else default_deck
+        pairs = [(deck_p1, deck_p2)]
+
+    for deck_p1, deck_p2 in pairs or []:
+        for troop_name in list(deck_p1) + list(deck_p2):
+            if troop_name not in stats:
+                raise ValueError(f"Troop {troop_name} not found in stats")
+
+    workers = args.workers if args.workers else os.cpu_count()
+    jobs = build_jobs(args.matches, args.seed, pairs=pairs, random_decks=args.random_decks, max_frames=args.max_frames)
+    results, wall_seconds = run_tournament(jobs, workers=workers)
+    summary = summarize(results)
+    print_summary(summary, wall_seconds, workers)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump({"summary": summary, "wall_seconds": wall_seconds, "results": results}, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
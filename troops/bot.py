@@ -1,3 +1,5 @@
+from core.profiler import profiled
+
 class GreedyBot:
     """
     Greedy bot that makes locally optimal choices for card and position selection
@@ -16,6 +18,7 @@ class GreedyBot:
             "building_targeter": ["goblins", "skeletons", "knight", "barbarian"],
         }
     
+    @profiled("bot")
     def think(self):
         """
         Main decision loop: scans threats, picks a card, and finds a placement position
@@ -1,12 +1,41 @@
-from math import inf
+from math import inf, ceil
 from constants import *
-from arena.utils.find_path_bfs import find_path_bfs
+from arena.utils.pathfinding import find_path
+from arena.utils.path_repair import repair_path
+from core.profiler import profiled, profiler
+from troops.troop_stats import get_troop_stats, shared_stat
 from arena.utils.random_utils import calculate_edge_to_edge_distance, is_cell_in_bounds, is_in_attack_range
 
+sidestep_directions = [(-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (1, 1), (-1, 1), (1, -1)] # same order as the bfs neighbours
+attack_phases = (("windup", 0.40), ("swing", 0.70), ("hit", 1.0)) # event and fraction of the attack speed when it comes due
+attack_phase_index = {kind: phase for phase, (kind, _) in enumerate(attack_phases)}
+
 class Troop:
     """
     Base class for all units in the game (troops and towers)
+
+    NOTE: the static stats live in a TroopStats shared by all the troops of the same type (self.stats), the ones read in the hot loops
+    (size, flying, ranges, speed) are also copied in a slot because a slot read is about 5 times faster than going through the stats
     """
+    __slots__ = (
+        "stats", "health", "team", "location", "arena", "occupancy_id", "color", "asset_manager",
+        "width", "height", "troop_can_fly", "attack_range", "attack_aggro_range", "raw_movement_speed", "is_tower", "tower_type", # copied from the stats
+        "is_alive", "is_active", "is_targetting_something", "target", "in_process_attack", "attack_token", "due_event", "search_deferred", "blocked_ticks", "group",
+        "sprite_number", "sprite", "movement_accumulator", "current_path", "current_path_index",
+    )
+
+    name = shared_stat("name")
+    max_health = shared_stat("max_health")
+    damage = shared_stat("damage")
+    attack_type = shared_stat("attack_type")
+    attack_speed = shared_stat("attack_speed")
+    attack_tile_radius = shared_stat("attack_tile_radius")
+    scale_multiplier = shared_stat("scale_multiplier")
+    troop_type = shared_stat("troop_type")
+    troop_favorite_target = shared_stat("troop_favorite_target")
+    troop_can_target_air = shared_stat("troop_can_target_air")
+    tower_number = shared_stat("tower_number")
+
     def __init__(
         self,
         name,
@@ -31,53 +60,47 @@ class Troop:
         troop_can_target_air = False,
         troop_can_fly = False,
         ):
-        self.name = name
+        stats = get_troop_stats(name, health, damage, movement_speed, attack_type, attack_speed, attack_range, attack_aggro_range, attack_tile_radius,
+                                width, height, scale_multiplier, troop_type, troop_favorite_target, troop_can_target_air, troop_can_fly)
+        self.stats = stats
         self.health = health
-        self.max_health = health
-        self.damage = damage
-        self.attack_speed = attack_speed
-        self.attack_range = int(attack_range * MULTIPLIER_GRID_HEIGHT)
-        self.attack_aggro_range = int(attack_aggro_range * MULTIPLIER_GRID_HEIGHT) # we use this to check if we are in range to get triggered by something
-        self.attack_tile_radius = int(attack_tile_radius * MULTIPLIER_GRID_HEIGHT) 
-
-        self.troop_type = troop_type
-        self.troop_favorite_target = troop_favorite_target
-        self.troop_can_target_air = troop_can_target_air
-        
-        self.team = team
-        self.width = width
-        self.height = height
 
+        self.width = stats.width
+        self.height = stats.height
+        self.troop_can_fly = stats.troop_can_fly
+        self.attack_range = stats.attack_range
+        self.attack_aggro_range = stats.attack_aggro_range
+        self.raw_movement_speed = stats.raw_movement_speed
+        self.is_tower = stats.is_tower
+
+        self.team = team
         self.tower_type = TOWER_P2 if self.team == 1 else TOWER_P1
 
         self.location = location # (row, col)
         self.arena = arena
-
         self.color = color
+        self.asset_manager = asset_manager # per match like the arena, it isn't part of the shared stats
+        self.occupancy_id = 0 # id inside the arena occupancy grids, 0 until the troop is placed
 
         self.is_alive = True
         self.is_active = True
         self.is_targetting_something = None # Value should be of value Troop, this should be changed when the troop starts attacking something so that it stops moving and doesn't focus on something else
 
-        """TOWER"""
-        self.is_tower = self.name.startswith("Tower") # check if this is a tower (towers need grid cleanup)
-        
-        self.tower_number = int(self.name.split(" ")[1]) if self.is_tower else None
-
         """EXP"""
         self.target = None
         self.in_process_attack = False
+        self.attack_token = 0 # increased every time an attack starts, scheduled events carry it
+        self.due_event = None # last event of the current attack that came due ("windup", "swing" or "hit"), attack() or handle_event() runs it
+        self.search_deferred = False # True if the last plan_path was over the frame budget and returned None without searching
+        self.blocked_ticks = 0 # consecutive ticks spent waiting for a blocked cell to free up
+        self.group = None # TroopGroup of the card that spawned this troop, members follow the path of the leader
         
         """ASSET MANAGER"""
-        self.asset_manager = asset_manager
-        self.scale_multiplier = scale_multiplier
         self.sprite_number = 0 # 0 indexed for the sprite manager
-        # open pygame surface for the sprite
-        self.sprite = self.asset_manager.get_troop_sprite(self.name, self.team, self.sprite_number)
+        # pygame surface from the asset manager cache (shared, not a copy), headless simulations have no asset manager and never draw
+        self.sprite = self.asset_manager.get_troop_sprite(self.name, self.team, self.sprite_number) if self.asset_manager else None
 
         """MOVEMENT"""
-        self.troop_can_fly = troop_can_fly
-        self.raw_movement_speed = (movement_speed * MULTIPLIER_GRID_HEIGHT / 2) # we divide by 2 just because the troops are a bit too fast, this can be fixed by changing the multiplier in the specs file but we feel like it is better to have more readable numbers there
         self.movement_accumulator = 0.0
         self.current_path = None
         self.current_path_index = 0
@@ -85,21 +108,61 @@ class Troop:
     """HELPER FUNCTIONS"""        
     def get_occupancy_grid(self):
         """
-        Returns the appropriate occupancy grid dictionary for this troop type
+        Returns the appropriate occupancy grid for this troop type
 
         - Time: O(1) returns reference to existing dictionary
         - Space: O(1) no new allocation
         
-        Note: A single 3D grid (grid[row][col][layer]) would add indexing overhead and complexity; two separate dicts are cleaner since ground and air units never collide
+        Note: A single 3D grid (grid[row][col][layer]) would add indexing overhead and complexity; two separate arrays are cleaner since ground and air units never collide
         """
         if self.troop_can_fly:
             return self.arena.occupancy_grid_flying
         else:
             return self.arena.occupancy_grid
 
+    @profiled("pathfinding")
+    def plan_path(self, collision_grid, target_grid, goal_cell=None, cell_type=None, max_radius=None, max_expansions=None):
+        """
+        Finds a path from the troop location, same arguments of find_path, reusing the arena path cache when the same search was already done
+
+        - Time: Worst case O(V + E) on a cache miss, Average case O(1) on a cache hit
+        - Space: O(L) for the cached path where L is the path length
+
+        NOTE: troops chasing a target search again every tick while they wait to move, and troops of the same card search from the same cells,
+        most of these searches have the same start and target so the result is the same
+        NOTE: a cache miss over the frame budget of the update scheduler returns None and sets search_deferred, the troop searches again next frame
+        NOTE: a troop surrounded by other troops can't be reached considering the troops, we skip the search that would visit the whole arena to find out
+        NOTE: with max_radius or max_expansions the path can be partial (it ends at the cell closest to the target), the troop searches again when it walked it
+        """
+        path_cache = self.arena.path_cache
+        key = path_cache.make_key(self, collision_grid, goal_cell=goal_cell, cell_type=cell_type, max_radius=max_radius, max_expansions=max_expansions)
+        path = path_cache.get(key)
+        self.search_deferred = False
+        if path is None:
+            if collision_grid and isinstance(cell_type, Troop) and cell_type.troop_can_fly == self.troop_can_fly and self.arena.is_surrounded(cell_type, self):
+                profiler.count("surrounded_targets")
+                return None
+            if not self.arena.update_scheduler.allow_search(self):
+                self.search_deferred = True
+                return None
+            path = find_path(self.location, self.arena.grid, collision_grid, target_grid, self, goal_cell=goal_cell, cell_type=cell_type, max_radius=max_radius, max_expansions=max_expansions)
+            path_cache.put(key, path, self)
+        return path
+
+    def search_radius(self):
+        """
+        Cells from the troop a search towards a locked target can visit, a target further than this has walked away and we only get closer to it
+
+        - Time: Worst case = Average case = O(1)
+        - Space: O(1)
+        """
+        return max(self.attack_aggro_range, self.attack_range, 1) * SEARCH_RADIUS_FACTOR
+
     def reset_path(self):
         self.current_path = None
         self.current_path_index = 0
+        if self.arena is not None:
+            self.arena.reservations.release(self) # the claimed cells belonged to the old path
         #self.is_targetting_something = None
         
     def find_closest_target(self, got_blocked=False):
@@ -137,8 +200,11 @@ class Troop:
         
         minimum_distance_to_troop, closest_troop = self.find_closest_enemy_troop()
         # path to the tower (we ignore troops here) or we use the current path if it is set
-        if got_blocked: # means we got blocked by a troop so we need to path considering the troops
-            path = find_path_bfs(self.location, self.arena.grid, self.get_occupancy_grid(), {}, self, cell_type=tower_to_find)
+        if self.raw_movement_speed == 0:
+            path = None # stationary units (towers) never walk, searching a path would be wasted
+
+        elif got_blocked: # means we got blocked by a troop so we need to path considering the troops
+            path = self.plan_path(self.get_occupancy_grid(), {}, cell_type=tower_to_find, max_expansions=SEARCH_MAX_EXPANSIONS) # the tower is far, only the expansions are bounded
             self.current_path_index = 0
             if not path:
                 print(f"{self.name} got blocked by a troop, no path found")
@@ -146,8 +212,10 @@ class Troop:
         elif self.current_path:
             path = self.current_path
 
-        else: # lighter pathing, we ignore troops
-            path = find_path_bfs(self.location, self.arena.grid, {}, {}, self, cell_type=tower_to_find)
+        else: # lighter pathing, we ignore troops so we can use the path of the group leader or the distance field shared by all troops
+            path = self.group.follow_path(self) if self.group is not None else None
+            if path is None:
+                path = self.arena.find_tower_path(self, tower_to_find)
             self.current_path_index = 0
         
         if self.attack_aggro_range >= minimum_distance_to_troop >= 0 and closest_troop is not None:
@@ -163,11 +231,12 @@ class Troop:
                 self.is_targetting_something = closest_troop
                 #print("targetting troop", closest_troop.name)
 
-                target_grid = closest_troop.get_occupancy_grid()
-                collision_grid = self.get_occupancy_grid()
+                if self.raw_movement_speed > 0:
+                    target_grid = closest_troop.get_occupancy_grid()
+                    collision_grid = self.get_occupancy_grid()
 
-                path = find_path_bfs(self.location, self.arena.grid, collision_grid, target_grid, self, cell_type=self.is_targetting_something)
-                self.current_path_index = 0
+                    path = self.plan_path(collision_grid, target_grid, cell_type=self.is_targetting_something, max_radius=self.search_radius(), max_expansions=SEARCH_MAX_EXPANSIONS)
+                    self.current_path_index = 0
             else:
                 # tower is in aggro range but not attack range, we walk toward it without locking on it
                 self.is_targetting_something = None
@@ -179,41 +248,21 @@ class Troop:
         self.current_path = path
         return path 
 
+    @profiled("targeting")
     def find_closest_enemy_troop(self): # this should only be run if no target is active.
         """
-        Finds the closest enemy troop using linear scan
+        Finds the closest enemy troop inside the aggro range using the arena spatial index
             
-        - Time: O(n) where n is the number of troops
+        - Time: Worst case O(n) where n is the number of troops, Average case O(k) where k are the troops in the buckets around this one
         - Space: O(1)
             
-        Why linear scan instead of utilizing a sorted grid such as the one we have due to the visualization
-        - Finding closest requires 2D Euclidean distance, not 1D sorting
-        - With ~50 troops max, O(n) scan is faster than maintaining spatial indices
-        - Troops move every frame, so index updates would cost more than linear scan saves
-        """
-        closest_troop = None
-        minimum_distance = inf
-                
-        for troop in self.arena.unique_troops:
-            #troop = occupancy_grid[cell]
-            # skip if already checked, same team, or dead
-            if troop.team == self.team or not troop.is_alive:
-                continue
-            if troop.troop_can_fly and not self.troop_can_target_air:
-                continue # the troop can't see the target
-            
-            if self.troop_favorite_target != "any" and troop.troop_type != self.troop_favorite_target:
-                # we only target the favourite target types
-                continue
-            
-            # using center-to-center distance for consistency
-            distance = calculate_edge_to_edge_distance(self, troop)
-            
-            if distance < minimum_distance:
-                minimum_distance = distance
-                closest_troop = troop
-        
-        return minimum_distance, closest_troop
+        Why a spatial index instead of a linear scan over all the troops:
+        - Every troop looks for enemies every tick, with a linear scan that is O(n^2) per tick
+        - Troops only care about enemies inside their aggro range, buckets as big as the largest range let us skip everything else
+        - Most moves stay inside the same bucket so keeping the index updated is almost free
+        Returns (inf, None) if no enemy is in the aggro range, the caller only locks on troops inside it anyway
+        """
+        return self.arena.spatial_index.find_closest_enemy(self, max_distance=self.attack_aggro_range)
 
     def occupied_cells(self):
         """
@@ -256,7 +305,8 @@ class Troop:
             else:
                 self.sprite_number = 2 # attack sprite
 
-            self.sprite = self.asset_manager.get_troop_sprite(self.name, self.team, self.sprite_number)
+            if self.asset_manager:
+                self.sprite = self.asset_manager.get_troop_sprite(self.name, self.team, self.sprite_number)
 
     """MAIN FUNCTIONS"""
     def move_to_tower(self, got_blocked=False):
@@ -268,7 +318,7 @@ class Troop:
             - V + E for BFS pathfinding (V = grid cells, E = edges up to 8V)
         - Space: O(V) for path storage and BFS visited set
 
-        NOTE:Uses BFS for pathfinding because it guarantees shortest path on unweighted grids
+        NOTE:Uses BFS or A* (PATHFINDING_ENGINE) for pathfinding because both guarantee shortest path on unweighted grids
         """
         if not self.is_active or not self.is_alive:
             return
@@ -292,14 +342,19 @@ class Troop:
                 # if it is still alive then
                 # make sure that the troop is still in range of the troop that it is attacking if not walk there
                 if not is_in_attack_range(self, self.is_targetting_something):
+                    previous_path, previous_index = self.current_path, self.current_path_index
                     self.reset_path()
                     target_grid = self.is_targetting_something.get_occupancy_grid()
                     self.in_process_attack = None
 
                     if self.raw_movement_speed > 0:
                         #print(f"{self.name} not in range, finding pabth to troop")
-                        path = find_path_bfs(self.location, self.arena.grid, self.get_occupancy_grid(), target_grid, self, cell_type=self.is_targetting_something)
+                        path = self.plan_path(self.get_occupancy_grid(), target_grid, cell_type=self.is_targetting_something, max_radius=self.search_radius(), max_expansions=SEARCH_MAX_EXPANSIONS)
                         #print(f"{self.name} trying to path to {self.is_targetting_something.name}", path)
+                        if path is None and self.search_deferred and previous_path:
+                            # over the frame budget, we keep walking along the old path and search again next frame
+                            path = previous_path
+                            self.current_path_index = previous_index
                         self.current_path = path
                     else:
                         self.is_targetting_something = None # we reset the target because the target is far away and we can't move
@@ -319,6 +374,8 @@ class Troop:
 
         if not got_blocked:
             self.movement_accumulator += self.raw_movement_speed
+
+        self.arena.reservations.reserve_path(self, path, self.current_path_index, self.arena.frame_count)
         
         if self.movement_accumulator < 1:
             return 
@@ -344,8 +401,13 @@ class Troop:
                 self.attack()
                 return
             
-            if not self.arena.move_unit(self, path[steps_done]):
+            if self.arena.reservations.is_claimed_by_other(self, path[steps_done], self.arena.frame_count) or not self.arena.move_unit(self, path[steps_done]):
                 #print("Unit in the way checking again path considering troops")  
+                if self.resolve_block(path, steps_done):
+                    return # we wait for the cell or we walked around it, no new search
+                self.arena.reservations.searches += 1
+                self.blocked_ticks = 0
+                profiler.count("blocked_searches")
                 self.reset_path()
                 if got_blocked:
                     self.is_targetting_something = None # we can't get to the target 
@@ -355,66 +417,208 @@ class Troop:
 
             else:
                 self.movement_accumulator -= 1.0 # we moved so we need to consume it
+                self.blocked_ticks = 0
                 #print(f"{self.name} moves to {path[steps_done]}")
                 self.current_path_index = steps_done
                 self.location = path[steps_done]  
                 self.swap_sprite(moving=True)
     
+    def resolve_block(self, path, steps_done):
+        """
+        Tries to solve locally a blocked step towards path[steps_done] using the reservation table, returns False if a new search is needed
+        - the cell is only claimed or its occupant is walking away: we wait (at most RESERVATION_MAX_WAIT_TICKS ticks in a row)
+        - otherwise we sidestep to a free neighbour that is next to path[steps_done + 1] and continue on the same path from there
+        - otherwise we repair the path with a detour inside a small window that rejoins it later (see repair_path)
+
+        - Time: Worst case = Average case = O(d * tw * th) where d are the 8 directions, plus the bounded repair search when the sidestep fails
+        - Space: O(L) for the new path after a sidestep or a repair where L is the path length
+        """
+        reservations = self.arena.reservations
+        blocked_cell = path[steps_done]
+        occupant = self.get_occupancy_grid().get(blocked_cell)
+
+        if (occupant is None or reservations.is_moving(occupant)) and self.blocked_ticks < RESERVATION_MAX_WAIT_TICKS:
+            self.blocked_ticks += 1
+            self.movement_accumulator = min(self.movement_accumulator, 1.0) # no burst of steps once the cell frees up
+            reservations.waits += 1
+            profiler.count("blocked_waits")
+            return True
+
+        if steps_done + 1 >= len(path):
+            return False # the blocked cell is the last one, there is nothing to rejoin
+        rejoin_cell = path[steps_done + 1]
+        row, col = self.location
+        frame = self.arena.frame_count
+
+        candidates = []
+        for d_row, d_col in sidestep_directions:
+            cell = (row + d_row, col + d_col)
+            if cell == blocked_cell or max(abs(cell[0] - rejoin_cell[0]), abs(cell[1] - rejoin_cell[1])) > 1:
+                continue
+            # the rejoin cell itself first (it skips the blocked one), then the closest cells to it
+            candidates.append(((cell != rejoin_cell, (cell[0] - rejoin_cell[0]) ** 2 + (cell[1] - rejoin_cell[1]) ** 2), cell))
+        candidates.sort()
+
+        for _, cell in candidates:
+            if reservations.is_claimed_by_other(self, cell, frame) or not self.arena.move_unit(self, cell):
+                continue
+            start_cell = (row, col)
+            if cell == rejoin_cell:
+                self.current_path = [start_cell] + path[steps_done + 1:]
+            else:
+                self.current_path = [start_cell, cell] + path[steps_done + 1:]
+            self.current_path_index = 1
+            self.location = cell
+            self.movement_accumulator -= 1.0
+            self.blocked_ticks = 0
+            self.swap_sprite(moving=True)
+            reservations.sidesteps += 1
+            profiler.count("sidesteps")
+            return True
+
+        repaired = repair_path(path, steps_done, self.arena.grid, self.get_occupancy_grid(), self)
+        if repaired is None or reservations.is_claimed_by_other(self, repaired[1], frame) or not self.arena.move_unit(self, repaired[1]):
+            return False # same claim check of the sidestep, a detour into a claimed cell falls back to the full search
+        self.current_path = repaired
+        self.current_path_index = 1
+        self.location = repaired[1]
+        self.movement_accumulator -= 1.0
+        self.blocked_ticks = 0
+        self.swap_sprite(moving=True)
+        reservations.repairs += 1
+        return True
+
+    @profiled("attack")
     def attack(self):
         """
-        Handles attack timing and damage application in area of effect
+        Starts an attack on the locked target, the windup, the swing and the hit are arena events chained one after the other,
+        an awake attacker runs the last one that came due here, a waiting one gets it from handle_event (see Arena.update_troops)
 
-        - Time: Worst case = Average case = O(r^2) where r is attack_tile_radius checks cells in square around target
-        - Space: O(1) no additional allocations
+        - Time: Worst case = Average case = O(log e) where e are the scheduled events when an attack starts (one heap push),
+          O(r^2) for the hit where r is attack_tile_radius, O(1) otherwise
+        - Space: O(1) one pending event per attack
+
+        NOTE: before the events this function compared frame_count - in_process_attack with attack_speed on every tick,
+        now the arena only marks the troop on the frames where something happens (see mark_event)
         """
         if self.is_alive and self.is_active:
             if self.in_process_attack:
                 if not self.is_targetting_something:
                     return False # for some reason the troop is not targetting something, we return false
+                if self.due_event is not None:
+                    self._run_due_event()
 
-                if (self.arena.frame_count-self.in_process_attack) >= self.attack_speed:
-                    # attack_tile_radius
-                    # we expand the damage in all directions from the location of this troop
-                    # we do the damage based on location and not on troop targetted we use that only for the initial "explosion"
-                    self.swap_sprite(moving=False, reset_attack=False)
-                    loc = self.is_targetting_something.location
-                    is_the_target_air = self.is_targetting_something.troop_can_fly
-                    for i_row in range(0-self.attack_tile_radius, self.attack_tile_radius+1):
-                        for i_col in range(0-self.attack_tile_radius, self.attack_tile_radius+1):
-                            # we need to check both occupancy grids if the troop is able to attack air, otherwise only the ground one
-                            loc_to_check = (loc[0]+i_row, loc[1]+i_col)
-
-                            if self.troop_can_target_air and (is_the_target_air or self.attack_tile_radius>0):
-                                if loc_to_check in self.arena.occupancy_grid_flying:
-                                    if self.arena.occupancy_grid_flying[loc_to_check] != self and self.team != self.arena.occupancy_grid_flying[loc_to_check].team:
-                                        self.arena.occupancy_grid_flying[loc_to_check].take_damage(self.damage, source_troop=self)
-
-                                        if self.attack_tile_radius == 0:
-                                            continue # we don't want to do damage in both ground and air cells if the radius is 0
-
-                            if loc_to_check in self.arena.occupancy_grid:
-                                if self.arena.occupancy_grid[loc_to_check] != self and self.team != self.arena.occupancy_grid[loc_to_check].team:
-                                    self.arena.occupancy_grid[loc_to_check].take_damage(self.damage, source_troop=self)
-
-                    #self.is_targetting_something.take_damage(self.damage, source_troop=self) old system
-                    self.in_process_attack = None
-                    return True
-            
-                elif (self.arena.frame_count-self.in_process_attack) >= self.attack_speed * 0.70:
-                    self.swap_sprite(moving=False, reset_attack=False)  # attack sprite (windup before hit)
-            
-                elif (self.arena.frame_count-self.in_process_attack) >= self.attack_speed * 0.40:
-                    self.swap_sprite(moving=False, reset_attack=True)  # idle sprite (charging)
-            
-            
             else:
-                self.in_process_attack = self.arena.frame_count
+                start_frame = self.arena.frame_count
+                self.in_process_attack = start_frame
+                self.attack_token += 1 # events of older attacks (interrupted ones) don't match this token anymore
+                self.due_event = None
                 self.swap_sprite(moving=True)
+                self.schedule_attack_event(0)
 
             return True
         print(f"{self.name} is dead or inactive, cannot attack")
         return False
 
+    def schedule_attack_event(self, phase):
+        """
+        Schedules the event of a phase of the current attack (0 windup, 1 swing, 2 hit)
+
+        - Time: Worst case = Average case = O(log e) heap push
+        - Space: O(1)
+        """
+        kind, fraction = attack_phases[phase]
+        # same thresholds of the old polling: idle sprite at 40% of the attack speed, attack sprite at 70% and damage at 100%
+        self.arena.schedule_event(self.in_process_attack + max(1, ceil(self.attack_speed * fraction)), self, kind, self.attack_token)
+
+    def mark_event(self, kind, token):
+        """
+        Marks a scheduled attack event ("windup", "swing" or "hit") as due and schedules the next phase,
+        called by Arena.process_events before the troops update
+
+        - Time: Worst case = Average case = O(log e) for the next event, O(1) for the hit
+        - Space: O(1)
+
+        NOTE: attacks are interrupted by setting in_process_attack to None (the troop moved, lost or changed target),
+        we don't remove their events from the heap, the token tells us that they are outdated and the chain stops there
+        NOTE: the event doesn't take effect here, hits land in the order of the troop updates like with the per tick check:
+        an attacker killed earlier in the frame never hits, and one whose target died picks a new target before hitting
+        """
+        if token != self.attack_token or not self.in_process_attack or not self.is_alive or not self.is_active:
+            return
+        self.due_event = kind # events are popped in frame order, a later one replaces the one that didn't take effect yet
+        if kind != "hit":
+            self.schedule_attack_event(attack_phase_index[kind] + 1)
+
+    @profiled("attack")
+    def handle_event(self):
+        """
+        Runs the due event of a troop waiting on its attack (see is_waiting_on_attack), at its place in the update order
+
+        - Time: Worst case = Average case = O(r^2) for the hit where r is attack_tile_radius, O(1) otherwise
+        - Space: O(1)
+        """
+        self._run_due_event()
+
+    def _run_due_event(self):
+        kind = self.due_event
+        self.due_event = None
+        if kind == "hit":
+            self.swap_sprite(moving=False, reset_attack=False)
+            self.deal_damage(self.is_targetting_something)
+            self.in_process_attack = None
+        elif kind == "swing":
+            self.swap_sprite(moving=False, reset_attack=False)  # attack sprite (windup before hit)
+        elif kind == "windup":
+            self.swap_sprite(moving=False, reset_attack=True)  # idle sprite (charging)
+
+    def is_waiting_on_attack(self):
+        """
+        True when the troop is halfway through an attack on a target in range and standing still,
+        until the next attack event its update would change nothing so the arena can skip it
+
+        - Time: Worst case = Average case = O(1)
+        - Space: O(1)
+
+        NOTE: only the target moving or dying can change that, the arena wakes the attackers of a troop when it happens
+        """
+        target = self.is_targetting_something
+        return (
+            bool(self.in_process_attack) and self.is_alive and self.is_active and self.current_path is None
+            and target is not None and target.is_alive and is_in_attack_range(self, target)
+        )
+
+    def deal_damage(self, target):
+        """
+        Does the damage in the area of effect around the target
+
+        - Time: Worst case = Average case = O(r^2) where r is attack_tile_radius checks cells in square around target
+        - Space: O(1) no additional allocations
+        """
+        # attack_tile_radius
+        # we expand the damage in all directions from the location of this troop
+        # we do the damage based on location and not on troop targetted we use that only for the initial "explosion"
+        loc = target.location
+        is_the_target_air = target.troop_can_fly
+        for i_row in range(0-self.attack_tile_radius, self.attack_tile_radius+1):
+            for i_col in range(0-self.attack_tile_radius, self.attack_tile_radius+1):
+                # we need to check both occupancy grids if the troop is able to attack air, otherwise only the ground one
+                loc_to_check = (loc[0]+i_row, loc[1]+i_col)
+
+                if self.troop_can_target_air and (is_the_target_air or self.attack_tile_radius>0):
+                    occupant = self.arena.occupancy_grid_flying.get(loc_to_check)
+                    if occupant is not None:
+                        if occupant != self and self.team != occupant.team:
+                            occupant.take_damage(self.damage, source_troop=self)
+
+                            if self.attack_tile_radius == 0:
+                                continue # we don't want to do damage in both ground and air cells if the radius is 0
+
+                occupant = self.arena.occupancy_grid.get(loc_to_check)
+                if occupant is not None:
+                    if occupant != self and self.team != occupant.team:
+                        occupant.take_damage(self.damage, source_troop=self)
+
     def take_damage(self, damage, source_troop=None):
         """
         Applies damage and handles death/removal
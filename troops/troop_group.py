@@ -0,0 +1,91 @@
+from constants import *
+
+"""
+Group pathing for the troops of one card (barbarians, goblins, skeletons, bats...).
+Only the leader gets a path to the tower, the other members walk the same path shifted by their offset from the leader,
+so the formation keeps its shape instead of every member merging on the same shortest line and blocking the others.
+A member walks on its own again when it gets a target lock or when it is more than GROUP_MAX_SEPARATION cells away from its place.
+"""
+
+class TroopGroup:
+    """
+    Formation of the troops spawned by one card, offsets are (d_row, d_col) from the leader location
+    """
+    def __init__(self, troops):
+        """
+        - Time: Worst case = Average case = O(c) where c is the troop count
+        - Space: O(c) for the offsets
+        """
+        self.leader = troops[0]
+        leader_row, leader_col = self.leader.location
+        self.offsets = {} # key: troop value: (d_row, d_col) from the leader, insertion ordered so the next leader is always the same
+        for troop in troops:
+            self.offsets[troop] = (troop.location[0] - leader_row, troop.location[1] - leader_col)
+            troop.group = self
+
+        self.follows = 0 # paths given to the members without any search
+
+    def remove(self, troop):
+        """
+        Removes a dead member, if it was the leader the next member leads and the offsets are moved to it
+
+        - Time: Worst case = Average case = O(c)
+        - Space: O(1)
+        """
+        offset = self.offsets.pop(troop, None)
+        troop.group = None
+        if offset is None or troop is not self.leader:
+            return
+
+        if not self.offsets:
+            self.leader = None
+            return
+        self.leader = next(iter(self.offsets))
+        leader_row, leader_col = self.offsets[self.leader]
+        for member, (d_row, d_col) in self.offsets.items():
+            self.offsets[member] = (d_row - leader_row, d_col - leader_col)
+
+    def follow_path(self, troop):
+        """
+        Returns the path of the leader shifted by the offset of troop, starting from where troop is,
+        None if troop has to search on its own (it is the leader, the leader has no tower path or troop is too far from its place)
+
+        - Time: Worst case = Average case = O(L) where L is the length of the leader path, one clearance lookup per cell
+        - Space: O(L) for the path
+
+        NOTE: the shifted path stops at the first cell where the troop doesn't fit, the member searches on its own from there
+        """
+        leader = self.leader
+        if leader is None or troop is leader or leader.is_targetting_something is not None or not leader.current_path:
+            return None
+
+        d_row, d_col = self.offsets[troop]
+        row, col = troop.location
+        leader_path = leader.current_path
+        leader_index = leader.current_path_index
+
+        # the cell of the leader path where the troop should be now, after a wait or a sidestep it can be one cell away
+        place_row = leader_path[leader_index][0] + d_row
+        place_col = leader_path[leader_index][1] + d_col
+        if max(abs(place_row - row), abs(place_col - col)) > GROUP_MAX_SEPARATION:
+            return None
+
+        arena = troop.arena
+        clearance = arena.get_clearance_map(is_flying=troop.troop_can_fly)
+        troop_size = max(troop.width, troop.height)
+        path = [troop.location]
+        for leader_row, leader_col in leader_path[leader_index:]:
+            next_row = leader_row + d_row
+            next_col = leader_col + d_col
+            if (next_row, next_col) == path[-1]:
+                continue
+            if max(abs(next_row - path[-1][0]), abs(next_col - path[-1][1])) > 1:
+                break # too far to catch up, the member searches on its own from the end of this path
+            if not (0 <= next_row < arena.height and 0 <= next_col < arena.width) or clearance[next_row * arena.width + next_col] < troop_size:
+                break
+            path.append((next_row, next_col))
+
+        if len(path) < 2:
+            return None
+        self.follows += 1
+        return path
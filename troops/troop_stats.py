@@ -0,0 +1,80 @@
+from operator import attrgetter
+from constants import *
+
+"""
+Static stats shared by all the troops of the same type (flyweight).
+A card spawns its troops with the same stats, so instead of copying a dozen values into every troop they all point to one TroopStats,
+interned by get_troop_stats. Towers are created with their own scaled size, they get their own TroopStats the same way.
+"""
+
+class TroopStats:
+    """
+    Immutable stats of a troop type, ranges are already scaled by MULTIPLIER_GRID_HEIGHT
+    """
+    __slots__ = (
+        "name", "max_health", "damage", "attack_type", "attack_speed", "attack_range", "attack_aggro_range", "attack_tile_radius",
+        "width", "height", "scale_multiplier", "troop_type", "troop_favorite_target", "troop_can_target_air",
+        "troop_can_fly", "raw_movement_speed", "is_tower", "tower_number",
+    )
+
+    def __init__(self, name, health, damage, movement_speed, attack_type, attack_speed, attack_range, attack_aggro_range, attack_tile_radius,
+                 width, height, scale_multiplier, troop_type, troop_favorite_target, troop_can_target_air, troop_can_fly):
+        """
+        Same arguments of Troop without the per instance ones (color, team, location, arena, asset_manager)
+
+        - Time: Worst case = Average case = O(1)
+        - Space: O(1)
+        """
+        values = {
+            "name": name,
+            "max_health": health,
+            "damage": damage,
+            "attack_type": attack_type,
+            "attack_speed": attack_speed,
+            "attack_range": int(attack_range * MULTIPLIER_GRID_HEIGHT),
+            "attack_aggro_range": int(attack_aggro_range * MULTIPLIER_GRID_HEIGHT), # we use this to check if we are in range to get triggered by something
+            "attack_tile_radius": int(attack_tile_radius * MULTIPLIER_GRID_HEIGHT),
+            "width": width,
+            "height": height,
+            "scale_multiplier": scale_multiplier,
+            "troop_type": troop_type,
+            "troop_favorite_target": troop_favorite_target,
+            "troop_can_target_air": troop_can_target_air,
+            "troop_can_fly": troop_can_fly,
+            # we divide by 2 just because the troops are a bit too fast, this can be fixed by changing the multiplier in the specs file but we feel like it is better to have more readable numbers there
+            "raw_movement_speed": movement_speed * MULTIPLIER_GRID_HEIGHT / 2,
+            "is_tower": name.startswith("Tower"), # check if this is a tower (towers need grid cleanup)
+        }
+        values["tower_number"] = int(name.split(" ")[1]) if values["is_tower"] else None
+        for field, value in values.items():
+            object.__setattr__(self, field, value)
+
+    def __setattr__(self, field, value):
+        raise AttributeError(f"TroopStats are shared by all the {self.name} troops, {field} can't be changed")
+
+
+# key: tuple of the TroopStats arguments (troop name and plain stat values) value: the TroopStats, one per troop type for the whole process
+# colors and asset managers stay on the troops, a key holding them would keep every asset manager of the process alive
+troop_stats_cache = {}
+
+def get_troop_stats(*arguments):
+    """
+    Returns the shared TroopStats built with these arguments (same order of TroopStats), creating it the first time
+
+    - Time: Worst case = Average case = O(1) hash of the arguments
+    - Space: O(1), O(s) over the process where s are the different troop types
+    """
+    stats = troop_stats_cache.get(arguments)
+    if stats is None:
+        stats = TroopStats(*arguments)
+        troop_stats_cache[arguments] = stats
+    return stats
+
+def shared_stat(field):
+    """
+    Read only attribute of Troop that lives in its TroopStats, troop.damage reads troop.stats.damage
+
+    - Time: Worst case = Average case = O(1)
+    - Space: O(1)
+    """
+    return property(attrgetter("stats." + field), doc=f"{field} of the shared TroopStats")